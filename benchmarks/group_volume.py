@@ -0,0 +1,84 @@
+"""
+Measure setting the volume of one large session group, one session after the other and
+on the volume worker pool, against a simulated audio backend where every call takes
+`--latency` seconds.
+
+Usage:
+    python benchmarks/group_volume.py --sessions 10 30 80 --latency 0.002 --workers 8 \
+        --output bench_output.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sessions.sessions import ProcessInfo, SessionGroup, SoftwareSession
+from sessions.simulated_backend import SimulatedBackend
+from sessions.volume_pool import VolumeWorkerPool
+
+
+def timed(function, repeat: int) -> float:
+    """Mean seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def measure(
+    n_sessions: int, latency: float, pool: VolumeWorkerPool, repeat: int
+) -> dict:
+    backend = SimulatedBackend(n_sessions=n_sessions, latency=latency, seed=0)
+    group = SessionGroup(
+        [
+            SoftwareSession(handle, ProcessInfo(handle.pid, handle.process_name))
+            for handle in backend.sessions.values()
+        ]
+    )
+    return {
+        "sessions": n_sessions,
+        "latency_s": latency,
+        "sequential_s": timed(lambda: group.set_volume(0.5), repeat),
+        "pool_s": timed(lambda: group.set_volume(0.5, pool), repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", nargs="+", type=int, default=[10, 30, 80])
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.002,
+        help="Seconds per simulated backend call",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    pool = VolumeWorkerPool(workers=args.workers, threshold=0)
+    results = {"benchmark": "group_volume", "workers": args.workers, "results": []}
+    try:
+        for n_sessions in args.sessions:
+            result = measure(n_sessions, args.latency, pool, args.repeat)
+            results["results"].append(result)
+            print(
+                f"sessions={n_sessions:<4} "
+                f"sequential={1000 * result['sequential_s']:.1f}ms  "
+                f"pool={1000 * result['pool_s']:.1f}ms  "
+                f"speedup={result['sequential_s'] / result['pool_s']:.1f}x"
+            )
+    finally:
+        pool.close()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
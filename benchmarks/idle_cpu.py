@@ -0,0 +1,81 @@
+"""
+Measure the CPU used by the serial reader while the sliders sit idle.
+
+Compares the old polling read (timeout=0.1) with the blocking read, using a
+pseudo-terminal as the device. Linux only.
+
+Usage:
+    python benchmarks/idle_cpu.py --duration 10 --output bench_output.json
+"""
+
+import argparse
+import json
+import time
+from pty_link import PtyLink
+from core.serial_reader import SerialReaderThread
+from core.slider_bank import SliderBank
+from microcontroller.microcontroller_manager import MicrocontrollerManager
+
+
+class CountingMicrocontrollerManager(MicrocontrollerManager):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.read_calls = 0
+
+    def read_values(self, block: bool = True):
+        self.read_calls += 1
+        return super().read_values(block)
+
+
+def measure_idle(read_timeout: float | None, duration: float, n_sliders: int) -> dict:
+    with PtyLink() as link:
+        manager = CountingMicrocontrollerManager(n_sliders, read_timeout=read_timeout)
+        manager.connect(link.port, 9600)
+        reader = SerialReaderThread(manager, SliderBank(n_sliders))
+
+        cpu_start = time.process_time()
+        reader.start()
+        time.sleep(duration)
+        cpu_seconds = time.process_time() - cpu_start
+
+        reader.stop()
+        reader.join()
+        manager.close()
+
+    return {
+        "read_timeout": read_timeout,
+        "duration_s": duration,
+        "cpu_s": cpu_seconds,
+        "cpu_percent": 100 * cpu_seconds / duration,
+        "wakeups_per_s": manager.read_calls / duration,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--duration", type=float, default=5.0, help="Idle seconds per mode"
+    )
+    parser.add_argument("--sliders", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "idle_cpu",
+        "results": [
+            measure_idle(read_timeout, args.duration, args.sliders)
+            for read_timeout in (0.1, None)
+        ],
+    }
+    for result in results["results"]:
+        print(
+            f"read_timeout={result['read_timeout']}: {result['cpu_percent']:.3f}% CPU, "
+            f"{result['wakeups_per_s']:.1f} wakeups/s"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
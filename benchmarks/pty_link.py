@@ -0,0 +1,36 @@
+"""
+Pseudo-terminal pair standing in for a microcontroller on Linux.
+
+The benchmark writes to the master side, the app under test opens the slave side as if
+it were a serial port.
+"""
+
+import os
+import sys
+import tty
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+class PtyLink:
+    def __init__(self) -> None:
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+
+    def write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master_fd, view)
+            view = view[written:]
+
+    def close(self) -> None:
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+    def __enter__(self) -> "PtyLink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
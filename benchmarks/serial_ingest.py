@@ -0,0 +1,214 @@
+"""
+Measure how fast MicrocontrollerManager.read_values ingests slider frames.
+
+A writer thread sends keyframes into a pseudo-terminal at a fixed rate, optionally
+corrupting a share of them, while the reader decodes them as the app would. Every frame
+carries a sequence number in its first slider, so each decoded frame can be matched to
+the moment it was written. Linux only.
+
+Reported per run: achieved frames/s, latency from write to decoded values
+(p50/p95/p99/max), lost and invalid frames, and reader CPU time per frame.
+
+Usage:
+    python benchmarks/serial_ingest.py --rates 100 1000 5000 --sliders 5 16 \
+        --noise 0 0.01 --output bench_output.json
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from dataclasses import asdict
+from pty_link import PtyLink
+from microcontroller.frame_protocol import encode_binary_frame
+from microcontroller.microcontroller_manager import MicrocontrollerManager
+from utils.logger import logger
+
+
+def encode_frame(values: list[int], protocol: str, resolution_bits: int) -> bytes:
+    if protocol == "binary":
+        return encode_binary_frame(values, resolution_bits)
+    return ("|".join(str(value) for value in values) + "\r\n").encode("utf-8")
+
+
+def corrupt(frame: bytes, rng: random.Random) -> bytes:
+    """Flip the bits of one random byte, as a noisy line would"""
+    position = rng.randrange(len(frame))
+    corrupted = bytearray(frame)
+    corrupted[position] ^= rng.randrange(1, 256)
+    return bytes(corrupted)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[
+        min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    ]
+
+
+def measure_ingest(
+    protocol: str,
+    rate: float,
+    n_sliders: int,
+    noise: float,
+    duration: float,
+    resolution_bits: int = 10,
+    seed: int = 0,
+) -> dict:
+    sequence_modulus = 1024 if protocol == "ascii" else 1 << resolution_bits
+    n_frames = int(rate * duration)
+    rng = random.Random(seed)
+    write_times = [0.0] * n_frames
+    n_corrupted = 0
+
+    with PtyLink() as link:
+        manager = MicrocontrollerManager(
+            n_sliders,
+            protocol=protocol,
+            resolution_bits=resolution_bits,
+            drain_backlog=False,  # Every frame is decoded, so each one can be timed
+            read_timeout=0.05,
+        )
+        manager.connect(link.port, 115200)
+        max_raw = manager.decoder.max_raw
+
+        def write_frames() -> None:
+            nonlocal n_corrupted
+            start = time.perf_counter()
+            for sequence in range(n_frames):
+                delay = start + sequence / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                values = [sequence % sequence_modulus] + [
+                    rng.randrange(max_raw + 1) for _ in range(n_sliders - 1)
+                ]
+                frame = encode_frame(values, protocol, resolution_bits)
+                if noise and rng.random() < noise:
+                    frame = corrupt(frame, rng)
+                    n_corrupted += 1
+                write_times[sequence] = time.perf_counter()
+                link.write(frame)
+
+        writer = threading.Thread(target=write_frames, name="FrameWriter")
+        latencies = []
+        misattributed = 0
+        last_sequence = -1
+        last_frame_time = time.perf_counter()
+
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        writer.start()
+        while writer.is_alive() or time.perf_counter() - last_frame_time < 0.25:
+            values = manager.read_values()
+            now = time.perf_counter()
+            if not values:
+                continue
+            last_frame_time = now
+            # Unwrap the sequence number, which one slider value holds modulo its range
+            raw = round(values[0] * max_raw)
+            sequence = last_sequence + 1 + (raw - last_sequence - 1) % sequence_modulus
+            if sequence >= n_frames or write_times[sequence] == 0.0:
+                misattributed += 1  # A corrupted digit that still parsed, e.g. in ASCII
+                continue
+            last_sequence = sequence
+            latencies.append(now - write_times[sequence])
+        wall_seconds = last_frame_time - wall_start
+        cpu_seconds = time.thread_time() - cpu_start
+        writer.join()
+        manager.close()
+
+    latencies.sort()
+    stats = manager.frame_stats
+    return {
+        "protocol": protocol,
+        "resolution_bits": resolution_bits if protocol == "binary" else None,
+        "sliders": n_sliders,
+        "target_rate": rate,
+        "noise": noise,
+        "frames_sent": n_frames,
+        "frames_corrupted": n_corrupted,
+        "frames_received": len(latencies),
+        "frames_lost": n_frames - len(latencies),
+        "frames_invalid": stats.frame_errors,
+        "frames_misattributed": misattributed,
+        "frames_per_s": len(latencies) / wall_seconds,
+        "latency_us": {
+            "p50": 1e6 * percentile(latencies, 0.50),
+            "p95": 1e6 * percentile(latencies, 0.95),
+            "p99": 1e6 * percentile(latencies, 0.99),
+            "max": 1e6 * latencies[-1] if latencies else float("nan"),
+            "mean": 1e6 * statistics.fmean(latencies) if latencies else float("nan"),
+        },
+        "cpu_us_per_frame": 1e6 * cpu_seconds / max(1, len(latencies)),
+        "frame_stats": asdict(stats),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--protocols",
+        nargs="+",
+        default=["ascii", "binary"],
+        choices=["ascii", "binary"],
+    )
+    parser.add_argument(
+        "--rates",
+        nargs="+",
+        type=float,
+        default=[100, 1000, 5000],
+        help="Frames per second",
+    )
+    parser.add_argument("--sliders", nargs="+", type=int, default=[5])
+    parser.add_argument(
+        "--noise",
+        nargs="+",
+        type=float,
+        default=[0.0],
+        help="Share of corrupted frames",
+    )
+    parser.add_argument("--resolution-bits", type=int, default=10, choices=[10, 12])
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    # Corrupted ASCII frames are logged as warnings, which would skew the timing
+    logger.setLevel(logging.ERROR)
+
+    results = {"benchmark": "serial_ingest", "duration_s": args.duration, "results": []}
+    for protocol in args.protocols:
+        for n_sliders in args.sliders:
+            for noise in args.noise:
+                for rate in args.rates:
+                    result = measure_ingest(
+                        protocol,
+                        rate,
+                        n_sliders,
+                        noise,
+                        args.duration,
+                        args.resolution_bits,
+                        args.seed,
+                    )
+                    results["results"].append(result)
+                    latency = result["latency_us"]
+                    print(
+                        f"{protocol:6} sliders={n_sliders:<3} noise={noise:<5} "
+                        f"rate={rate:<7g} {result['frames_per_s']:8.0f} frames/s  "
+                        f"latency p50={latency['p50']:.0f}us "
+                        f"p99={latency['p99']:.0f}us  "
+                        f"lost={result['frames_lost']} "
+                        f"invalid={result['frames_invalid']}  "
+                        f"{result['cpu_us_per_frame']:.1f}us CPU/frame"
+                    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
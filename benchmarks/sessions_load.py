@@ -0,0 +1,206 @@
+"""
+Measure the session hot paths against the simulated audio backend.
+
+Times building the session manager, checking for changes, reconciling after session
+churn, building the mapping and applying volumes, for growing numbers of sessions. Runs
+anywhere, no Windows needed.
+
+Usage:
+    python benchmarks/sessions_load.py --sessions 100 1000 5000 --latency 0.0001 \
+        --output bench_output.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import yaml
+from config.config_manager import ConfigManager
+from mapping.mapping_manager import MappingManager
+from sessions.session_manager import SessionManager
+from sessions.simulated_backend import SimulatedBackend
+from utils.logger import logger
+
+MAPPINGS = {
+    0: ["master"],
+    1: ["system"],
+    2: ["chrome.exe", "firefox.exe", "msedge.exe"],
+    3: ["spotify.exe", "vlc.exe"],
+    4: ["discord.exe", "teams.exe", "zoom.exe"],
+    5: ["device:headphones"],
+    6: ["unmapped"],
+}
+
+
+def write_config(config_dir: Path) -> ConfigManager:
+    config = {
+        "mappings": MAPPINGS,
+        "device": {
+            "name": "Arduino Micro",
+            "port": "COM6",
+            "baudrate": 9600,
+            "sliders": len(MAPPINGS),
+        },
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 1,
+        },
+    }
+    (config_dir / "mapping.yml").write_text(yaml.dump(config))
+    config_manager = ConfigManager(config_dir, config_dir / "mapping.yml")
+    config_manager.load_config()
+    return config_manager
+
+
+def timed(function, repeat: int = 1, setup=None) -> float:
+    """Mean seconds per call. `setup` runs before each call, outside the timing."""
+    total = 0.0
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        total += time.perf_counter() - start
+    return total / repeat
+
+
+def measure(
+    n_sessions: int,
+    n_devices: int,
+    latency: float,
+    churn: int,
+    config_manager: ConfigManager,
+) -> dict:
+    backend = SimulatedBackend(
+        n_sessions=n_sessions, n_devices=n_devices, latency=latency, seed=0
+    )
+    backend.add_device("Headphones (USB Audio)")
+    mapping_manager = MappingManager()
+
+    session_manager = None
+
+    def create_session_manager():
+        nonlocal session_manager
+        session_manager = SessionManager(backend, volume_step=0.01)
+
+    results = {
+        "sessions": n_sessions,
+        "devices": n_devices + 1,
+        "latency_s": latency,
+        "churn": churn,
+    }
+    results["create_session_manager_s"] = timed(create_session_manager)
+    # An idle check that enumerates again, as a poll does, and one that reuses the
+    # snapshot within its TTL
+    results["check_for_changes_idle_s"] = timed(
+        session_manager.check_for_changes,
+        repeat=5,
+        setup=session_manager.invalidate_snapshot,
+    )
+    results["check_for_changes_cached_s"] = timed(
+        session_manager.check_for_changes, repeat=5
+    )
+
+    def churn_and_reconcile():
+        backend.churn(n_started=churn, n_ended=churn)
+        # Like the audio events would
+        session_manager.invalidate_snapshot()
+        if session_manager.check_for_changes():
+            session_manager.reload_sessions_and_devices()
+
+    results["churn_and_reconcile_s"] = timed(churn_and_reconcile, repeat=5)
+
+    mapping = None
+
+    def create_mapping():
+        nonlocal mapping
+        mapping = mapping_manager.create_mappings(session_manager, config_manager)
+
+    results["create_mapping_s"] = timed(create_mapping, repeat=5)
+    results["get_mapping_with_config_load_s"] = timed(
+        lambda: mapping_manager.get_mapping(session_manager, config_manager), repeat=5
+    )
+
+    # Every slider moved, as after a new mapping, then only one of them, as while
+    # turning one slider
+    positions = iter(range(1, 10_000))
+    calls_before = backend.calls["set_volume"]
+    results["apply_volumes_all_sliders_s"] = timed(
+        lambda: session_manager.apply_volumes(
+            {index: next(positions) % 100 / 100 for index in mapping}, mapping
+        ),
+        repeat=5,
+    )
+    results["set_volume_calls_per_apply"] = (
+        backend.calls["set_volume"] - calls_before
+    ) / 5
+    session_manager.apply_volumes({index: 0.5 for index in mapping}, mapping)
+    calls_before = backend.calls["set_volume"]
+    results["apply_volumes_one_slider_moved_s"] = timed(
+        lambda: session_manager.apply_volumes(
+            {
+                index: (next(positions) % 100 / 100 if index == 0 else 0.5)
+                for index in mapping
+            },
+            mapping,
+        ),
+        repeat=5,
+    )
+    results["set_volume_calls_per_apply_one_moved"] = (
+        backend.calls["set_volume"] - calls_before
+    ) / 5
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", nargs="+", type=int, default=[100, 1000, 5000])
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds per simulated backend call"
+    )
+    parser.add_argument(
+        "--churn",
+        type=int,
+        default=5,
+        help="Sessions started and ended per reconciliation",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    # Session creation is logged per session, which would dominate the measurement
+    logger.setLevel(logging.ERROR)
+
+    results = {"benchmark": "sessions_load", "results": []}
+    with tempfile.TemporaryDirectory() as config_dir:
+        config_manager = write_config(Path(config_dir))
+        for n_sessions in args.sessions:
+            result = measure(
+                n_sessions, args.devices, args.latency, args.churn, config_manager
+            )
+            results["results"].append(result)
+            print(
+                f"sessions={n_sessions:<6} "
+                + "  ".join(
+                    f"{key[:-2]}={1000 * value:.2f}ms"
+                    for key, value in result.items()
+                    if key.endswith("_s") and key != "latency_s"
+                )
+                + f"  set_volume_calls={result['set_volume_calls_per_apply']:.0f}"
+                + "  set_volume_calls_one_moved="
+                + f"{result['set_volume_calls_per_apply_one_moved']:.0f}"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 import yaml
 from serial.tools import list_ports
@@ -6,6 +7,8 @@ from .config_validator import ConfigValidator
 from pydantic import ValidationError
 from .config_exceptions import ConfigValidationError
 
+_REQUIRED = object()
+
 
 class ConfigManager(ConfigManagerProtocol):
     def __init__(self, config_path: Path, default_mapping_path: Path):
@@ -14,6 +17,9 @@ class ConfigManager(ConfigManagerProtocol):
         self.default_mapping_path = default_mapping_path
         self.config_data = {}
         self.validator = ConfigValidator(self.config_file_path)
+        # What the validated config was loaded from, to skip reloading an unchanged file
+        self._file_stat: tuple[int, int] | None = None  # Modification time and size
+        self._content_hash: str | None = None
 
     def ensure_config_exists(self) -> Path:
         """
@@ -24,27 +30,42 @@ class ConfigManager(ConfigManagerProtocol):
             self.config_file_path.touch(exist_ok=True)
             self.config_file_path.write_text(self.default_mapping_path.read_text())
 
-    def load_config(self ) -> None:
+    def load_config(self) -> None:
         """
-        Load and validate the YAML config file.
-        Raises ConfigValidationError if the configuration is invalid.
+        Load and validate the YAML config file, unless it did not change since the last
+        load. Raises ConfigValidationError if the configuration is invalid.
         """
-        try:
-            validated_config = self.validator.validate()
+        stat = self.config_file_path.stat()
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+        if file_stat == self._file_stat:
+            return
+
+        # Saving the file without changes only updates the modification time
+        content = self.config_file_path.read_text()
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        if content_hash != self._content_hash:
+            try:
+                validated_config = self.validator.validate(content)
+            except ValidationError as e:
+                raise ConfigValidationError(e)
             self.config_data = validated_config.model_dump()
-        except ValidationError as e:
-            raise ConfigValidationError(e)
+            self._content_hash = content_hash
+        self._file_stat = file_stat
 
-    def get_setting(self, path: str) -> str:
+    def get_setting(self, path: str, default=_REQUIRED) -> str:
         """
-        Get the value of a setting from the config file using dot notation.
-        Example: 'device.baudrate' will return the baudrate under the device section
+        Get the value of a setting from the config file using dot notation. Example:
+        'device.baudrate' will return the baudrate under the device section If a default
+        is given, it is returned instead of raising when the setting is missing or
+        empty.
         """
         keys = path.split(".")
         value = self.config_data
         for key in keys:
             if isinstance(value, dict):
                 if key not in value:
+                    if default is not _REQUIRED:
+                        return default
                     raise ValueError(
                         f"Setting {path} is not found in the configuration file."
                     )
@@ -55,15 +76,48 @@ class ConfigManager(ConfigManagerProtocol):
                 )
 
         if value is None:
+            if default is not _REQUIRED:
+                return default
             raise ValueError(f"Setting {path} is present but empty.")
         return value
 
-    def get_serial_port(self) -> str:
+    def get_devices(self) -> list[dict]:
+        """
+        Get the settings of every microcontroller, from the 'devices' list or the single
+        'device' section. Devices without an explicit offset are placed after the
+        previous device in the global slider index space.
+        """
+        devices = self.get_setting("devices", default=[]) or [
+            self.get_setting("device")
+        ]
+        next_offset = 0
+        resolved = []
+        for device in devices:
+            offset = device.get("offset")
+            if offset is None:
+                offset = next_offset
+            resolved.append({**device, "offset": offset})
+            next_offset = offset + int(device["sliders"])
+        return resolved
+
+    def get_slider_count(self) -> int:
+        """The number of sliders in the global slider index space, across devices"""
+        return max(
+            device["offset"] + int(device["sliders"]) for device in self.get_devices()
+        )
+
+    def get_serial_port(self, device: dict | None = None) -> str:
         """
         Try to find the serial port from the config file, first by device name.
         If the device name cannot be matched to a port, return the port specified in the config file.
+        Without a device, the single 'device' section is used.
         """
-        device_name = self.get_setting("device.name")
+        if device is None:
+            device_name = self.get_setting("device.name")
+            fallback_port = self.get_setting("device.port", default=None)
+        else:
+            device_name = device["name"]
+            fallback_port = device.get("port")
         ports = list_ports.comports()
 
         # Try to find port by device name first
@@ -72,12 +126,11 @@ class ConfigManager(ConfigManagerProtocol):
                 return port
 
         # Fall back to explicit port setting if device not found
-        try:
-            return self.get_setting("device.port")
-        except ValueError:
+        if fallback_port is None:
             raise ValueError(
                 "The config file does not contain the right device name or an appropriate port."
             )
+        return fallback_port
 
     @staticmethod
     def get_default_config_path() -> Path:
@@ -5,7 +5,9 @@ from pathlib import Path
 class ConfigManagerProtocol(Protocol):
     """Define the interface we expect from ConfigManager"""
 
-    def get_setting(self, text: str) -> str: ...
+    def get_setting(self, text: str, default=...) -> str: ...
     def load_config(self) -> None: ...
-    def get_serial_port(self) -> str: ...
+    def get_devices(self) -> list[dict]: ...
+    def get_slider_count(self) -> int: ...
+    def get_serial_port(self, device: dict | None = None) -> str: ...
     def get_default_config_path(self) -> Path: ...
@@ -1,5 +1,5 @@
-
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, model_validator
 
 
 class Device(BaseModel):
@@ -7,13 +7,151 @@ class Device(BaseModel):
     port: str
     baudrate: int
     sliders: int
+    protocol: Literal["ascii", "binary"] = "ascii"
+    resolution_bits: Literal[10, 12] = 10
+    drain_backlog: bool = True
+    read_timeout: float | None = None
+    sync_bandwidth_share: float = 0.25
+    # USB vendor id, identifies the device regardless of its port
+    vid: int | None = None
+    pid: int | None = None  # USB product id
+    serial_number: str | None = None  # Tells apart identical boards
+    # First global slider index of this device, defaults to after the previous device
+    offset: int | None = None
+
+    @property
+    def max_raw(self) -> int:
+        """The highest raw reading, like the frame decoder of the device reports it"""
+        return 1023 if self.protocol == "ascii" else (1 << self.resolution_bits) - 1
+
+    @model_validator(mode="after")
+    def check_sync_bandwidth_share(self) -> "Device":
+        if not 0 < self.sync_bandwidth_share <= 1:
+            raise ValueError("'sync_bandwidth_share' must be above 0 and at most 1")
+        return self
+
+
+class SliderSettings(BaseModel):
+    min: int = 0  # Raw reading at the bottom of the slider travel
+    max: int | None = None  # Raw reading at the top, defaults to the highest ADC value
+    dead_zone_low: float = 0.0  # Share of the travel at the bottom that stays at 0
+    dead_zone_high: float = 0.0  # Share of the travel at the top that stays at 1
+    inverted: bool | None = None  # Defaults to settings.inverted
+    curve: Literal["linear", "log"] | list[tuple[float, float]] = "linear"
+    deadband: int = 2  # Changes of at most this many raw counts are ignored as noise
+    # Exponential smoothing of the readings per 10 ms, 0 disables it, closer to 1
+    # smooths more
+    smoothing: float = 0.0
+    hysteresis: int = 0  # Reversals of at most this many raw counts are ignored
+    # Volume updates per second, defaults to 1 / settings.apply_interval
+    max_apply_rate: float | None = None
+
+    @model_validator(mode="after")
+    def check_calibration(self) -> "SliderSettings":
+        if self.max is not None and not 0 <= self.min < self.max:
+            raise ValueError("'min' must be at least 0 and below 'max'")
+        if (
+            self.dead_zone_low < 0
+            or self.dead_zone_high < 0
+            or self.dead_zone_low + self.dead_zone_high >= 1
+        ):
+            raise ValueError(
+                "Dead zones must be positive and cover less than the whole slider"
+            )
+        if self.deadband < 0 or self.hysteresis < 0:
+            raise ValueError("'deadband' and 'hysteresis' cannot be negative")
+        if self.max_apply_rate is not None and self.max_apply_rate <= 0:
+            raise ValueError("'max_apply_rate' must be positive")
+        if not 0 <= self.smoothing < 1:
+            raise ValueError("'smoothing' must be at least 0 and below 1")
+        if isinstance(self.curve, list):
+            positions = [position for position, _ in self.curve]
+            if len(positions) < 2 or len(set(positions)) != len(positions):
+                raise ValueError(
+                    "A custom curve needs at least two points with distinct positions"
+                )
+            if not all(0 <= value <= 1 for point in self.curve for value in point):
+                raise ValueError("Curve points must be between 0 and 1")
+        return self
+
 
 class Settings(BaseModel):
     inverted: bool
     system_in_unmapped: bool
     session_reload_interval: int
+    # "poll" checks every session_reload_interval
+    session_discovery: Literal["events", "poll"] = "events"
+    # With "events", poll this rarely to catch anything the events missed
+    session_safety_poll_interval: float = 30
+    sync_min_interval: float = 0.1
+    apply_interval: float = 0.01
+    volume_step: float = 0.01  # Volumes are rounded to this step, 0 disables rounding
+    volume_epsilon: float = 0.0  # Volume changes of at most this much are not applied
+    # Threads that set the volumes of large groups in parallel, 0 disables them
+    volume_workers: int = 0
+    # Groups of at least this many sessions use the volume workers
+    volume_worker_threshold: int = 16
+    # Follow volume changes made outside WaVeS, e.g. in the Windows mixer
+    track_volume_changes: bool = True
+
+    @model_validator(mode="after")
+    def check_settings(self) -> "Settings":
+        for name in (
+            "session_safety_poll_interval",
+            "sync_min_interval",
+            "apply_interval",
+        ):
+            if getattr(self, name) < 0:
+                raise ValueError(f"'{name}' cannot be negative")
+        if not 0 <= self.volume_step <= 1:
+            raise ValueError("'volume_step' must be between 0 and 1")
+        if self.volume_epsilon < 0:
+            raise ValueError("'volume_epsilon' cannot be negative")
+        if self.volume_workers < 0:
+            raise ValueError("'volume_workers' cannot be negative")
+        if self.volume_worker_threshold < 1:
+            raise ValueError("'volume_worker_threshold' must be at least 1")
+        return self
+
 
 class ConfigSchema(BaseModel):
     mappings: dict[int, list[str]]
-    device: Device
+    device: Device | None = None
+    devices: list[Device] = []
+    sliders: dict[int, SliderSettings] = {}
     settings: Settings
+
+    @model_validator(mode="after")
+    def check_devices(self) -> "ConfigSchema":
+        if self.device is None and not self.devices:
+            raise ValueError("Either 'device' or 'devices' must be specified")
+
+        # Sliders of different devices must not share a global index, like
+        # ConfigManager.get_devices places them
+        ranges = []
+        next_offset = 0
+        for device in self.devices or [self.device]:
+            offset = next_offset if device.offset is None else device.offset
+            ranges.append((offset, offset + device.sliders, device.name))
+            next_offset = offset + device.sliders
+
+            # Calibrations are checked against the ADC of the slider's device
+            for index in range(offset, offset + device.sliders):
+                slider = self.sliders.get(index)
+                if slider is None:
+                    continue
+                maximum = device.max_raw if slider.max is None else slider.max
+                if not slider.min < maximum <= device.max_raw:
+                    raise ValueError(
+                        f"The calibration of slider {index} needs "
+                        f"0 <= min < max <= {device.max_raw}, "
+                        f"the highest reading of '{device.name}'"
+                    )
+        ranges.sort()
+        for (_, end, name), (start, _, next_name) in zip(ranges, ranges[1:]):
+            if start < end:
+                raise ValueError(
+                    f"The sliders of devices '{name}' and '{next_name}' overlap, "
+                    "check their offsets"
+                )
+        return self
@@ -3,18 +3,21 @@ import yaml
 from pydantic import ValidationError
 from .config_schema import ConfigSchema
 from .config_exceptions import ConfigFileEmptyError
+
+
 class ConfigValidator:
     def __init__(self, config_path: Path):
         self.config_path = config_path
 
-    def validate(self) -> ConfigSchema:
+    def validate(self, content: str | None = None) -> ConfigSchema:
         """
-        Load and validate the configuration file.
+        Load and validate the configuration file, or `content` if it was read already.
         Returns the validated configuration if successful.
         Raises ValidationError if validation fails.
         """
-        with open(self.config_path) as f:
-            config_data = yaml.safe_load(f)
+        if content is None:
+            content = self.config_path.read_text()
+        config_data = yaml.safe_load(content)
         if config_data is None:
             raise ConfigFileEmptyError("Configuration file is empty")
-        return ConfigSchema(**config_data)
\ No newline at end of file
+        return ConfigSchema(**config_data)
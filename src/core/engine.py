@@ -0,0 +1,483 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from core.serial_reader import SerialReaderThread
+from core.session_discovery import SessionDiscovery
+from core.rate_limiter import SliderRateLimiter
+from core.slider_bank import SliderBank
+from core.sync_writer import SyncWriter
+from config.config_protocol import ConfigManagerProtocol
+from mapping.mapping_protocol import MappingManagerProtocol
+from microcontroller.microcontroller_protocol import MicrocontrollerProtocol
+from microcontroller.port_resolver import PortResolver
+from microcontroller.response_curve import ResponseCurve
+from microcontroller.slider_filter import SliderFilter
+from sessions.audio_event_protocol import AudioEventSourceProtocol
+from sessions.session_protocol import SessionManagerProtocol
+from sessions.sessions import Session
+from utils.logger import logger
+
+
+class Engine:
+    """Runs the volume pipeline as tasks on a single asyncio event loop.
+
+    The loop runs on its own thread, which owns serial reads, session discovery, volume
+    application and sync writes. It is the only thread that talks to the audio sessions,
+    which is why the session manager is created on it through `session_manager_factory`.
+    Other threads must only use the public methods of this class, which are thread-safe.
+
+    When a microcontroller disconnects, only its serial reads stop. The engine looks for
+    the same USB device again with exponential backoff and resumes reading once it is
+    back, while sessions, mapping and the other microcontrollers keep running.
+    """
+
+    RECONNECT_INITIAL_DELAY = 0.05
+    RECONNECT_MAX_DELAY = 5.0
+
+    def __init__(
+        self,
+        config_manager: ConfigManagerProtocol,
+        session_manager_factory: Callable[[], SessionManagerProtocol],
+        mapping_manager: MappingManagerProtocol,
+        microcontroller_managers: list[MicrocontrollerProtocol],
+        port_resolver: PortResolver,
+        audio_event_source: AudioEventSourceProtocol | None = None,
+        thread_initializer: Callable[[], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> None:
+        self.config_manager = config_manager
+        self.port_resolver = port_resolver
+        self.session_manager_factory = session_manager_factory
+        self.mapping_manager = mapping_manager
+        self.microcontroller_managers = microcontroller_managers
+        self.thread_initializer = thread_initializer
+        self.on_error = on_error
+        self.session_manager: SessionManagerProtocol | None = None
+        self.mapping = {}
+        self._slider_by_session: dict[Session, int] = {}
+
+        # New sessions and devices are found through audio events if available,
+        # otherwise by polling
+        self.session_discovery = SessionDiscovery(
+            check_for_changes=lambda: self.session_manager.check_for_changes(),
+            on_changes=self._reload_sessions,
+            event_source=audio_event_source,
+            poll_interval=self.config_manager.get_setting(
+                "settings.session_reload_interval"
+            ),
+            safety_poll_interval=self.config_manager.get_setting(
+                "settings.session_safety_poll_interval"
+            ),
+            invalidate=lambda: self.session_manager.invalidate_snapshot(),
+        )
+
+        # Every microcontroller publishes into a shared slider bank at its offset, and
+        # gets its own sync writer
+        self.devices = self.config_manager.get_devices()
+        self.slider_bank = SliderBank(
+            self.config_manager.get_slider_count(), notify=self._notify_sliders_changed
+        )
+        self.sync_writers: list[SyncWriter] = []
+        sync_min_interval = self.config_manager.get_setting(
+            "settings.sync_min_interval"
+        )
+        for device, microcontroller_manager in zip(
+            self.devices, self.microcontroller_managers
+        ):
+            self._connect(device, microcontroller_manager)
+            self.sync_writers.append(
+                SyncWriter(
+                    microcontroller_manager,
+                    baudrate=device["baudrate"],
+                    min_interval=sync_min_interval,
+                    bandwidth_share=device["sync_bandwidth_share"],
+                )
+            )
+
+        self.rate_limiter = SliderRateLimiter(
+            [0.0] * self.config_manager.get_slider_count()
+        )
+        self._slider_settings = None
+        self._update_slider_settings()
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._reader_filenos: dict[MicrocontrollerProtocol, int] = {}
+        self._serial_reader_threads: dict[
+            MicrocontrollerProtocol, SerialReaderThread
+        ] = {}
+        self._reconnect_tasks: set[asyncio.Task] = set()
+        self._thread = threading.Thread(target=self._run, name="Engine", daemon=True)
+        self._started = threading.Event()
+        self._stopping: asyncio.Event | None = None
+        self._sliders_changed: asyncio.Event | None = None
+
+    def _connect(
+        self, device: dict, microcontroller_manager: MicrocontrollerProtocol
+    ) -> None:
+        """Connect to a microcontroller. A board that is unavailable is looked for again
+        once the engine runs.
+        """
+        try:
+            port = self.port_resolver.resolve(device)
+            microcontroller_manager.connect(port, device["baudrate"])
+        except (ConnectionError, ValueError) as e:
+            logger.error(f"Could not connect to {device['name']}, waiting for it: {e}")
+
+    def _update_slider_settings(self) -> None:
+        """Compile the noise filter, calibration and curve of every slider, if they
+        changed since the last time
+        """
+        inverted = self.config_manager.get_setting("settings.inverted")
+        apply_interval = self.config_manager.get_setting("settings.apply_interval")
+        slider_settings = self.config_manager.get_setting("sliders", default={})
+        if (inverted, apply_interval, slider_settings) == self._slider_settings:
+            return
+        self._slider_settings = (inverted, apply_interval, slider_settings)
+        self.rate_limiter.set_min_intervals(
+            [
+                (
+                    1 / rate
+                    if (rate := slider_settings.get(index, {}).get("max_apply_rate"))
+                    else apply_interval
+                )
+                for index in range(len(self.rate_limiter.min_intervals))
+            ]
+        )
+        for device, microcontroller_manager in zip(
+            self.devices, self.microcontroller_managers
+        ):
+            max_raw = microcontroller_manager.max_raw
+            settings = [
+                slider_settings.get(device["offset"] + index, {})
+                for index in range(device["sliders"])
+            ]
+            microcontroller_manager.set_slider_filters(
+                [SliderFilter.from_settings(slider, max_raw) for slider in settings]
+            )
+            microcontroller_manager.set_response_curves(
+                [
+                    ResponseCurve.from_settings(slider, max_raw, inverted)
+                    for slider in settings
+                ]
+            )
+
+    # Thread-safe interface
+
+    def start(self) -> None:
+        """Start the event loop thread and wait until it accepts requests"""
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self) -> None:
+        """Stop the event loop and wait for it to shut down"""
+        logger.info("Stopping engine...")
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join()
+        for device, microcontroller_manager in zip(
+            self.devices, self.microcontroller_managers
+        ):
+            microcontroller_manager.close()
+            logger.info(
+                f"Serial statistics of {device['name']}: "
+                f"{microcontroller_manager.frame_stats}"
+            )
+        logger.info(
+            f"Applied {self.rate_limiter.values_applied} slider changes, "
+            f"held back and replaced {self.rate_limiter.values_coalesced}"
+        )
+        if self.session_manager is not None:
+            self.session_manager.close()
+            logger.info(
+                f"Dispatched {self.session_manager.volumes_dispatched} slider volumes, "
+                f"skipped {self.session_manager.volumes_skipped} unchanged"
+            )
+        logger.info("Engine stopped successfully")
+
+    def reload_mapping(self) -> None:
+        """Request the mapping to be rebuilt from the configuration file"""
+        self._loop.call_soon_threadsafe(self._reload_mapping)
+
+    def list_sessions_and_devices(self, timeout: float = 5.0) -> tuple[list, dict]:
+        """Get a snapshot of the current software sessions and devices"""
+
+        async def snapshot():
+            return list(self.session_manager.software_sessions), dict(
+                self.session_manager.devices
+            )
+
+        return asyncio.run_coroutine_threadsafe(snapshot(), self._loop).result(timeout)
+
+    # Everything below runs on the event loop thread
+
+    def _run(self) -> None:
+        if self.thread_initializer is not None:
+            self.thread_initializer()
+        asyncio.run(self._main())
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop.set_exception_handler(self._handle_loop_exception)
+        self._loop_thread_id = threading.get_ident()
+        self._stopping = asyncio.Event()
+        self._sliders_changed = asyncio.Event()
+        self._started.set()
+
+        logger.info("Entering engine event loop...")
+        tasks = []
+        try:
+            self.session_manager = self.session_manager_factory()
+            self.session_manager.on_volume_changed = self._on_volume_changed
+            # The config was loaded before the engine was created
+            self._reload_mapping(reload_config=False)
+            tasks.append(self._create_task(self._apply_volumes()))
+            tasks.append(self._create_task(self.session_discovery.run()))
+            for device, microcontroller_manager, sync_writer in zip(
+                self.devices, self.microcontroller_managers, self.sync_writers
+            ):
+                if microcontroller_manager.is_connected:
+                    self._start_serial_reads(device, microcontroller_manager)
+                else:
+                    self._handle_disconnect(device, microcontroller_manager)
+                tasks.append(self._create_task(sync_writer.run()))
+        except Exception as e:
+            self._report_error(e)
+
+        await self._stopping.wait()
+
+        tasks.extend(self._reconnect_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for microcontroller_manager in self.microcontroller_managers:
+            self._stop_serial_reads(microcontroller_manager)
+
+    def _create_task(self, coroutine) -> asyncio.Task:
+        async def supervised():
+            try:
+                await coroutine
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._report_error(e)
+
+        return asyncio.create_task(supervised())
+
+    def _report_error(self, error: Exception) -> None:
+        logger.error(f"Unhandled exception in engine: {error}")
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def _handle_loop_exception(
+        self, loop: asyncio.AbstractEventLoop, context: dict
+    ) -> None:
+        """Report errors raised by callbacks, e.g. a reload from another thread"""
+        if "exception" in context:
+            self._report_error(context["exception"])
+        else:
+            logger.error(f"Engine event loop error: {context['message']}")
+
+    def _start_serial_reads(
+        self, device: dict, microcontroller_manager: MicrocontrollerProtocol
+    ) -> None:
+        """Read the port when it becomes readable. Where the loop cannot wait on the
+        port, e.g. on Windows, fall back to a reader thread.
+        """
+        fileno = microcontroller_manager.fileno()
+        if fileno is not None:
+            try:
+                self._loop.add_reader(
+                    fileno, self._read_serial, device, microcontroller_manager
+                )
+                self._reader_filenos[microcontroller_manager] = fileno
+                return
+            except NotImplementedError:
+                pass
+        serial_reader = SerialReaderThread(
+            microcontroller_manager,
+            self.slider_bank,
+            offset=device["offset"],
+            name=f"SerialReader-{device['name']}",
+            on_disconnect=lambda: self._loop.call_soon_threadsafe(
+                self._handle_disconnect, device, microcontroller_manager
+            ),
+        )
+        self._serial_reader_threads[microcontroller_manager] = serial_reader
+        serial_reader.start()
+
+    def _stop_serial_reads(
+        self, microcontroller_manager: MicrocontrollerProtocol
+    ) -> None:
+        fileno = self._reader_filenos.pop(microcontroller_manager, None)
+        if fileno is not None:
+            self._loop.remove_reader(fileno)
+        serial_reader = self._serial_reader_threads.pop(microcontroller_manager, None)
+        if serial_reader is not None:
+            serial_reader.stop()
+            serial_reader.join(timeout=1.0)
+
+    def _read_serial(
+        self, device: dict, microcontroller_manager: MicrocontrollerProtocol
+    ) -> None:
+        values = microcontroller_manager.read_values(block=False)
+        if values:
+            self.slider_bank.publish(values, device["offset"])
+        elif not microcontroller_manager.is_connected:
+            self._handle_disconnect(device, microcontroller_manager)
+
+    def _handle_disconnect(
+        self, device: dict, microcontroller_manager: MicrocontrollerProtocol
+    ) -> None:
+        if self._stopping.is_set():
+            return
+        logger.warning(f"{device['name']} disconnected, trying to reconnect...")
+        self._stop_serial_reads(microcontroller_manager)
+        task = self._create_task(self._reconnect(device, microcontroller_manager))
+        self._reconnect_tasks.add(task)
+        task.add_done_callback(self._reconnect_tasks.discard)
+
+    async def _reconnect(
+        self, device: dict, microcontroller_manager: MicrocontrollerProtocol
+    ) -> None:
+        """Look for the same device again with exponential backoff, and resume reading
+        once it is back
+        """
+        # Listing the ports and opening one block, so they run on the default executor
+        loop = asyncio.get_running_loop()
+        delay = self.RECONNECT_INITIAL_DELAY
+        while True:
+            port = await loop.run_in_executor(
+                None, self.port_resolver.re_resolve, device
+            )
+            if port is not None:
+                try:
+                    await loop.run_in_executor(
+                        None, microcontroller_manager.connect, port, device["baudrate"]
+                    )
+                    break
+                except ConnectionError:
+                    pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+        logger.info(f"Reconnected to {device['name']} on {port}")
+        self._start_serial_reads(device, microcontroller_manager)
+
+    def _notify_sliders_changed(self) -> None:
+        if threading.get_ident() == self._loop_thread_id:
+            self._sliders_changed.set()
+        else:
+            self._loop.call_soon_threadsafe(self._sliders_changed.set)
+
+    def _reload_mapping(self, reload_config: bool = True) -> None:
+        """Rebuild the mapping. Only a reload by the user reads the config again."""
+        logger.info("Reloading mapping...")
+        if reload_config:
+            self.mapping = self.mapping_manager.get_mapping(
+                self.session_manager, self.config_manager
+            )
+        else:
+            self.mapping = self.mapping_manager.create_mappings(
+                self.session_manager, self.config_manager
+            )
+        self._slider_by_session = {
+            session: index
+            for index, group in self.mapping.items()
+            for session in group.sessions
+        }
+        self._update_slider_settings()
+        logger.info("Mapping reloaded successfully")
+        self._send_sync_message()
+        # Wake up the volume task so the new mapping gets the current slider values
+        self._sliders_changed.set()
+
+    def _on_volume_changed(self, session: Session, volume: float) -> None:
+        """Called from audio backend threads when a volume was changed outside WaVeS"""
+        try:
+            self._loop.call_soon_threadsafe(self._handle_volume_change, session, volume)
+        except RuntimeError:
+            pass  # The engine stopped
+
+    def _handle_volume_change(self, session: Session, volume: float) -> None:
+        index = self._slider_by_session.get(session)
+        if index is None:
+            return
+        self.mapping[index].update_volume(volume)
+        # The slider no longer matches the volume, so its next move has to be applied
+        self.session_manager.forget_applied_volume(index)
+        self._send_sync_message()
+
+    def _reload_sessions(self) -> None:
+        changes = self.session_manager.reload_sessions_and_devices()
+        if changes:
+            logger.info(
+                f"Sessions changed: {len(changes.added_sessions)} added, "
+                f"{len(changes.removed_sessions)} removed, "
+                f"devices changed: {len(changes.added_devices)} added, "
+                f"{len(changes.removed_devices)} removed"
+            )
+            self._reload_mapping(reload_config=False)
+
+    async def _apply_volumes(self) -> None:
+        latest_values = None
+        applied_values = ()
+        applied_mapping = None
+        while True:
+            # Wake up for new slider values, or when a held back value becomes due
+            next_due = self.rate_limiter.next_due()
+            try:
+                await asyncio.wait_for(
+                    self._sliders_changed.wait(),
+                    (
+                        None
+                        if next_due is None
+                        else max(0.0, next_due - self._loop.time())
+                    ),
+                )
+            except TimeoutError:
+                pass
+            self._sliders_changed.clear()
+            values = self.slider_bank.take(timeout=0)
+            if values is not None:
+                latest_values = values
+            if latest_values is None:
+                continue
+
+            # A new mapping needs every known slider applied again, otherwise only the
+            # sliders that moved
+            mapping = self.mapping
+            if mapping is not applied_mapping:
+                applied_values = ()
+                applied_mapping = mapping
+            self.rate_limiter.submit(
+                {
+                    index: value
+                    for index, value in enumerate(latest_values)
+                    if value is not None
+                    and (index >= len(applied_values) or applied_values[index] != value)
+                }
+            )
+            applied_values = latest_values
+
+            due_values = self.rate_limiter.take_due(self._loop.time())
+            if not due_values:
+                continue
+            expired = self.session_manager.apply_volumes(
+                values=due_values, mapping=mapping
+            )
+            if expired:
+                # Remove the sessions of closed applications before the next poll
+                self.session_discovery.request_check()
+            self._send_sync_message()
+
+    def _send_sync_message(self) -> None:
+        """Queue a sync message to each board, written if its volumes changed"""
+        current_volumes = [
+            session_group.get_volume() for session_group in self.mapping.values()
+        ]
+        for device, sync_writer in zip(self.devices, self.sync_writers):
+            offset = device["offset"]
+            volumes = current_volumes[offset : offset + device["sliders"]]
+            # Wait until the volume of every slider of the board is known
+            if None not in volumes:
+                sync_writer.submit(volumes)
@@ -0,0 +1,37 @@
+from PyQt5 import QtCore
+from core.engine import Engine
+from ui.error_dialog import ErrorDialog
+
+
+class EngineBridge(QtCore.QObject):
+    """Connects the Qt GUI thread to the engine's event loop.
+
+    The GUI only talks to the engine through this object. Errors raised on the engine
+    thread are delivered to the GUI thread through a queued signal, so the error dialog
+    is shown from there.
+    """
+
+    error_occurred = QtCore.pyqtSignal(object)
+
+    def __init__(self, engine: Engine, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self.engine = engine
+        self.engine.on_error = self.error_occurred.emit
+        self.error_occurred.connect(self._show_error)
+
+    def start(self) -> None:
+        self.engine.start()
+
+    def stop(self) -> None:
+        self.engine.stop()
+
+    @QtCore.pyqtSlot()
+    def reload_mapping(self) -> None:
+        self.engine.reload_mapping()
+
+    def list_sessions_and_devices(self) -> tuple[list, dict]:
+        return self.engine.list_sessions_and_devices()
+
+    @QtCore.pyqtSlot(object)
+    def _show_error(self, error: BaseException) -> None:
+        ErrorDialog._exception_hook(type(error), error, error.__traceback__)
@@ -0,0 +1,50 @@
+class SliderRateLimiter:
+    """Limits how often the volume of each slider is applied.
+
+    Changes that arrive before a slider may be applied again are held back, and a newer
+    change replaces the held one. Held changes become due once the slider's interval has
+    passed, so the final position of a slider is always applied, at most one interval
+    late.
+    """
+
+    def __init__(self, min_intervals: list[float]) -> None:
+        self.min_intervals = list(min_intervals)
+        self._next_allowed = [float("-inf")] * len(min_intervals)
+        self._pending: dict[int, float] = {}
+        self.values_applied = 0
+        # Held changes replaced by a newer one, i.e. volume calls saved
+        self.values_coalesced = 0
+
+    def set_min_intervals(self, min_intervals: list[float]) -> None:
+        if len(min_intervals) != len(self.min_intervals):
+            raise ValueError(
+                f"Expected {len(self.min_intervals)} intervals, "
+                f"got {len(min_intervals)}"
+            )
+        self.min_intervals = list(min_intervals)
+
+    def submit(self, values: dict[int, float]) -> None:
+        """Queue the latest values of the sliders that changed"""
+        for index, value in values.items():
+            if index in self._pending:
+                self.values_coalesced += 1
+            self._pending[index] = value
+
+    def take_due(self, now: float) -> dict[int, float]:
+        """Remove and return the queued values that may be applied at `now`"""
+        due = {
+            index: value
+            for index, value in self._pending.items()
+            if self._next_allowed[index] <= now
+        }
+        for index in due:
+            del self._pending[index]
+            self._next_allowed[index] = now + self.min_intervals[index]
+        self.values_applied += len(due)
+        return due
+
+    def next_due(self) -> float | None:
+        """When the next queued value may be applied, or None if nothing is queued"""
+        if not self._pending:
+            return None
+        return min(self._next_allowed[index] for index in self._pending)
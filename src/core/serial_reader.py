@@ -0,0 +1,49 @@
+import threading
+from collections.abc import Callable
+from core.slider_bank import SliderBank
+from microcontroller.microcontroller_protocol import MicrocontrollerProtocol
+from utils.logger import logger
+
+
+class SerialReaderThread(threading.Thread):
+    """Continuously drains the serial port of one microcontroller and publishes its
+    slider values.
+
+    Values are published into the bank at the microcontroller's offset in the global
+    slider index space. Every microcontroller gets its own reader, and none of them
+    touch COM, so a slow board or slow volume calls cannot stall the serial reads of
+    another board. The reader exits when the connection is lost and reports it through
+    `on_disconnect`.
+    """
+
+    def __init__(
+        self,
+        microcontroller_manager: MicrocontrollerProtocol,
+        slider_bank: SliderBank,
+        offset: int = 0,
+        name: str = "SerialReader",
+        on_disconnect: Callable[[], None] | None = None,
+    ) -> None:
+        super().__init__(name=name, daemon=True)
+        self.microcontroller_manager = microcontroller_manager
+        self.slider_bank = slider_bank
+        self.offset = offset
+        self.on_disconnect = on_disconnect
+        self.running = True
+
+    def run(self) -> None:
+        logger.info(f"Entering serial reader loop ({self.name})...")
+        while self.running:
+            values = self.microcontroller_manager.read_values()
+            if values:
+                self.slider_bank.publish(values, self.offset)
+            elif not self.microcontroller_manager.is_connected:
+                if self.running and self.on_disconnect is not None:
+                    self.on_disconnect()
+                break
+        logger.info(f"Serial reader stopped ({self.name})")
+
+    def stop(self) -> None:
+        self.running = False
+        # Reads block until data arrives, so wake up a pending read
+        self.microcontroller_manager.cancel_read()
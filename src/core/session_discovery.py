@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Callable
+from sessions.audio_event_protocol import AudioEventSourceProtocol
+from sessions.audio_events import AudioEvent
+from utils.logger import logger
+
+
+class SessionDiscovery:
+    """Decides when the audio sessions and devices are enumerated again.
+
+    Without an event source, they are polled every `poll_interval` seconds. With one,
+    they are enumerated shortly after an event, and only polled every
+    `safety_poll_interval` seconds to catch anything the events missed, such as sessions
+    that ended. Events that arrive within `debounce` seconds of each other are handled
+    together, e.g. a browser opening several sessions. `invalidate` is called on every
+    event, to drop enumerations that the event made stale.
+    """
+
+    def __init__(
+        self,
+        check_for_changes: Callable[[], bool],
+        on_changes: Callable[[], None],
+        event_source: AudioEventSourceProtocol | None = None,
+        poll_interval: float = 1.0,
+        safety_poll_interval: float = 30.0,
+        debounce: float = 0.05,
+        invalidate: Callable[[], None] | None = None,
+    ) -> None:
+        self.check_for_changes = check_for_changes
+        self.on_changes = on_changes
+        self.event_source = event_source
+        self.poll_interval = poll_interval
+        self.safety_poll_interval = safety_poll_interval
+        self.debounce = debounce
+        self.invalidate = invalidate
+        self.events_received = 0
+        self.polls = 0
+        self.changes_found = 0
+        self._event_pending: asyncio.Event | None = None
+
+    def _start_event_source(self, loop: asyncio.AbstractEventLoop) -> bool:
+        if self.event_source is None:
+            return False
+        try:
+            self.event_source.start(
+                lambda event: loop.call_soon_threadsafe(self._handle_event, event)
+            )
+        except Exception as e:
+            logger.warning(f"Could not subscribe to audio events, polling instead: {e}")
+            return False
+        return True
+
+    def _handle_event(self, event: AudioEvent) -> None:
+        logger.debug(f"Audio event: {event}")
+        self.events_received += 1
+        if self.invalidate is not None:
+            self.invalidate()
+        self._event_pending.set()
+
+    def request_check(self) -> None:
+        """Check for changes soon, e.g. because a session turned out to be gone. Call on
+        the event loop.
+        """
+        if self._event_pending is not None:
+            self._event_pending.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._event_pending = asyncio.Event()
+        event_driven = self._start_event_source(loop)
+        interval = self.safety_poll_interval if event_driven else self.poll_interval
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._event_pending.wait(), interval)
+                    await asyncio.sleep(self.debounce)
+                except TimeoutError:
+                    self.polls += 1
+                self._event_pending.clear()
+                try:
+                    if self.check_for_changes():
+                        self.changes_found += 1
+                        self.on_changes()
+                except Exception as e:
+                    # E.g. an enumeration that failed while a device was being removed
+                    logger.error(
+                        f"Could not update the audio sessions, trying again later: {e}"
+                    )
+        finally:
+            if event_driven:
+                self.event_source.stop()
@@ -0,0 +1,50 @@
+import itertools
+import threading
+from collections.abc import Callable
+
+
+class SliderBank:
+    """The global slider state, written by one serial reader per microcontroller.
+
+    Each reader owns a disjoint range of slider indices starting at its offset, so
+    readers never contend with each other and publishing needs no lock. The consumer
+    takes a snapshot of all sliders whenever any reader published something new.
+    `notify` is called after every publish, on the publishing thread.
+    """
+
+    def __init__(
+        self, n_sliders: int, notify: Callable[[], None] | None = None
+    ) -> None:
+        self.notify = notify
+        self._values: list[float | None] = [None] * n_sliders
+        self._sequence = itertools.count(1)
+        self._published_sequence = 0
+        self._taken_sequence = 0
+        self._event = threading.Event()
+
+    def publish(self, values: dict[int, float], offset: int = 0) -> None:
+        """Store the values of one microcontroller, by its local slider index"""
+        for index, value in values.items():
+            self._values[offset + index] = value
+        self._published_sequence = next(self._sequence)
+        self._event.set()
+        if self.notify is not None:
+            self.notify()
+
+    def take(self, timeout: float | None = None) -> tuple[float | None, ...] | None:
+        """Wait for new values and return a snapshot of all sliders, or None on timeout
+        or wake-up without new values
+        """
+        if not self._event.wait(timeout):
+            return None
+        # Clear before reading: a publish that races with us sets the event again.
+        self._event.clear()
+        sequence = self._published_sequence
+        if sequence == self._taken_sequence:
+            return None
+        self._taken_sequence = sequence
+        return tuple(self._values)
+
+    def wake(self) -> None:
+        """Unblock a waiting consumer, e.g. when shutting down or the mapping changed"""
+        self._event.set()
@@ -0,0 +1,66 @@
+import asyncio
+from microcontroller.microcontroller_protocol import MicrocontrollerProtocol
+from utils.logger import logger
+
+
+class SyncWriter:
+    """Sends sync messages to the microcontroller as a task on the engine's event loop.
+
+    Submitted volumes are coalesced, so only the latest values are sent, and only when
+    the encoded message differs from the last one that was sent. Writes are spaced at
+    least `min_interval` seconds apart and limited to `bandwidth_share` of the link's
+    capacity, so sync traffic cannot starve the incoming slider frames at low baud
+    rates.
+    """
+
+    def __init__(
+        self,
+        microcontroller_manager: MicrocontrollerProtocol,
+        baudrate: int,
+        min_interval: float = 0.1,
+        bandwidth_share: float = 0.25,
+    ) -> None:
+        self.microcontroller_manager = microcontroller_manager
+        self.min_interval = min_interval
+        # Serial frames take 10 bits per byte (start bit, 8 data bits, stop bit)
+        self.byte_budget = bandwidth_share * baudrate / 10
+        self.messages_sent = 0
+        self.messages_unchanged = 0
+        self._pending: tuple[float, ...] | None = None
+        self._event = asyncio.Event()
+        self._last_payload: bytes | None = None
+        self._next_write = 0.0
+
+    def submit(self, values: list[float]) -> None:
+        """Queue the current volumes. Never blocks; newer values replace queued ones."""
+        self._pending = tuple(values)
+        self._event.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._event.wait()
+
+            # Wait for the rate limit; values submitted meanwhile supersede these
+            delay = self._next_write - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._event.clear()
+            values = list(self._pending)
+
+            try:
+                payload = self.microcontroller_manager.encode_sync_message(values)
+            except ValueError as e:
+                logger.error(f"Invalid sync values: {e}")
+                continue
+            if payload == self._last_payload:
+                self.messages_unchanged += 1
+                continue
+
+            # A dropped message is sent again with the next values, even if unchanged
+            if self.microcontroller_manager.send_sync_message(values):
+                self._last_payload = payload
+                self.messages_sent += 1
+            self._next_write = loop.time() + max(
+                self.min_interval, len(payload) / self.byte_budget
+            )
@@ -2,7 +2,7 @@ import sys
 from PyQt5 import QtWidgets
 from PyQt5.QtGui import QIcon
 import utils.utils as utils
-from core.volume_thread import VolumeThread
+from core.engine_bridge import EngineBridge
 import webbrowser
 from ui.listing_dialog import ListingDialog
 
@@ -10,11 +10,11 @@ from ui.listing_dialog import ListingDialog
 class SystemTrayIcon(QtWidgets.QSystemTrayIcon):
 
     def __init__(
-        self, icon: QIcon, volume_thread: VolumeThread, parent: QtWidgets.QWidget
+        self, icon: QIcon, engine_bridge: EngineBridge, parent: QtWidgets.QWidget
     ):
         QtWidgets.QSystemTrayIcon.__init__(self, icon, parent)
         self.icon = icon
-        self.volume_thread = volume_thread  # Injected dependency
+        self.engine_bridge = engine_bridge  # Injected dependency
         self.setToolTip("WaVeS")
 
         # Setup the error window
@@ -25,7 +25,7 @@ class SystemTrayIcon(QtWidgets.QSystemTrayIcon):
         menu = QtWidgets.QMenu(parent)
 
         reload_ = menu.addAction("Reload mapping")
-        reload_.triggered.connect(self.volume_thread.reload_mapping)
+        reload_.triggered.connect(self.engine_bridge.reload_mapping)
 
         list_apps = menu.addAction("List sessions and devices")
         list_apps.triggered.connect(self.list_sessions_and_devices)
@@ -45,20 +45,18 @@ class SystemTrayIcon(QtWidgets.QSystemTrayIcon):
 
     def on_click(self, reason):
         if reason == self.Trigger:  # LMB
-            self.volume_thread.reload_mapping()
+            self.engine_bridge.reload_mapping()
 
     def exit(self):
-        self.volume_thread.stop()
-        self.volume_thread.wait()
+        self.engine_bridge.stop()
         sys.exit(0)
 
     def start_app(self):
-        self.volume_thread.start()
+        self.engine_bridge.start()
 
     def list_sessions_and_devices(self):
         """Show a dialog with all sessions and devices currently in the Windows Volume mixer"""
-        software_sessions = self.volume_thread.session_manager.software_sessions
-        devices = self.volume_thread.session_manager.devices
+        software_sessions, devices = self.engine_bridge.list_sessions_and_devices()
 
         # Create and show the dialog
         dialog = ListingDialog(software_sessions, devices)
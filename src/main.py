@@ -8,12 +8,17 @@ from utils.logger import logger
 from core.tray_icon import SystemTrayIcon
 from config.config_manager import ConfigManager
 from sessions.session_manager import SessionManager
+from sessions.pycaw_backend import PycawBackend
+from sessions.volume_pool import VolumeWorkerPool
 from mapping.mapping_manager import MappingManager
-from core.volume_thread import VolumeThread
+from core.engine import Engine
+from core.engine_bridge import EngineBridge
 from microcontroller.microcontroller_manager import MicrocontrollerManager
+from microcontroller.port_resolver import PortResolver
 from ui.error_dialog import ErrorDialog
 from ui.welcome_dialog import WelcomeDialog
 
+
 def signal_handler(signum, frame):
     """Handle Ctrl+C gracefully"""
     logger.info("Closing application...")
@@ -22,12 +27,12 @@ def signal_handler(signum, frame):
 
 def setup_gui(
     w: QtWidgets.QWidget,
-    volume_thread: VolumeThread,
+    engine_bridge: EngineBridge,
 ):
     tray_icon = SystemTrayIcon(
         icon=QtGui.QIcon(utils.get_icon_path().as_posix()),
         parent=w,
-        volume_thread=volume_thread,
+        engine_bridge=engine_bridge,
     )
     tray_icon.show()
     tray_icon.start_app()
@@ -36,13 +41,13 @@ def setup_gui(
 
 def main():
     logger.info("Starting WaVeS application")
-    
+
     # Set up signal handling for Ctrl+C
     signal.signal(signal.SIGINT, signal_handler)
 
     # Set up the application before the timer, because it requires a QThread instance.
     app = QtWidgets.QApplication(sys.argv)
-    
+
     sys.excepthook = ErrorDialog._exception_hook
 
     # Enable processing of keyboard interrupts in the Qt event loop
@@ -62,31 +67,72 @@ def main():
     except FileNotFoundError:
         logger.warning("Configuration file not found, creating default configuration")
         config_manager.ensure_config_exists()
+        config_manager.load_config()
         welcome_dialog = WelcomeDialog(config_path)
-        
+
         webbrowser.open(config_path)
 
     logger.info("Initializing managers and services")
-    session_manager = SessionManager()
     mapping_manager = MappingManager()
 
-    n_sliders = int(config_manager.get_setting("device.sliders"))
-    microcontroller_manager = MicrocontrollerManager(n_sliders=n_sliders)
-    volume_thread = VolumeThread(
+    microcontroller_managers = [
+        MicrocontrollerManager(
+            n_sliders=int(device["sliders"]),
+            protocol=device["protocol"],
+            resolution_bits=int(device["resolution_bits"]),
+            drain_backlog=device["drain_backlog"],
+            read_timeout=device["read_timeout"],
+        )
+        for device in config_manager.get_devices()
+    ]
+    # The session manager is created on the engine thread, which initializes COM
+    audio_backend = PycawBackend()
+    volume_workers = config_manager.get_setting("settings.volume_workers")
+    volume_pool = (
+        VolumeWorkerPool(
+            initializer=audio_backend.initialize_thread,
+            uninitializer=audio_backend.uninitialize_thread,
+            workers=volume_workers,
+            threshold=config_manager.get_setting("settings.volume_worker_threshold"),
+        )
+        if volume_workers
+        else None
+    )
+    engine = Engine(
         config_manager=config_manager,
-        session_manager=session_manager,
+        session_manager_factory=lambda: SessionManager(
+            audio_backend,
+            volume_step=config_manager.get_setting("settings.volume_step"),
+            volume_epsilon=config_manager.get_setting("settings.volume_epsilon"),
+            volume_pool=volume_pool,
+            volume_changes=(
+                audio_backend.create_volume_change_source()
+                if config_manager.get_setting("settings.track_volume_changes")
+                else None
+            ),
+        ),
         mapping_manager=mapping_manager,
-        microcontroller_manager=microcontroller_manager,
+        microcontroller_managers=microcontroller_managers,
+        port_resolver=PortResolver(
+            config_path / "port_cache.json", fallback=config_manager.get_serial_port
+        ),
+        audio_event_source=(
+            audio_backend.create_event_source()
+            if config_manager.get_setting("settings.session_discovery") == "events"
+            else None
+        ),
+        thread_initializer=audio_backend.initialize_thread,
     )
+    engine_bridge = EngineBridge(engine)
     # Create a widet to persist the tray icon. Not assigning it to a variable won't crash the app,
     # but it won't show the icon in the system tray.
     widget = QtWidgets.QWidget()
 
-    # Create tray icon variable to persist volume thread. Not assigning it to a variable
-    # will cause it to be garbage collected.
+    # Create tray icon variable to persist the engine bridge. Not assigning it to a
+    # variable will cause it to be garbage collected.
     tray_icon = setup_gui(
         widget,
-        volume_thread,
+        engine_bridge,
     )
 
     logger.info("Application started successfully")
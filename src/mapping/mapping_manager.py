@@ -4,6 +4,7 @@ from mapping.mapping_protocol import MappingManagerProtocol
 from sessions.sessions import Session, Device, SessionGroup
 from utils.logger import logger
 
+
 class MappingManager(MappingManagerProtocol):
     def __init__(self):
         pass
@@ -24,8 +25,9 @@ class MappingManager(MappingManagerProtocol):
         config_manager: ConfigManagerProtocol,
     ) -> dict[int, list[Session | Device]]:
 
-        sliders = int(config_manager.get_setting("device.sliders"))
+        sliders = config_manager.get_slider_count()
         session_dict = {i: [] for i in range(sliders)}
+        self._reset_mapped(session_manager)
         mappings = config_manager.get_setting("mappings")
 
         # Process each target mapping
@@ -50,6 +52,13 @@ class MappingManager(MappingManagerProtocol):
         session_group_dict = {i: SessionGroup(session_dict[i]) for i in range(sliders)}
         return session_group_dict
 
+    def _reset_mapped(self, session_manager: SessionManagerProtocol) -> None:
+        """Sessions outlive a mapping, so forget where the previous mapping put them"""
+        session_manager.master_session.mark_as_mapped(False)
+        session_manager.system_session.mark_as_mapped(False)
+        for session in session_manager.software_sessions:
+            session.mark_as_mapped(False)
+
     def _add_single_target_mapping(
         self,
         target: str,
@@ -66,11 +75,10 @@ class MappingManager(MappingManagerProtocol):
         elif target.startswith("device:"):
             session_dict[idx].append(session_manager.get_device_session(target[7:]))
         elif target != "unmapped":
-            # Find the software session that matches the target, and add it to the session_dict
-            for session in session_manager.software_sessions:
-                if target.lower() in session.name.lower():
-                    session_dict[idx].append(session)
-                    session.mark_as_mapped(True)
+            # Add the software sessions that match the target to the session_dict
+            for session in session_manager.find_software_sessions(target):
+                session_dict[idx].append(session)
+                session.mark_as_mapped(True)
 
     def _add_unmapped_sessions(
         self,
@@ -0,0 +1,278 @@
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+from utils.logger import logger
+
+# Binary frames are laid out as:
+#   [SYNC][COUNT][packed values, MSB first, zero padded to a whole byte][CRC-8]
+# or, for sparse updates carrying only the sliders that moved, with COUNT's top bit set:
+#   [SYNC][0x80 | COUNT][COUNT slider indices][packed values][CRC-8]
+# The CRC covers everything between SYNC and the CRC (polynomial 0x07, initial 0x00).
+#
+# ASCII frames are either full keyframes, "<val>|<val>|<val>", or sparse updates,
+# "<index>:<val>|<index>:<val>".
+SYNC_BYTE = 0xA5
+SPARSE_FLAG = 0x80
+MAX_BINARY_SLIDERS = 0x7F
+MAX_ASCII_LINE_LENGTH = 1024
+
+
+def _build_crc8_table(polynomial: int = 0x07) -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC8_TABLE = _build_crc8_table()
+
+
+def crc8(data: Iterable[int]) -> int:
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def pack_values(values: list[int], resolution_bits: int) -> bytes:
+    """Pack unsigned integers into a big-endian stream of `resolution_bits` each."""
+    accumulator = 0
+    for value in values:
+        accumulator = (accumulator << resolution_bits) | value
+    n_bits = len(values) * resolution_bits
+    n_bytes = (n_bits + 7) // 8
+    accumulator <<= n_bytes * 8 - n_bits
+    return accumulator.to_bytes(n_bytes, "big")
+
+
+def unpack_values(payload: bytes, count: int, resolution_bits: int) -> list[int]:
+    """Inverse of `pack_values`."""
+    accumulator = int.from_bytes(payload, "big") >> (
+        len(payload) * 8 - count * resolution_bits
+    )
+    mask = (1 << resolution_bits) - 1
+    return [
+        (accumulator >> (resolution_bits * (count - 1 - i))) & mask
+        for i in range(count)
+    ]
+
+
+def encode_binary_frame(
+    values: list[int], resolution_bits: int = 10, indices: list[int] | None = None
+) -> bytes:
+    """Build a binary slider frame. This mirrors what the firmware is expected to send.
+
+    Without indices, this is a keyframe carrying every slider. With indices, it is a
+    sparse update where values[i] belongs to slider indices[i].
+    """
+    if not 0 < len(values) <= MAX_BINARY_SLIDERS:
+        raise ValueError(
+            f"A frame holds 1 to {MAX_BINARY_SLIDERS} values, got {len(values)}"
+        )
+    if not all(0 <= value < (1 << resolution_bits) for value in values):
+        raise ValueError(f"Values must fit in {resolution_bits} bits")
+    if indices is None:
+        header = bytes([len(values)])
+    elif len(indices) != len(values) or not all(0 <= i <= 0xFF for i in indices):
+        raise ValueError("Every value needs exactly one slider index between 0 and 255")
+    else:
+        header = bytes([SPARSE_FLAG | len(values)]) + bytes(indices)
+    body = header + pack_values(values, resolution_bits)
+    return bytes([SYNC_BYTE]) + body + bytes([crc8(body)])
+
+
+@dataclass
+class FrameStats:
+    """Counters of incoming serial frames, so corrupted data is not silently dropped."""
+
+    frames_decoded: int = 0
+    invalid_frames: int = 0  # Unparsable ASCII lines
+    length_errors: int = 0  # Keyframes carrying the wrong number of sliders
+    index_errors: int = 0  # Sparse updates for sliders that do not exist
+    crc_errors: int = 0
+    sync_errors: int = 0  # Bytes discarded while searching for the start of a frame
+    overflow_errors: int = 0  # Partial frames dropped because they grew too large
+    # Stale frames superseded by a newer one while draining the backlog
+    frames_skipped: int = 0
+    # Older sparse updates folded into a newer frame while draining the backlog
+    frames_merged: int = 0
+    # Slider readings dropped as noise, each one a volume change that was not applied
+    values_filtered: int = 0
+    frames_filtered: int = 0  # Frames that only carried noise
+
+    @property
+    def frame_errors(self) -> int:
+        return (
+            self.invalid_frames
+            + self.length_errors
+            + self.index_errors
+            + self.crc_errors
+            + self.overflow_errors
+        )
+
+
+def _check_indices(values: dict[int, float], n_sliders: int, stats: FrameStats) -> bool:
+    if all(0 <= index < n_sliders for index in values):
+        return True
+    stats.index_errors += 1
+    return False
+
+
+def _parse_ascii_value(value: str) -> float:
+    """Parse one reading, rejecting "nan" and "inf", which float() accepts"""
+    reading = float(value)
+    if not math.isfinite(reading):
+        raise ValueError(f"Reading is not finite: {value}")
+    return reading
+
+
+class AsciiFrameDecoder:
+    """Decodes newline terminated keyframes, "<val>|<val>|<val>", and sparse updates,
+    "<index>:<val>|<index>:<val>".
+    """
+
+    def __init__(self, n_sliders: int, stats: FrameStats) -> None:
+        self.n_sliders = n_sliders
+        self.stats = stats
+        self.max_raw = 1023
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Buffer incoming bytes and return the complete frames, oldest first."""
+        self._buffer.extend(data)
+        *lines, rest = self._buffer.split(b"\n")
+        if len(rest) > MAX_ASCII_LINE_LENGTH:
+            self.stats.overflow_errors += 1
+            rest = b""
+        self._buffer = bytearray(rest)
+        return [bytes(line.rstrip(b"\r")) for line in lines if line.strip()]
+
+    def decode(self, frame: bytes) -> dict[int, float] | None:
+        """Parse a frame into raw values by slider index, or None if it is invalid."""
+        # Creating a QMessageBox can disrupt the data flow and cause UnicodeDecodeError.
+        try:
+            data = str(frame, "utf-8")
+            if ":" in data:
+                values = {}
+                for item in data.split("|"):
+                    index, value = item.split(":")
+                    values[int(index)] = _parse_ascii_value(value)
+            else:
+                values = [_parse_ascii_value(val) for val in data.split("|")]
+        except (UnicodeDecodeError, ValueError):
+            logger.warning(f"Invalid data: {frame!r}")
+            self.stats.invalid_frames += 1
+            return None
+
+        if isinstance(values, dict):
+            if not _check_indices(values, self.n_sliders, self.stats):
+                return None
+        elif len(values) != self.n_sliders:
+            self.stats.length_errors += 1
+            return None
+        else:
+            values = dict(enumerate(values))
+
+        self.stats.frames_decoded += 1
+        return values
+
+    def reset(self) -> None:
+        self._buffer.clear()
+
+
+class BinaryFrameDecoder:
+    """Decodes the framed binary protocol described at the top of this module.
+
+    The CRC is verified while framing, so a corrupted byte only costs the frame it is
+    in: the decoder resynchronises on the next sync byte instead of dropping the stream.
+    """
+
+    def __init__(
+        self, n_sliders: int, stats: FrameStats, resolution_bits: int = 10
+    ) -> None:
+        if resolution_bits not in (10, 12):
+            raise ValueError(f"Unsupported resolution: {resolution_bits} bits")
+        self.n_sliders = n_sliders
+        self.stats = stats
+        self.resolution_bits = resolution_bits
+        self.max_raw = (1 << resolution_bits) - 1
+        self._buffer = bytearray()
+
+    def _frame_length(self, header: int) -> int:
+        count = header & MAX_BINARY_SLIDERS
+        n_indices = count if header & SPARSE_FLAG else 0
+        return 2 + n_indices + (count * self.resolution_bits + 7) // 8 + 1
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Buffer bytes and return complete, CRC checked frames, oldest first."""
+        buffer = self._buffer
+        buffer.extend(data)
+        frames = []
+        start = 0
+        while True:
+            sync = buffer.find(SYNC_BYTE, start)
+            if sync < 0:
+                self.stats.sync_errors += len(buffer) - start
+                start = len(buffer)
+                break
+            self.stats.sync_errors += sync - start
+            start = sync
+            if len(buffer) - start < 2:
+                break
+            header = buffer[start + 1]
+            if not header & MAX_BINARY_SLIDERS:
+                self.stats.sync_errors += 1
+                start += 1
+                continue
+            end = start + self._frame_length(header)
+            if len(buffer) < end:
+                break
+            if crc8(buffer[start + 1 : end - 1]) != buffer[end - 1]:
+                # The sync byte may have been payload; resume the search right after it.
+                self.stats.crc_errors += 1
+                start += 1
+                continue
+            frames.append(bytes(buffer[start:end]))
+            start = end
+        del buffer[:start]
+        return frames
+
+    def decode(self, frame: bytes) -> dict[int, int] | None:
+        """Unpack a frame returned by `feed` into raw values by slider index."""
+        header = frame[1]
+        count = header & MAX_BINARY_SLIDERS
+        if header & SPARSE_FLAG:
+            indices = frame[2 : 2 + count]
+            values = dict(
+                zip(
+                    indices,
+                    unpack_values(frame[2 + count : -1], count, self.resolution_bits),
+                )
+            )
+            if not _check_indices(values, self.n_sliders, self.stats):
+                return None
+        elif count != self.n_sliders:
+            self.stats.length_errors += 1
+            return None
+        else:
+            values = dict(
+                enumerate(unpack_values(frame[2:-1], count, self.resolution_bits))
+            )
+        self.stats.frames_decoded += 1
+        return values
+
+    def reset(self) -> None:
+        self._buffer.clear()
+
+
+def create_frame_decoder(
+    protocol: str, n_sliders: int, stats: FrameStats, resolution_bits: int = 10
+) -> AsciiFrameDecoder | BinaryFrameDecoder:
+    if protocol == "ascii":
+        return AsciiFrameDecoder(n_sliders, stats)
+    if protocol == "binary":
+        return BinaryFrameDecoder(n_sliders, stats, resolution_bits)
+    raise ValueError(f"Unknown serial protocol: {protocol}")
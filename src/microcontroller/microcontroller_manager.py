@@ -1,18 +1,66 @@
+import time
+from collections import deque
 import serial
 from microcontroller.microcontroller_protocol import MicrocontrollerProtocol
+from microcontroller.frame_protocol import FrameStats, create_frame_decoder
+from microcontroller.response_curve import ResponseCurve
+from microcontroller.slider_filter import SliderFilter
 from utils.logger import logger
 
 
 class MicrocontrollerManager(MicrocontrollerProtocol):
-    def __init__(self, n_sliders: int) -> None:
+    def __init__(
+        self,
+        n_sliders: int,
+        protocol: str = "ascii",
+        resolution_bits: int = 10,
+        drain_backlog: bool = True,
+        read_timeout: float | None = None,
+    ) -> None:
         self.serial = None
         self.n_sliders = n_sliders
+        self.drain_backlog = drain_backlog
+        # None blocks until data arrives, so an idle device costs no CPU. Pending reads
+        # are cancelled on close.
+        self.read_timeout = read_timeout
         self._connected = False
+        self._frame_stats = FrameStats()
+        self.decoder = create_frame_decoder(
+            protocol, n_sliders, self._frame_stats, resolution_bits
+        )
+        self._pending_frames: deque[bytes] = deque()
+        self.response_curves = [ResponseCurve(self.decoder.max_raw)] * n_sliders
+        self.slider_filters = [
+            SliderFilter(self.decoder.max_raw) for _ in range(n_sliders)
+        ]
+
+    def set_response_curves(self, response_curves: list[ResponseCurve]) -> None:
+        """Set the curves that turn the raw readings into volumes, one per slider"""
+        if len(response_curves) != self.n_sliders:
+            raise ValueError(
+                f"Expected {self.n_sliders} response curves, got {len(response_curves)}"
+            )
+        self.response_curves = list(response_curves)
+
+    def set_slider_filters(self, slider_filters: list[SliderFilter]) -> None:
+        """Set the noise filters of the raw readings, one per slider"""
+        if len(slider_filters) != self.n_sliders:
+            raise ValueError(
+                f"Expected {self.n_sliders} slider filters, got {len(slider_filters)}"
+            )
+        self.slider_filters = list(slider_filters)
 
     def connect(self, port: str, baudrate: int) -> None:
         try:
-            self.serial = serial.Serial(port, baudrate, timeout=0.1)
+            # Writes never block, so a board that stopped reading cannot stall the loop
+            self.serial = serial.Serial(
+                port, baudrate, timeout=self.read_timeout, write_timeout=0
+            )
             self._connected = True
+            self._pending_frames.clear()
+            self.decoder.reset()
+            for slider_filter in self.slider_filters:
+                slider_filter.reset()
         except serial.SerialException as e:
             self._connected = False
             raise ConnectionError(
@@ -20,43 +68,95 @@ class MicrocontrollerManager(MicrocontrollerProtocol):
             ) from e
         logger.info(f"Connected to {port} at {baudrate} baud")
 
-    def read_values(self) -> list[float] | None:
-        """Read values from the microcontroller and validate them"""
+    def read_values(self, block: bool = True) -> dict[int, float] | None:
+        """Read values from the microcontroller and validate them.
+
+        Returns the volumes (0-1) by slider index, looked up in the response curve of
+        each slider. Keyframes contain every slider, sparse updates only the sliders
+        that moved. Readings that the slider filters consider noise are left out, and if
+        nothing is left, None is returned. With block=False, only the bytes that already
+        arrived are read, e.g. when called because the port is readable.
+        """
         if not self._connected or not self.serial:
             return None
 
-        # Data is formatted as "<val>|<val>|<val>|<val>|<val>"
-        # Creating a QMessageBox can disrupt the data flow and cause UnicodeDecodeError.
-        try:
-            data = str(self.serial.readline()[:-2], "utf-8")  # Trim off '\r\n'.
-        except UnicodeDecodeError:
-            return None
-        if not data:
+        # Read until at least one complete frame is buffered, or the read times out.
+        while not self._pending_frames:
+            try:
+                waiting = self.serial.in_waiting
+                if not waiting and not block:
+                    return None
+                data = self.serial.read(waiting or 1)
+            except (serial.SerialException, OSError) as e:
+                self._handle_disconnect(e)
+                return None
+            if not data:
+                return None
+            self._pending_frames.extend(self.decoder.feed(data))
+
+        if self.drain_backlog:
+            # Consume everything already waiting, so a slow consumer never falls behind.
+            try:
+                waiting = self.serial.in_waiting
+                if waiting:
+                    self._pending_frames.extend(
+                        self.decoder.feed(self.serial.read(waiting))
+                    )
+            except (serial.SerialException, OSError) as e:
+                self._handle_disconnect(e)
+            values = self._decode_newest_frame()
+        else:
+            values = self.decoder.decode(self._pending_frames.popleft())
+        if values is None:
             return None
 
-        try:
-            values = [float(val) for val in data.split("|")]
-        except ValueError:
-            logger.warning(f"Invalid data: {data}")
+        response_curves = self.response_curves
+        slider_filters = self.slider_filters
+        volumes = {}
+        now = time.monotonic()
+        for index, val in values.items():
+            val = slider_filters[index].update(val, now)
+            if val is None:
+                self._frame_stats.values_filtered += 1
+            else:
+                volumes[index] = response_curves[index](val)
+        if not volumes:
+            self._frame_stats.frames_filtered += 1
             return None
+        return volumes
 
-        if len(values) != self.n_sliders:
-            return None
+    def _handle_disconnect(self, error: Exception) -> None:
+        """Mark the connection as lost, e.g. because the board was unplugged or reset"""
+        logger.warning(f"Lost connection to microcontroller: {error}")
+        self.close()
 
-        # Normalize values to 0-1 range
-        return [val / 1023 for val in values]
+    def _decode_newest_frame(self) -> dict[int, float] | None:
+        """Merge the pending frames from newest to oldest and discard everything before
+        the newest keyframe.
 
-    def send_sync_message(self, values: list[float]) -> None:
-        """Send a sync message to the microcontroller.
+        Sparse updates cannot be skipped without losing the sliders they carry, so these
+        are merged, with newer values taking precedence.
+        """
+        values = None
+        while self._pending_frames and (values is None or len(values) < self.n_sliders):
+            frame_values = self.decoder.decode(self._pending_frames.pop())
+            if frame_values is None:
+                continue
+            if values is None:
+                values = frame_values
+            else:
+                self._frame_stats.frames_merged += 1
+                for index, value in frame_values.items():
+                    values.setdefault(index, value)
+        self._frame_stats.frames_skipped += len(self._pending_frames)
+        self._pending_frames.clear()
+        return values
+
+    def encode_sync_message(self, values: list[float]) -> bytes:
+        """Encode the volume values (0-1) as a sync message, formatted as "<a|b|c>".
 
         Values are normalized to 0-100 and sent as integers. This avoids having to use floats, while still using a normalized range.
-
-        Args:
-            values (list[float]): The current volume values (0-1) to send to the microcontroller.
         """
-        if not self._connected or not self.serial:
-            return
-
         # Validate the number of values
         if len(values) != self.n_sliders:
             raise ValueError(f"Expected {self.n_sliders} values, got {len(values)}")
@@ -66,18 +166,66 @@ class MicrocontrollerManager(MicrocontrollerProtocol):
             raise ValueError("Values must be between 0 and 1")
 
         values = [str(int(val * 100)) for val in values]
-        payload = ("<" + "|".join(values) + ">").encode("utf-8")
+        return ("<" + "|".join(values) + ">").encode("utf-8")
+
+    def send_sync_message(self, values: list[float]) -> bool:
+        """Send a sync message to the microcontroller, without blocking.
+
+        Args:
+            values (list[float]): The current volume values (0-1) to send to the microcontroller.
+
+        Returns:
+            bool: Whether the whole message was written. It is dropped if the output
+            buffer is full, the board discards a partial one.
+        """
+        if not self._connected or not self.serial:
+            return False
+
+        payload = self.encode_sync_message(values)
         try:
-            self.serial.write(payload)
+            written = self.serial.write(payload)
+        except serial.SerialTimeoutException:
+            written = 0
         except serial.SerialException as e:
             logger.error(f"Error writing values to microcontroller: {e}")
+            return False
+        if written is not None and written < len(payload):
+            logger.debug("Dropped a sync message, the output buffer is full")
+            return False
+        return True
+
+    def fileno(self) -> int | None:
+        """The port's file descriptor, if the platform can wait on it"""
+        try:
+            return self.serial.fileno()
+        except AttributeError:  # Windows serial handles cannot be selected on
+            return None
+
+    def cancel_read(self) -> None:
+        """Make a blocking read_values call return None, e.g. to stop a reader thread"""
+        if self.serial:
+            self.serial.cancel_read()
 
     def close(self) -> None:
         if self.serial:
-            self.serial.close()
+            try:
+                self.serial.close()
+            except (serial.SerialException, OSError):
+                pass  # The device may already be gone
             self._connected = False
+            self._pending_frames.clear()
+            self.decoder.reset()
             logger.info("Disconnected from microcontroller")
 
     @property
     def is_connected(self) -> bool:
         return self._connected
+
+    @property
+    def max_raw(self) -> int:
+        """The highest raw reading of the ADC"""
+        return self.decoder.max_raw
+
+    @property
+    def frame_stats(self) -> FrameStats:
+        return self._frame_stats
@@ -1,7 +1,26 @@
+from microcontroller.frame_protocol import FrameStats
+from microcontroller.response_curve import ResponseCurve
+from microcontroller.slider_filter import SliderFilter
+
+
 class MicrocontrollerProtocol:
+    n_sliders: int
+
     def connect(self, port: str, baudrate: int) -> None: ...
-    def read_values(self) -> list[float]: ...
+    def set_response_curves(self, response_curves: list[ResponseCurve]) -> None: ...
+    def set_slider_filters(self, slider_filters: list[SliderFilter]) -> None: ...
+    def read_values(self, block: bool = True) -> dict[int, float] | None: ...
+    def fileno(self) -> int | None: ...
+    def encode_sync_message(self, values: list[float]) -> bytes: ...
+    def send_sync_message(self, values: list[float]) -> bool: ...
+    def cancel_read(self) -> None: ...
     def close(self) -> None: ...
 
     @property
     def is_connected(self) -> bool: ...
+
+    @property
+    def max_raw(self) -> int: ...
+
+    @property
+    def frame_stats(self) -> FrameStats: ...
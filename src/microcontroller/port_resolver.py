@@ -0,0 +1,136 @@
+import json
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from serial.tools import list_ports
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class PortIdentity:
+    """The USB identity of a microcontroller, which survives COM port renumbering."""
+
+    vid: int
+    pid: int
+    serial_number: str | None = None
+
+    def matches(self, port_info) -> bool:
+        return (
+            port_info.vid == self.vid
+            and port_info.pid == self.pid
+            and (
+                self.serial_number is None
+                or port_info.serial_number == self.serial_number
+            )
+        )
+
+
+class PortResolver:
+    """Resolves the serial port of each device by its USB VID/PID/serial number.
+
+    The identity comes from the device config, or is captured the first time the port is
+    found by name, and is then cached on disk. Later lookups, e.g. when reconnecting
+    after a USB glitch, only look for that identity.
+    """
+
+    def __init__(self, cache_path: Path, fallback: Callable[[dict], str]):
+        self.cache_path = cache_path
+        # Resolves a port by device name or the configured port
+        self.fallback = fallback
+        self._identities: dict[str, PortIdentity] = self._load_cache()
+        self._last_ports: dict[str, str] = {}
+
+    def _load_cache(self) -> dict[str, PortIdentity]:
+        try:
+            cache = json.loads(self.cache_path.read_text())
+            return {name: PortIdentity(**identity) for name, identity in cache.items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring invalid port cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_cache(self) -> None:
+        cache = {name: asdict(identity) for name, identity in self._identities.items()}
+        try:
+            self.cache_path.write_text(json.dumps(cache, indent=2))
+        except OSError as e:
+            logger.warning(f"Could not write port cache {self.cache_path}: {e}")
+
+    def get_identity(self, device: dict) -> PortIdentity | None:
+        """The configured identity of the device, or the cached one"""
+        if device.get("vid") is not None and device.get("pid") is not None:
+            return PortIdentity(
+                device["vid"], device["pid"], device.get("serial_number")
+            )
+        return self._identities.get(device["name"])
+
+    def find_port(
+        self, identity: PortIdentity, preferred: str | None = None
+    ) -> str | None:
+        """Find the port currently belonging to the identity.
+
+        Identical boards without a serial number share an identity. If it matches
+        several ports, only `preferred` is returned, if it is one of them.
+        """
+        ports = [
+            port_info.device
+            for port_info in list_ports.comports()
+            if identity.matches(port_info)
+        ]
+        if len(ports) == 1:
+            return ports[0]
+        return preferred if preferred in ports else None
+
+    def resolve(self, device: dict) -> str:
+        """Find the port of the device by identity, name or configured port"""
+        identity = self.get_identity(device)
+        if identity is not None and (port := self.find_port(identity)) is not None:
+            self._last_ports[device["name"]] = port
+            return port
+
+        port = self.fallback(device)
+        self._last_ports[device["name"]] = port
+        ports = list_ports.comports()
+        port_info = next(
+            (port_info for port_info in ports if port_info.device == port), None
+        )
+        if (
+            port_info is not None
+            and port_info.vid is not None
+            and port_info.pid is not None
+        ):
+            identity = PortIdentity(
+                port_info.vid, port_info.pid, port_info.serial_number
+            )
+            if sum(identity.matches(other) for other in ports) > 1:
+                # Another board has the same identity, so it cannot tell them apart
+                if self._identities.pop(device["name"], None) is not None:
+                    self._save_cache()
+                logger.info(
+                    f"Not caching the USB identity of {device['name']}, "
+                    f"it is shared by another board: {identity}"
+                )
+            elif self._identities.get(device["name"]) != identity:
+                self._identities[device["name"]] = identity
+                self._save_cache()
+                logger.info(f"Cached USB identity of {device['name']}: {identity}")
+        return port
+
+    def re_resolve(self, device: dict) -> str | None:
+        """Find the port of a device that was connected before. Only its identity is
+        considered, and the port it was on if other boards share that identity.
+
+        A device that was never found is resolved in full, and None is returned while it
+        is missing.
+        """
+        identity = self.get_identity(device)
+        if identity is not None:
+            return self.find_port(identity, self._last_ports.get(device["name"]))
+        if device["name"] in self._last_ports:
+            # Without a USB identity, e.g. on a native serial port, retry its last port
+            return self._last_ports[device["name"]]
+        try:
+            return self.resolve(device)
+        except ValueError:
+            return None
@@ -0,0 +1,98 @@
+from collections.abc import Sequence
+
+# Dynamic range of the "log" curve. Like an audio taper potentiometer, the volume rises
+# slowly at the bottom of the travel and quickly at the top.
+LOG_CURVE_RANGE_DB = 40
+
+
+def _log_curve(position: float) -> float:
+    base = 10 ** (LOG_CURVE_RANGE_DB / 20)
+    return (base**position - 1) / (base - 1)
+
+
+def _interpolate(points: Sequence[Sequence[float]], position: float) -> float:
+    """Piecewise linear interpolation between (position, volume) points, by position"""
+    if position <= points[0][0]:
+        return points[0][1]
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        if position <= x1:
+            return y0 + (y1 - y0) * (position - x0) / (x1 - x0)
+    return points[-1][1]
+
+
+class ResponseCurve:
+    """Maps the raw ADC readings of one slider to a volume between 0 and 1.
+
+    The calibration, dead zones, inversion and curve are compiled into a table with one
+    entry per raw value when the curve is created, so applying it to a reading is a
+    single lookup.
+    """
+
+    def __init__(
+        self,
+        max_raw: int,
+        minimum: int = 0,
+        maximum: int | None = None,
+        dead_zone_low: float = 0.0,
+        dead_zone_high: float = 0.0,
+        inverted: bool = False,
+        curve: str | Sequence[Sequence[float]] = "linear",
+    ) -> None:
+        if maximum is None:
+            maximum = max_raw
+        if not 0 <= minimum < maximum <= max_raw:
+            raise ValueError(
+                f"Slider calibration needs 0 <= min < max <= {max_raw}, "
+                f"got min={minimum}, max={maximum}"
+            )
+        if (
+            dead_zone_low < 0
+            or dead_zone_high < 0
+            or dead_zone_low + dead_zone_high >= 1
+        ):
+            raise ValueError(
+                "Slider dead zones must be positive and cover less than the whole "
+                "travel"
+            )
+        if curve == "linear":
+            shape = lambda position: position
+        elif curve == "log":
+            shape = _log_curve
+        elif isinstance(curve, str):
+            raise ValueError(f"Unknown slider curve: {curve}")
+        else:
+            points = sorted(curve)
+            shape = lambda position: _interpolate(points, position)
+
+        self.max_raw = max_raw
+        live_travel = 1 - dead_zone_low - dead_zone_high
+        table = []
+        for raw in range(max_raw + 1):
+            position = (min(max(raw, minimum), maximum) - minimum) / (maximum - minimum)
+            position = min(max((position - dead_zone_low) / live_travel, 0.0), 1.0)
+            if inverted:
+                position = 1 - position
+            table.append(min(max(shape(position), 0.0), 1.0))
+        self.table = tuple(table)
+
+    @classmethod
+    def from_settings(
+        cls, settings: dict, max_raw: int, inverted: bool = False
+    ) -> "ResponseCurve":
+        """Create a curve from the settings of a slider in the config file. `inverted`
+        is the default for the slider.
+        """
+        slider_inverted = settings.get("inverted")
+        return cls(
+            max_raw,
+            minimum=settings.get("min", 0),
+            maximum=settings.get("max"),
+            dead_zone_low=settings.get("dead_zone_low", 0.0),
+            dead_zone_high=settings.get("dead_zone_high", 0.0),
+            inverted=inverted if slider_inverted is None else slider_inverted,
+            curve=settings.get("curve", "linear"),
+        )
+
+    def __call__(self, raw: int | float) -> float:
+        """Look up the volume of a raw reading, clamped to the ADC range."""
+        return self.table[min(max(int(raw), 0), self.max_raw)]
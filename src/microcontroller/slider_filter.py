@@ -0,0 +1,87 @@
+import time
+
+DEFAULT_DEADBAND = 2
+# `smoothing` is the weight the average keeps over this many seconds
+SMOOTHING_INTERVAL = 0.01
+
+
+class SliderFilter:
+    """Keeps ADC noise of one slider from reaching the volume, working on its raw
+    readings.
+
+    - `smoothing` applies an exponential moving average, where 0 disables it and values
+      closer to 1 smooth more. It is scaled by the time since the previous reading, so
+      a slider that only reports when it moves catches up just as fast.
+    - `deadband` ignores changes of at most this many counts since the last reading
+      that passed.
+    - `hysteresis` ignores reversals of at most this many counts, so a slider resting
+      between two readings does not flip back and forth.
+
+    Readings at either end of the ADC range always pass, so a slider can always reach 0
+    and 1.
+    """
+
+    def __init__(
+        self,
+        max_raw: int,
+        deadband: int = 0,
+        smoothing: float = 0.0,
+        hysteresis: int = 0,
+    ) -> None:
+        if deadband < 0 or hysteresis < 0:
+            raise ValueError("Slider deadband and hysteresis cannot be negative")
+        if not 0 <= smoothing < 1:
+            raise ValueError(
+                f"Slider smoothing must be at least 0 and below 1, got {smoothing}"
+            )
+        self.max_raw = max_raw
+        self.deadband = deadband
+        self.hysteresis = max(deadband, hysteresis)
+        self.smoothing = smoothing
+        self.reset()
+
+    @classmethod
+    def from_settings(cls, settings: dict, max_raw: int) -> "SliderFilter":
+        """Create a filter from the settings of a slider in the config file"""
+        return cls(
+            max_raw,
+            deadband=settings.get("deadband", DEFAULT_DEADBAND),
+            smoothing=settings.get("smoothing", 0.0),
+            hysteresis=settings.get("hysteresis", 0),
+        )
+
+    def update(self, raw: int | float, now: float | None = None) -> float | None:
+        """Filter a reading taken at `now`, by default the monotonic clock. Returns the
+        reading to apply, or None if it is noise.
+        """
+        if now is None:
+            now = time.monotonic()
+        at_end = raw <= 0 or raw >= self.max_raw
+        if self._smoothed is None or at_end or not self.smoothing:
+            self._smoothed = raw
+        else:
+            elapsed = now - self._updated
+            gain = 1 - self.smoothing ** (elapsed / SMOOTHING_INTERVAL)
+            self._smoothed += gain * (raw - self._smoothed)
+        self._updated = now
+        value = self._smoothed
+        if self._output is None:
+            self._output = value
+            return value
+
+        change = value - self._output
+        if change == 0:
+            return None
+        direction = 1 if change > 0 else -1
+        threshold = self.deadband if direction == self._direction else self.hysteresis
+        if abs(change) <= threshold and not at_end:
+            return None
+        self._output = value
+        self._direction = direction
+        return value
+
+    def reset(self) -> None:
+        self._smoothed: float | None = None
+        self._updated = 0.0
+        self._output: float | None = None
+        self._direction = 0
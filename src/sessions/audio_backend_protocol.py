@@ -0,0 +1,73 @@
+from collections.abc import Callable, Hashable
+from typing import Protocol
+from sessions.audio_event_protocol import AudioEventSourceProtocol
+
+
+class VolumeHandle(Protocol):
+    """Anything with a volume between 0 and 1. Failing calls raise AudioBackendError."""
+
+    def set_volume(self, value: float) -> None: ...
+    def get_volume(self) -> float: ...
+
+
+class SessionHandle(VolumeHandle, Protocol):
+    """An audio session of the backend"""
+
+    @property
+    def key(self) -> str: ...  # Identifies the session across enumerations
+    @property
+    def pid(self) -> int | None: ...  # None if the session does not belong to a process
+    @property
+    def process_name(self) -> str | None: ...
+    @property
+    # With the pid, identifies the process
+    def process_create_time(self) -> float | None: ...
+    @property
+    def is_system(self) -> bool: ...  # The system sounds session
+    @property
+    # Expired sessions are still listed for a while, but every call to them fails
+    def is_expired(self) -> bool: ...
+
+
+class DeviceHandle(VolumeHandle, Protocol):
+    """An audio endpoint device of the backend"""
+
+    @property
+    def id(self) -> str: ...
+    @property
+    def name(self) -> str | None: ...
+    @property
+    def is_present(self) -> bool: ...
+    @property
+    # Changes when the device is enabled, disabled, plugged or unplugged
+    def state(self) -> Hashable: ...
+
+
+class VolumeChangeSourceProtocol(Protocol):
+    """Reports volume changes of sessions and devices that were made outside WaVeS, e.g.
+    in the Windows mixer or by the application itself.
+
+    `on_change` may be called from any thread, until the handle is unwatched.
+    `unwatch` forgets the handle even if it raises AudioBackendError, e.g. when gone.
+    """
+
+    def watch(
+        self, handle: VolumeHandle, on_change: Callable[[float], None]
+    ) -> None: ...
+    def unwatch(self, handle: VolumeHandle) -> None: ...
+
+
+class AudioBackendProtocol(Protocol):
+    """Access to the audio sessions and devices of the system.
+
+    Handles may only be used on threads that called `initialize_thread`, until they call
+    `uninitialize_thread`.
+    """
+
+    def initialize_thread(self) -> None: ...
+    def uninitialize_thread(self) -> None: ...
+    def get_sessions(self) -> list[SessionHandle]: ...
+    def get_devices(self) -> list[DeviceHandle]: ...
+    def get_master_volume(self) -> VolumeHandle: ...
+    def create_event_source(self) -> AudioEventSourceProtocol: ...
+    def create_volume_change_source(self) -> VolumeChangeSourceProtocol: ...
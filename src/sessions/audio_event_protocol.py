@@ -0,0 +1,13 @@
+from collections.abc import Callable
+from typing import Protocol
+from sessions.audio_events import AudioEvent
+
+
+class AudioEventSourceProtocol(Protocol):
+    """Reports new sessions and device changes as they happen.
+
+    `on_event` may be called from any thread, until `stop` returns.
+    """
+
+    def start(self, on_event: Callable[[AudioEvent], None]) -> None: ...
+    def stop(self) -> None: ...
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class AudioEventKind(Enum):
+    SESSION_CREATED = "session_created"
+    DEVICE_ADDED = "device_added"
+    DEVICE_REMOVED = "device_removed"
+    DEVICE_STATE_CHANGED = "device_state_changed"
+    DEFAULT_DEVICE_CHANGED = "default_device_changed"
+
+
+@dataclass(frozen=True)
+class AudioEvent:
+    """A change in the audio sessions or devices, reported by an audio event source"""
+
+    kind: AudioEventKind
+    device_id: str | None = None
+    pid: int | None = None
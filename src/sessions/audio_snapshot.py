@@ -0,0 +1,54 @@
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from sessions.audio_backend_protocol import (
+    AudioBackendProtocol,
+    DeviceHandle,
+    SessionHandle,
+)
+
+
+@dataclass(frozen=True)
+class AudioSnapshot:
+    """One enumeration of the audio sessions and devices"""
+
+    sessions: list[SessionHandle]
+    devices: list[DeviceHandle]
+    taken_at: float
+
+
+class AudioSnapshotProvider:
+    """Shares one enumeration of the sessions and devices between everything that needs
+    it.
+
+    A snapshot is reused until it is older than `ttl` seconds, or until `invalidate` is
+    called, e.g. because an audio event reported a new session.
+    """
+
+    def __init__(
+        self,
+        backend: AudioBackendProtocol,
+        ttl: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.clock = clock
+        self.enumerations = 0
+        self.reuses = 0
+        self._snapshot: AudioSnapshot | None = None
+
+    def get(self) -> AudioSnapshot:
+        now = self.clock()
+        snapshot = self._snapshot
+        if snapshot is not None and now - snapshot.taken_at < self.ttl:
+            self.reuses += 1
+            return snapshot
+        self.enumerations += 1
+        self._snapshot = AudioSnapshot(
+            self.backend.get_sessions(), self.backend.get_devices(), now
+        )
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._snapshot = None
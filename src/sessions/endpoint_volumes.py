@@ -0,0 +1,39 @@
+from collections.abc import Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class EndpointVolumeCache:
+    """The activated volume interfaces of devices, by device id.
+
+    Activating the volume interface of a device is a COM call, so it is only done once
+    per device, and again once the device changed state, e.g. after it was disabled and
+    enabled again.
+    """
+
+    def __init__(self) -> None:
+        # The volume interfaces and the state they were activated in, by device id
+        self._volumes: dict[str, tuple[Hashable, object]] = {}
+        self.activations = 0
+
+    def get(self, device_id: str, state: Hashable, activate: Callable[[], T]) -> T:
+        """The cached volume interface of the device in this state, or `activate()`"""
+        cached = self._volumes.get(device_id)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        volume = activate()
+        self.activations += 1
+        self._volumes[device_id] = (state, volume)
+        return volume
+
+    def evict(self, states: dict[str, Hashable]) -> None:
+        """Drop the volume interfaces of devices that disappeared or changed state,
+        given the current states by id
+        """
+        for device_id, (state, _) in list(self._volumes.items()):
+            if states.get(device_id) != state:
+                del self._volumes[device_id]
+
+    def __len__(self) -> int:
+        return len(self._volumes)
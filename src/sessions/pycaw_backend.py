@@ -0,0 +1,224 @@
+import warnings
+from ctypes import POINTER, cast
+import comtypes
+from _ctypes import COMError
+from comtypes import CLSCTX_ALL
+from pycaw.constants import DEVICE_STATE, AudioDeviceState, AudioSessionState
+from pycaw.pycaw import (
+    AudioDevice,
+    AudioSession,
+    AudioUtilities,
+    EDataFlow,
+    ERole,
+    IAudioEndpointVolume,
+)
+from sessions.audio_backend_protocol import AudioBackendProtocol
+from sessions.endpoint_volumes import EndpointVolumeCache
+from sessions.pycaw_events import (
+    WAVES_EVENT_CONTEXT,
+    PycawEventSource,
+    PycawVolumeChangeSource,
+)
+from sessions.session_exceptions import AudioBackendError
+
+warnings.filterwarnings("ignore", message="COMError attempting to get property.*")
+
+
+class PycawSession:
+    def __init__(self, session: AudioSession) -> None:
+        self.session = session
+        self.volume = session.SimpleAudioVolume
+
+    @property
+    def key(self) -> str:
+        return self.session.InstanceIdentifier
+
+    @property
+    def pid(self) -> int | None:
+        return self.session.ProcessId or None
+
+    @property
+    def process_name(self) -> str | None:
+        process = self.session.Process
+        return None if process is None else process.name()
+
+    @property
+    def process_create_time(self) -> float | None:
+        # psutil looks this up once, when pycaw creates the process object
+        process = self.session.Process
+        return None if process is None else process.create_time()
+
+    @property
+    def is_system(self) -> bool:
+        return "SystemRoot" in self.session.DisplayName
+
+    @property
+    def is_expired(self) -> bool:
+        try:
+            return self.session.State == AudioSessionState.Expired
+        except COMError:
+            return True
+
+    def set_volume(self, value: float) -> None:
+        try:
+            self.volume.SetMasterVolume(value, WAVES_EVENT_CONTEXT)
+        except COMError as e:
+            raise AudioBackendError(
+                f"Could not set the volume of {self.session}: {e}"
+            ) from e
+
+    def get_volume(self) -> float:
+        try:
+            return self.volume.GetMasterVolume()
+        except COMError as e:
+            raise AudioBackendError(
+                f"Could not get the volume of {self.session}: {e}"
+            ) from e
+
+
+class PycawEndpointVolume:
+    """The volume of an audio endpoint, through IAudioEndpointVolume"""
+
+    def __init__(self, endpoint_volume) -> None:
+        self.endpoint_volume = endpoint_volume
+
+    def set_volume(self, value: float) -> None:
+        try:
+            # Decibels for some reason
+            self.endpoint_volume.SetMasterVolumeLevelScalar(value, WAVES_EVENT_CONTEXT)
+        except (COMError, AttributeError) as e:
+            raise AudioBackendError(f"Could not set the endpoint volume: {e}") from e
+
+    def get_volume(self) -> float:
+        try:
+            return self.endpoint_volume.GetMasterVolumeLevelScalar()
+        except (COMError, AttributeError) as e:
+            raise AudioBackendError(f"Could not get the endpoint volume: {e}") from e
+
+
+class PycawDevice(PycawEndpointVolume):
+    """An audio endpoint device. Its volume interface is only activated once used."""
+
+    def __init__(self, backend: "PycawBackend", device: AudioDevice) -> None:
+        self.backend = backend
+        self.device = device
+
+    @property
+    def endpoint_volume(self):
+        # Looked up every time, so an interface the backend evicted is never used again
+        return self.backend.get_endpoint_volume(self.device)
+
+    @property
+    def id(self) -> str:
+        return self.device.id
+
+    @property
+    def name(self) -> str | None:
+        return self.device.FriendlyName
+
+    @property
+    def is_present(self) -> bool:
+        return self.device.state != AudioDeviceState.NotPresent
+
+    @property
+    def is_active(self) -> bool:
+        return self.device.state == AudioDeviceState.Active
+
+    @property
+    def state(self) -> AudioDeviceState:
+        return self.device.state
+
+    def __repr__(self) -> str:
+        return f"{self.device.FriendlyName} - {self.device.state}"
+
+
+class PycawBackend(AudioBackendProtocol):
+    """The Windows audio sessions and devices, through pycaw and COM.
+
+    One device enumerator is shared by all calls, and the volume interface of a device
+    is only activated once, until the device changes state or disappears.
+    """
+
+    def __init__(self) -> None:
+        self._device_enumerator = None
+        self._endpoint_volumes = EndpointVolumeCache()
+
+    @property
+    def device_enumerator(self):
+        # Created on first use, so it lives on the thread that uses the audio stack
+        if self._device_enumerator is None:
+            self._device_enumerator = AudioUtilities.GetDeviceEnumerator()
+        return self._device_enumerator
+
+    def initialize_thread(self) -> None:
+        comtypes.CoInitialize()
+
+    def uninitialize_thread(self) -> None:
+        comtypes.CoUninitialize()
+
+    def get_sessions(self) -> list[PycawSession]:
+        return [PycawSession(session) for session in AudioUtilities.GetAllSessions()]
+
+    def get_devices(self) -> list[PycawDevice]:
+        collection = self.device_enumerator.EnumAudioEndpoints(
+            EDataFlow.eAll.value, DEVICE_STATE.MASK_ALL.value
+        )
+        devices = []
+        for index in range(collection.GetCount()):
+            device = AudioUtilities.CreateDevice(collection.Item(index))
+            if device.FriendlyName is not None:
+                devices.append(PycawDevice(self, device))
+        self._endpoint_volumes.evict(
+            {device.id: device.device.state for device in devices}
+        )
+        return devices
+
+    def get_endpoint_volume(self, device: AudioDevice):
+        if device.id is None:
+            return self._activate_endpoint_volume(device)
+        return self._endpoint_volumes.get(
+            device.id, device.state, lambda: self._activate_endpoint_volume(device)
+        )
+
+    def _activate_endpoint_volume(self, device: AudioDevice):
+        speaker = (
+            self.device_enumerator.GetDevice(device.id)
+            if device.id is not None
+            else self.device_enumerator.GetDefaultAudioEndpoint(
+                EDataFlow.eRender.value, ERole.eMultimedia.value
+            )
+        )
+
+        if not speaker:
+            raise AudioBackendError(
+                f"Could not get speaker interface for device: {device}"
+            )
+
+        try:
+            endpoint_volume = cast(
+                speaker.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None),
+                POINTER(IAudioEndpointVolume),
+            )
+        except COMError as e:
+            # Raised if the device is not active
+            raise AudioBackendError(
+                f"Device {device.FriendlyName} is not active: {e}"
+            ) from e
+        return endpoint_volume
+
+    def get_master_volume(self) -> PycawEndpointVolume:
+        speaker = self.device_enumerator.GetDefaultAudioEndpoint(
+            EDataFlow.eRender.value, ERole.eMultimedia.value
+        )
+        return PycawEndpointVolume(
+            cast(
+                speaker.Activate(IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None),
+                POINTER(IAudioEndpointVolume),
+            )
+        )
+
+    def create_event_source(self) -> PycawEventSource:
+        return PycawEventSource()
+
+    def create_volume_change_source(self) -> PycawVolumeChangeSource:
+        return PycawVolumeChangeSource()
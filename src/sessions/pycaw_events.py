@@ -0,0 +1,210 @@
+import threading
+from collections.abc import Callable
+import comtypes
+from _ctypes import COMError
+from comtypes import GUID
+from pycaw.callbacks import (
+    AudioEndpointVolumeCallback,
+    AudioSessionEvents,
+    AudioSessionNotification,
+    MMNotificationClient,
+)
+from pycaw.pycaw import AudioUtilities, IAudioSessionControl2
+from sessions.audio_backend_protocol import VolumeChangeSourceProtocol, VolumeHandle
+from sessions.audio_event_protocol import AudioEventSourceProtocol
+from sessions.audio_events import AudioEvent, AudioEventKind
+from sessions.session_exceptions import AudioBackendError
+from utils.logger import logger
+
+
+# Passed with every volume WaVeS sets, so its own changes are not reported back
+WAVES_EVENT_CONTEXT = GUID("{5B0F1E52-8C1A-4F3C-9D6E-57A7E5A1C0DE}")
+
+
+class _SessionNotificationClient(AudioSessionNotification):
+    def __init__(self, on_event: Callable[[AudioEvent], None]) -> None:
+        super().__init__()
+        self.on_event = on_event
+
+    def on_session_created(self, new_session) -> None:
+        # Windows passes an IAudioSessionControl, the pid is on IAudioSessionControl2
+        try:
+            pid = (
+                new_session.QueryInterface(IAudioSessionControl2).GetProcessId() or None
+            )
+        except COMError:
+            pid = None
+        self.on_event(AudioEvent(AudioEventKind.SESSION_CREATED, pid=pid))
+
+
+class _DeviceNotificationClient(MMNotificationClient):
+    def __init__(
+        self,
+        on_event: Callable[[AudioEvent], None],
+        on_default_device_changed: Callable[[], None],
+    ) -> None:
+        super().__init__()
+        self.on_event = on_event
+        self._on_default_device_changed = on_default_device_changed
+
+    def on_default_device_changed(
+        self, flow, flow_id, role, role_id, default_device_id
+    ) -> None:
+        self.on_event(
+            AudioEvent(
+                AudioEventKind.DEFAULT_DEVICE_CHANGED, device_id=default_device_id
+            )
+        )
+        self._on_default_device_changed()
+
+    def on_device_added(self, added_device_id) -> None:
+        self.on_event(
+            AudioEvent(AudioEventKind.DEVICE_ADDED, device_id=added_device_id)
+        )
+
+    def on_device_removed(self, removed_device_id) -> None:
+        self.on_event(
+            AudioEvent(AudioEventKind.DEVICE_REMOVED, device_id=removed_device_id)
+        )
+
+    def on_device_state_changed(self, device_id, new_state, new_state_id) -> None:
+        self.on_event(
+            AudioEvent(AudioEventKind.DEVICE_STATE_CHANGED, device_id=device_id)
+        )
+
+
+class PycawEventSource(AudioEventSourceProtocol):
+    """Audio events from Windows, through IMMNotificationClient and
+    IAudioSessionNotification.
+
+    The callbacks are registered on a thread of their own, because Windows only delivers
+    session notifications in the multithreaded apartment. New sessions are reported for
+    the default device, which is also where the session manager finds its sessions, so
+    the registration moves along when the default device changes.
+    """
+
+    def __init__(self) -> None:
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._running = False
+        self._started = threading.Event()
+        self._start_error: Exception | None = None
+
+    def start(self, on_event: Callable[[AudioEvent], None]) -> None:
+        self._on_event = on_event
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="AudioEvents", daemon=True
+        )
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def stop(self) -> None:
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        try:
+            device_enumerator = AudioUtilities.GetDeviceEnumerator()
+            device_client = _DeviceNotificationClient(self._on_event, self._wake.set)
+            device_enumerator.RegisterEndpointNotificationCallback(device_client)
+        except Exception as e:
+            self._start_error = e
+            self._started.set()
+            comtypes.CoUninitialize()
+            return
+
+        try:
+            while self._running:
+                session_manager = AudioUtilities.GetAudioSessionManager()
+                session_client = _SessionNotificationClient(self._on_event)
+                session_manager.RegisterSessionNotification(session_client)
+                # Windows only starts sending session notifications after the sessions
+                # were enumerated once
+                session_manager.GetSessionEnumerator()
+                self._started.set()
+
+                # Sleep until stopped, or until a new default device needs registering
+                self._wake.wait()
+                self._wake.clear()
+                session_manager.UnregisterSessionNotification(session_client)
+        except Exception as e:
+            if self._started.is_set():
+                logger.error(f"Audio event source failed, relying on polling: {e}")
+            else:
+                self._start_error = e  # Raised by start()
+            self._started.set()
+        finally:
+            device_enumerator.UnregisterEndpointNotificationCallback(device_client)
+            comtypes.CoUninitialize()
+
+
+class _SessionVolumeCallback(AudioSessionEvents):
+    def __init__(self, on_change: Callable[[float], None]) -> None:
+        super().__init__()
+        self.on_change = on_change
+
+    def OnSimpleVolumeChanged(self, NewVolume, NewMute, EventContext) -> None:
+        if not (EventContext and EventContext.contents == WAVES_EVENT_CONTEXT):
+            self.on_change(NewVolume)
+
+
+class _EndpointVolumeCallback(AudioEndpointVolumeCallback):
+    def __init__(self, on_change: Callable[[float], None]) -> None:
+        super().__init__()
+        self.on_change = on_change
+
+    def OnNotify(self, pNotify) -> None:
+        notification = pNotify.contents
+        if notification.guidEventContext != WAVES_EVENT_CONTEXT:
+            self.on_change(notification.fMasterVolume)
+
+
+class PycawVolumeChangeSource(VolumeChangeSourceProtocol):
+    """Volume changes from Windows, through IAudioSessionEvents for sessions and
+    IAudioEndpointVolumeCallback for the master volume and devices.
+
+    Windows calls these from its own threads. Changes that carry WAVES_EVENT_CONTEXT
+    were made by WaVeS and are not reported.
+    """
+
+    def __init__(self) -> None:
+        # The interface each callback was registered on and the callback, by handle
+        self._callbacks: dict[VolumeHandle, tuple[object, object]] = {}
+
+    def watch(self, handle: VolumeHandle, on_change: Callable[[float], None]) -> None:
+        if not getattr(handle, "is_active", True):
+            return  # Disabled and unplugged devices have no volume interface to watch
+        try:
+            if hasattr(handle, "session"):
+                interface = handle.session
+                callback = _SessionVolumeCallback(on_change)
+                interface.register_notification(callback)
+            else:
+                interface = handle.endpoint_volume
+                callback = _EndpointVolumeCallback(on_change)
+                interface.RegisterControlChangeNotify(callback)
+        except (COMError, AttributeError, AudioBackendError) as e:
+            logger.warning(f"Could not watch the volume of {handle}: {e}")
+            return
+        self._callbacks[handle] = (interface, callback)
+
+    def unwatch(self, handle: VolumeHandle) -> None:
+        registration = self._callbacks.pop(handle, None)
+        if registration is None:
+            return
+        # Unregister on the interface that was registered on, the handle may no longer
+        # be able to activate one, e.g. once its device was disabled
+        interface, callback = registration
+        try:
+            if isinstance(callback, _SessionVolumeCallback):
+                interface.unregister_notification()
+            else:
+                interface.UnregisterControlChangeNotify(callback)
+        except (COMError, AttributeError, AudioBackendError):
+            pass  # The session or device is gone already
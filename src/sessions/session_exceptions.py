@@ -0,0 +1,2 @@
+class AudioBackendError(Exception):
+    """An audio backend call failed, e.g. because the session or device is gone"""
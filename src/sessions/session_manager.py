@@ -4,26 +4,94 @@ from sessions.sessions import (
     SystemSession,
     Device,
     SoftwareSession,
+    ProcessInfo,
+    SessionChanges,
     SessionGroup,
 )
-from pycaw.pycaw import AudioUtilities
-from pycaw.constants import AudioDeviceState
+from collections.abc import Callable, Hashable
+from sessions.audio_backend_protocol import (
+    AudioBackendProtocol,
+    DeviceHandle,
+    SessionHandle,
+    VolumeChangeSourceProtocol,
+    VolumeHandle,
+)
+from sessions.audio_snapshot import AudioSnapshot, AudioSnapshotProvider
+from sessions.session_exceptions import AudioBackendError
 from sessions.session_protocol import SessionManagerProtocol
+from sessions.volume_pool import VolumeWorkerPool
 from utils.logger import logger
 
+
 class SessionManager(SessionManagerProtocol):
 
-    def __init__(self) -> None:
-        self.all_pycaw_sessions = AudioUtilities.GetAllSessions()
-        self.all_pycaw_devices = AudioUtilities.GetAllDevices()
-        self.software_sessions = []
-        self._master_session: MasterSession = MasterSession()
-        self._system_session: SystemSession = SystemSession()
+    def __init__(
+        self,
+        backend: AudioBackendProtocol,
+        snapshots: AudioSnapshotProvider | None = None,
+        volume_step: float = 0.0,
+        volume_epsilon: float = 0.0,
+        volume_pool: VolumeWorkerPool | None = None,
+        volume_changes: VolumeChangeSourceProtocol | None = None,
+    ) -> None:
+        self.backend = backend
+        # Volumes are rounded to `volume_step`, and changes of at most `volume_epsilon`
+        # are not applied
+        self.volume_step = volume_step
+        self.volume_epsilon = volume_epsilon
+        self.volume_pool = volume_pool  # Sets the volumes of large groups in parallel
+        # Volume changes made outside WaVeS go to `on_volume_changed`, from any thread
+        self.volume_changes = volume_changes
+        self.on_volume_changed: Callable[[Session, float], None] | None = None
+        self._applied_volumes: dict[int, tuple[SessionGroup, float]] = {}  # By slider
+        self.volumes_dispatched = 0
+        self.volumes_skipped = 0
+        # Tombstones, until they are reconciled
+        self._expired_sessions: list[Session] = []
+        # Expired sessions that are still enumerated
+        self._expired_keys: set[str] = set()
+        # Change detection, system session lookup and reconciliation share a scan
+        self.snapshots = snapshots or AudioSnapshotProvider(backend)
+        self._snapshot: AudioSnapshot = self.snapshots.get()
+        # Handles may be live objects, so device states are kept as they were enumerated
+        self._device_keys = self._device_ids(self._snapshot.devices)
+        self.software_sessions: list[SoftwareSession] = []
+        self._software_sessions: dict[str, SoftwareSession] = {}  # By session key
+        # By pid and create time
+        self._processes: dict[tuple[int, float | None], ProcessInfo] = {}
+        self._sessions_by_name: dict[str, list[SoftwareSession]] = {}
+        self._sessions_by_normalized_name: dict[str, list[SoftwareSession]] = {}
+        # Normalized names that contain a target
+        self._target_names: dict[str, list[str]] = {}
+        self._devices: dict[str, Device] = {}  # By device id
+        # The state each device was created in
+        self._device_states: dict[str, Hashable] = {}
+        self._normalized_device_names: dict[str, Device] = {}
+        # Resolved `device:` targets
+        self._device_targets: dict[str, Device | None] = {}
+        self._master_session: MasterSession = MasterSession(backend.get_master_volume())
+        self._system_session: SystemSession = SystemSession(self._find_system_session())
+        self._watch_volume(self._master_session, self._master_session.volume)
+        self._watch_volume(self._system_session, self._system_session.session)
         self.devices: dict[str, Device] = {}
-        self._last_session_ids: set[str] = set()
-        self._last_device_ids: set[str] = set()
         self.reload_sessions_and_devices()
 
+    @property
+    def all_sessions(self) -> list[SessionHandle]:
+        return self._snapshot.sessions
+
+    @property
+    def all_devices(self) -> list[DeviceHandle]:
+        return self._snapshot.devices
+
+    def _find_system_session(self) -> SessionHandle:
+        system_session = next(
+            (session for session in self.all_sessions if session.is_system), None
+        )
+        if system_session is None:
+            raise RuntimeError("System sounds session could not be found.")
+        return system_session
+
     @property
     def system_session(self) -> SystemSession:
         return self._system_session
@@ -32,118 +100,304 @@ class SessionManager(SessionManagerProtocol):
     def master_session(self) -> MasterSession:
         return self._master_session
 
-    def _get_session_ids(self) -> set[str]:
-        """Get a set of unique identifiers for all current sessions"""
-        return {
-            session.Process.pid
-            for session in self.all_pycaw_sessions
-            if session.Process is not None
-        }
+    @staticmethod
+    def _session_ids(sessions: list[SessionHandle]) -> set[str]:
+        """Get a set of unique identifiers for the sessions"""
+        return {session.key for session in sessions}
 
-    def _get_device_ids(self) -> set[str]:
-        """Get a set of unique identifiers for all current devices"""
-        return {
-            device.id
-            for device in self.all_pycaw_devices
-            if device.FriendlyName is not None
-        }
+    @staticmethod
+    def _device_ids(devices: list[DeviceHandle]) -> set[tuple[str, Hashable]]:
+        """Get a set of unique identifiers for the devices, which change with the state
+        of a device
+        """
+        return {(device.id, device.state) for device in devices}
 
     def check_for_changes(self) -> bool:
         """Check if there are any changes in sessions or devices"""
-        # Get new sessions and devices without modifying current state
-        new_sessions = AudioUtilities.GetAllSessions()
-        new_devices = AudioUtilities.GetAllDevices()
-
-        # Get current IDs for comparison
-        current_session_ids = self._get_session_ids()
-        current_device_ids = self._get_device_ids()
-
-        # Get new IDs for comparison
-        new_session_ids = {
-            session.Process.pid
-            for session in new_sessions
-            if session.Process is not None
-        }
-        new_device_ids = {
-            device.id for device in new_devices if device.FriendlyName is not None
-        }
+        snapshot = self.snapshots.get()
+        if snapshot is self._snapshot:
+            return bool(self._expired_sessions)
 
         # Check if there are any changes
-        session_changes = new_session_ids != current_session_ids
-        device_changes = new_device_ids != current_device_ids
-
-        if session_changes or device_changes:
-            # Update state with new sessions and devices
-            self.all_pycaw_sessions = new_sessions
-            self.all_pycaw_devices = new_devices
-            self._last_session_ids = new_session_ids
-            self._last_device_ids = new_device_ids
-            return True
-        return False
-
-    def reload_sessions_and_devices(self):
-        """Reload all sessions and devices"""
-        # Clear existing sessions and devices
-        self.software_sessions.clear()
-        self.devices.clear()
-
-        # Recreate sessions and devices
-        self.create_software_sessions()
-        self.create_device_sessions()
-
-    def create_software_sessions(self):
-        pycaw_software_sessions = filter(
-            lambda x: x.Process is not None and "SystemRoot" not in x.DisplayName,
-            self.all_pycaw_sessions,
-        )  # Filter out system sounds and sessions without Process
-        for pycaw_session in pycaw_software_sessions:
-            session = SoftwareSession(pycaw_session)
-            # Use unique_name (with PID) for software_sessions dictionary
-            self.software_sessions.append(session)
+        session_changes = self._session_ids(snapshot.sessions) != self._session_ids(
+            self.all_sessions
+        )
+        device_keys = self._device_ids(snapshot.devices)
+        device_changes = device_keys != self._device_keys
+
+        # Keep the newest snapshot either way, so its handles are the ones reconciled
+        self._snapshot = snapshot
+        self._device_keys = device_keys
+        return session_changes or device_changes or bool(self._expired_sessions)
+
+    def invalidate_snapshot(self) -> None:
+        """Make the next check enumerate again, e.g. after an audio event"""
+        self.snapshots.invalidate()
+
+    def reload_sessions_and_devices(self) -> SessionChanges:
+        """Bring the sessions and devices up to date with the last enumeration.
+
+        Only sessions and devices that appeared get a new wrapper, and only those that
+        vanished are dropped. The others keep their wrapper, so the cost scales with the
+        size of the change.
+        """
+        changes = SessionChanges()
+        self._reconcile_software_sessions(changes)
+        self._reconcile_devices(changes)
+        self._expired_sessions.clear()
+        return changes
+
+    def _reconcile_software_sessions(self, changes: SessionChanges) -> None:
+        # Filter out system sounds and sessions without a process
+        current = {
+            handle.key: handle
+            for handle in self.all_sessions
+            if handle.pid is not None and not handle.is_system
+        }
+        for key in [
+            key
+            for key, session in self._software_sessions.items()
+            if key not in current or session.is_expired
+        ]:
+            session = self._software_sessions.pop(key)
+            # A failed call alone may be transient. Only a session that Windows reports
+            # as expired is kept from being recreated, the others get a new wrapper.
+            if session.is_expired and key in current and current[key].is_expired:
+                self._expired_keys.add(key)
+            self._unindex_session(session)
+            self._unwatch_volume(session.session)
+            changes.removed_sessions.append(session)
+            logger.info(f"Removed software session: {session.name}")
+        # Windows keeps listing expired sessions for a while. They are only recreated
+        # once they left the enumeration, otherwise a session that keeps failing would
+        # be recreated forever.
+        self._expired_keys &= current.keys()
+        for key, handle in current.items():
+            if key in self._software_sessions or key in self._expired_keys:
+                continue
+            process = self._get_process(handle)
+            if process is None:
+                continue
+            session = SoftwareSession(handle, process)
+            self._software_sessions[key] = session
+            self._index_session(session)
+            self._watch_volume(session, handle)
+            changes.added_sessions.append(session)
             logger.info(f"Created software session: {session.name}")
+        if changes.added_sessions or changes.removed_sessions:
+            self.software_sessions = list(self._software_sessions.values())
+
+    def _get_process(self, handle: SessionHandle) -> ProcessInfo | None:
+        """Look up the process of a session, once per process rather than per session"""
+        key = (handle.pid, handle.process_create_time)
+        process = self._processes.get(key)
+        if process is None:
+            name = handle.process_name
+            if name is None:
+                return None
+            process = self._processes[key] = ProcessInfo(
+                handle.pid, name, handle.process_create_time
+            )
+        return process
+
+    def _index_session(self, session: SoftwareSession) -> None:
+        self._sessions_by_name.setdefault(session.name, []).append(session)
+        if session.normalized_name not in self._sessions_by_normalized_name:
+            self._target_names.clear()  # A new name may contain any target
+        self._sessions_by_normalized_name.setdefault(
+            session.normalized_name, []
+        ).append(session)
+
+    def _unindex_session(self, session: SoftwareSession) -> None:
+        # Forget the process once its last session is gone, as its PID may be reused
+        process = session.process
+        if not any(
+            other.process is process and other is not session
+            for other in self._sessions_by_name[session.name]
+        ):
+            del self._processes[(process.pid, process.create_time)]
+        for index, name in (
+            (self._sessions_by_name, session.name),
+            (self._sessions_by_normalized_name, session.normalized_name),
+        ):
+            sessions = index[name]
+            sessions.remove(session)
+            if not sessions:
+                del index[name]
+                if index is self._sessions_by_normalized_name:
+                    self._target_names.clear()
+
+    def _reconcile_devices(self, changes: SessionChanges) -> None:
+        current = {
+            handle.id: handle
+            for handle in self.all_devices
+            if handle.name is not None and handle.is_present
+        }
+        # A device that changed state gets a new wrapper, with a handle that works in
+        # the new state
+        for device_id in [
+            device_id
+            for device_id in self._devices
+            if device_id not in current
+            or current[device_id].state != self._device_states[device_id]
+        ]:
+            device = self._devices.pop(device_id)
+            del self._device_states[device_id]
+            self._unwatch_volume(device.device)
+            if self.devices.get(device.name) is device:
+                del self.devices[device.name]
+            changes.removed_devices.append(device)
+            logger.info(f"Removed device session: {device.name}")
+        for device_id, handle in current.items():
+            if device_id in self._devices:
+                continue
+            device = Device(handle)
+            self._devices[device_id] = device
+            self._device_states[device_id] = handle.state
+            self._watch_volume(device, handle)
+            self.devices[device.name] = device
+            changes.added_devices.append(device)
+            logger.info(f"Created device session: {device.name}")
+        if changes.added_devices or changes.removed_devices:
+            self._normalized_device_names = {}
+            for name, device in self.devices.items():
+                self._normalized_device_names.setdefault(name.lower().strip(), device)
+            self._device_targets.clear()
+
+    def _watch_volume(self, session: Session, handle: VolumeHandle) -> None:
+        if self.volume_changes is not None:
+            self.volume_changes.watch(
+                handle, lambda volume: self._report_volume_change(session, volume)
+            )
+
+    def _unwatch_volume(self, handle: VolumeHandle) -> None:
+        """Stop watching a handle. Sessions and devices are often unwatched because
+        they are gone, so a failure is expected and only logged.
+        """
+        if self.volume_changes is None:
+            return
+        try:
+            self.volume_changes.unwatch(handle)
+        except AudioBackendError as e:
+            logger.debug(f"Could not unwatch the volume of {handle}: {e}")
+
+    def _report_volume_change(self, session: Session, volume: float) -> None:
+        if self.on_volume_changed is not None:
+            self.on_volume_changed(session, volume)
 
     def get_software_session_by_name(self, session_name: str) -> Session:
-        return next((s for s in self.software_sessions if s.name == session_name), None)
+        sessions = self._sessions_by_name.get(session_name)
+        return sessions[0] if sessions else None
 
     def get_software_session_by_unique_name(self, unique_name: str) -> Session:
         return next(
             (s for s in self.software_sessions if s.unique_name == unique_name), None
         )
 
+    def find_software_sessions(self, target: str) -> list[SoftwareSession]:
+        """The sessions whose process name contains `target`, ignoring case"""
+        target = target.lower()
+        names = self._target_names.get(target)
+        if names is None:
+            # Only scans the distinct names, and only until the names change
+            names = self._target_names[target] = [
+                name for name in self._sessions_by_normalized_name if target in name
+            ]
+        return [
+            session
+            for name in names
+            for session in self._sessions_by_normalized_name[name]
+        ]
+
     def get_device_session(self, specified_device_name: str) -> Device:
         """
         See if the device is a substring of any device name.
         If not, raise an error.
         """
         target_name = specified_device_name.lower().strip()
+        if target_name not in self._device_targets:
+            self._device_targets[target_name] = self._resolve_device_target(target_name)
+        device = self._device_targets[target_name]
+        if device is None:
+            raise ValueError(f"Device {specified_device_name} not found.")
+        return device
 
-        # Check if target is substring of any device name
-        for device_name, device in self.devices.items():
-            device_name_lower = device_name.lower().strip()
-            if target_name in device_name_lower:
-                return device
+    def _resolve_device_target(self, target_name: str) -> Device | None:
+        """Find the first device whose name contains the target. Runs once per target
+        until the devices change.
+        """
+        matches = [
+            device
+            for name, device in self._normalized_device_names.items()
+            if target_name in name
+        ]
+        if len(matches) > 1:
+            logger.warning(
+                f"Device target '{target_name}' matches {len(matches)} devices, "
+                f"using {matches[0].name}: "
+                + ", ".join(device.name for device in matches)
+            )
+        return matches[0] if matches else None
 
-        raise ValueError(f"Device {specified_device_name} not found.")
+    def apply_volumes(
+        self, values: dict[int, float], mapping: dict[int, SessionGroup]
+    ) -> list[Session]:
+        """Apply volume values to the mapped sessions, and return the sessions that
+        expired.
 
-    def create_device_sessions(self):
-        for pycaw_device in self.all_pycaw_devices:
-            # try:
+        Only the sliders present in `values` are touched, and only if their volume
+        differs from the one last applied to the same session group. Sessions that fail
+        are left out until the next reconciliation, which should be requested when any
+        expired.
+        """
+        expired = []
+        for index, volume in values.items():
+            session_group = mapping.get(index)
+            if session_group is None:
+                continue
+            volume = self._quantize(volume)
+            applied = self._applied_volumes.get(index)
             if (
-                pycaw_device.FriendlyName == None
-                or pycaw_device.state == AudioDeviceState.NotPresent
+                applied is not None
+                and applied[0] is session_group
+                and abs(volume - applied[1]) <= self.volume_epsilon
+                # The ends are always reached
+                and (volume not in (0.0, 1.0) or volume == applied[1])
             ):
+                self.volumes_skipped += 1
                 continue
-            device = Device(pycaw_device)
-            self.devices[device.name] = device
-            logger.info(f"Created device session: {device.name}")
+            errors = session_group.set_volume(volume, self.volume_pool)
+            self._applied_volumes[index] = (session_group, volume)
+            self.volumes_dispatched += 1
+            for session, error in errors.items():
+                if session.is_expired:
+                    logger.info(
+                        f"{session.unique_name} expired, skipping it until it is "
+                        f"reconciled: {error}"
+                    )
+                    expired.append(session)
+                else:
+                    logger.warning(
+                        f"Could not set the volume of {session.unique_name}: {error}"
+                    )
+        if expired:
+            self._expired_sessions.extend(expired)
+            self.invalidate_snapshot()
+        return expired
 
+    def close(self) -> None:
+        """Stop the volume workers, once no more volumes are applied"""
+        if self.volume_pool is not None:
+            self.volume_pool.close()
 
-    def apply_volumes(
-        self, values: list[float], mapping: dict[int, SessionGroup], inverted: bool
-    ) -> None:
-        """Apply volume values to the mapped sessions"""
-        for index, session_group in mapping.items():
-            volume = values[index]
-            if inverted:
-                volume = 1 - volume
-            session_group.set_volume(volume)
+    def forget_applied_volume(self, index: int) -> None:
+        """Apply the next volume of a slider even if it is unchanged, e.g. after a
+        change outside WaVeS
+        """
+        self._applied_volumes.pop(index, None)
+
+    def _quantize(self, volume: float) -> float:
+        volume = max(0.0, min(volume, 1.0))
+        if not self.volume_step:
+            return volume
+        return min(round(volume / self.volume_step) * self.volume_step, 1.0)
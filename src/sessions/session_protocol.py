@@ -1,29 +1,37 @@
+from collections.abc import Callable
 from typing import Protocol
-from sessions.sessions import Session
+from sessions.sessions import Session, SessionChanges
 
 
 class SessionManagerProtocol(Protocol):
 
     software_sessions: dict[str, Session]
     devices: dict[str, Session]
+    volumes_dispatched: int
+    volumes_skipped: int
+    on_volume_changed: Callable[[Session, float], None] | None
 
     @property
     def master_session(self) -> Session: ...
     @property
     def system_session(self) -> Session: ...
 
-    def reload_sessions_and_devices(self) -> None: ...
+    def reload_sessions_and_devices(self) -> SessionChanges: ...
 
     def check_for_changes(self) -> bool: ...
 
+    def invalidate_snapshot(self) -> None: ...
+
     def apply_volumes(
-        self, values: list[float], mapping: dict[int, Session], inverted: bool
-    ) -> None: ...
+        self, values: dict[int, float], mapping: dict[int, Session]
+    ) -> list[Session]: ...
+
+    def forget_applied_volume(self, index: int) -> None: ...
 
     def get_software_session(self, session_name: str) -> Session: ...
 
-    def get_device_session(self, device_name: str) -> Session: ...
+    def find_software_sessions(self, target: str) -> list[Session]: ...
 
-    def create_software_sessions(self) -> None: ...
+    def get_device_session(self, device_name: str) -> Session: ...
 
-    def create_device_sessions(self) -> None: ...
+    def close(self) -> None: ...
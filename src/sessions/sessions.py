@@ -1,24 +1,18 @@
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume, AudioSession, AudioDevice
 from abc import ABC, abstractmethod
-from _ctypes import COMError
-import warnings
-import comtypes
-from pycaw.pycaw import (
-    AudioUtilities,
-    IMMDeviceEnumerator,
-    EDataFlow,
-    ERole,
-)
-from pycaw.api.mmdeviceapi import IMMDeviceEnumerator
-from pycaw.constants import CLSID_MMDeviceEnumerator
-
-warnings.filterwarnings("ignore", message="COMError attempting to get property.*")
+from dataclasses import dataclass, field
+from sessions.audio_backend_protocol import DeviceHandle, SessionHandle, VolumeHandle
+from sessions.session_exceptions import AudioBackendError
+from sessions.volume_pool import VolumeWorkerPool
 
 
 class Session(ABC):
 
+    # A tombstone: set once a call failed because the session is gone, to skip it
+    is_expired = False
+
+    def mark_as_expired(self) -> None:
+        self.is_expired = True
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -47,22 +41,40 @@ class Session(ABC):
         pass
 
 
+@dataclass(frozen=True)
+class ProcessInfo:
+    """What is known about the process of a session, looked up once per process"""
+
+    pid: int
+    name: str
+    create_time: float | None = None  # Tells apart processes that reused a PID
+    normalized_name: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "normalized_name", self.name.lower())
+
+
 class SoftwareSession(Session):
 
-    def __init__(self, session: AudioSession):
+    def __init__(self, session: SessionHandle, process: ProcessInfo):
         self.session = session
-        self.volume = self.session.SimpleAudioVolume
+        self.process = process
+        self._unique_name = f"{process.name} ({process.pid})"
         self._is_mapped = False
 
     @property
     def name(self) -> str:
-        """The unique identifier combining process name and PID"""
-        return self.session.Process.name()
+        """The process name, shared by all sessions of a program"""
+        return self.process.name
+
+    @property
+    def normalized_name(self) -> str:
+        return self.process.normalized_name
 
     @property
     def unique_name(self) -> str:
         """The display name including PID, used for UI purposes"""
-        return self.session.Process.name() + f" ({self.session.Process.pid})"
+        return self._unique_name
 
     @property
     def is_mapped(self) -> bool:
@@ -72,10 +84,10 @@ class SoftwareSession(Session):
         return f"SoftwareSession(unique_name={self.unique_name})"
 
     def set_volume(self, value: float) -> None:
-        self.volume.SetMasterVolume(value, None)
+        self.session.set_volume(value)
 
     def get_volume(self) -> float:
-        return self.volume.GetMasterVolume()
+        return self.session.get_volume()
 
     def mark_as_mapped(self, value: bool) -> None:
         self._is_mapped = value
@@ -83,14 +95,8 @@ class SoftwareSession(Session):
 
 class MasterSession(Session):
 
-    def __init__(self):
-        # Pycaw code to get the master volume interface
-        self.volume = cast(
-            AudioUtilities.GetSpeakers().Activate(
-                IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None
-            ),
-            POINTER(IAudioEndpointVolume),
-        )
+    def __init__(self, volume: VolumeHandle):
+        self.volume = volume
         self._is_mapped = False
 
     @property
@@ -106,31 +112,22 @@ class MasterSession(Session):
         return self._is_mapped
 
     def set_volume(self, value: float) -> None:
-        self.volume.SetMasterVolumeLevelScalar(value, None)  # Decibels for some reason
+        self.volume.set_volume(value)
 
     def get_volume(self) -> float:
-        return self.volume.GetMasterVolumeLevelScalar()
+        return self.volume.get_volume()
 
     def mark_as_mapped(self, value: bool) -> None:
         self._is_mapped = value
 
+    def mark_as_expired(self) -> None:
+        pass  # Outlives every application, so a failed call is no reason to stop trying
+
 
 class SystemSession(Session):
 
-    def __init__(self):
-        available_pycaw_sessions = AudioUtilities.GetAllSessions()
-        system_pycaw_session = next(
-            (
-                session
-                for session in available_pycaw_sessions
-                if "SystemRoot" in session.DisplayName
-            ),
-            None,
-        )
-        if system_pycaw_session is None:
-            raise RuntimeError("System sounds session could not be found.")
-        self.session = system_pycaw_session
-        self.volume = self.session.SimpleAudioVolume
+    def __init__(self, session: SessionHandle):
+        self.session = session
         self._is_mapped = False
 
     @property
@@ -146,62 +143,34 @@ class SystemSession(Session):
         return self._is_mapped
 
     def set_volume(self, value: float) -> None:
-        self.volume.SetMasterVolume(value, None)
+        self.session.set_volume(value)
 
     def get_volume(self) -> float:
-        return self.volume.GetMasterVolume()
+        return self.session.get_volume()
 
     def mark_as_mapped(self, value: bool) -> None:
         self._is_mapped = value
 
+    def mark_as_expired(self) -> None:
+        pass  # Outlives every application, so a failed call is no reason to stop trying
 
-class Device(AudioDevice, Session):
-
-    def __init__(self, pycaw_device: AudioDevice):
-        # Initialize AudioDevice with all the required fields from the source device
-        AudioDevice.__init__(
-            self,
-            id=pycaw_device.id,
-            state=pycaw_device.state,
-            properties=pycaw_device.properties,
-            dev=pycaw_device._dev,
-        )
-        self.pycaw_device = pycaw_device
-        self.volume = self._get_volume_interface()
-        self._is_mapped = False
-
-    def _get_volume_interface(self):
-        device_enumerator = comtypes.CoCreateInstance(
-            CLSID_MMDeviceEnumerator, IMMDeviceEnumerator, comtypes.CLSCTX_INPROC_SERVER
-        )
 
-        speaker = (
-            device_enumerator.GetDevice(self.pycaw_device.id)
-            if self.pycaw_device.id is not None
-            else device_enumerator.GetDefaultAudioEndpoint(
-                EDataFlow.eRender.value, ERole.eMultimedia.value
-            )
-        )
+class Device(Session):
 
-        if not speaker:
-            raise RuntimeError(
-                f"Could not get speaker interface for device: {self.pycaw_device}"
-            )
-
-        try:
-            return cast(
-                speaker.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None),
-                POINTER(IAudioEndpointVolume),
-            )
-        except COMError:
-            pass  # If the device is not active, the COMError will be raised
+    def __init__(self, device: DeviceHandle):
+        self.device = device
+        self._is_mapped = False
 
     def __repr__(self):
-        return f"{self.pycaw_device.FriendlyName} - {self.pycaw_device.state}"
+        return repr(self.device)
+
+    @property
+    def id(self) -> str:
+        return self.device.id
 
     @property
     def name(self) -> str:
-        return self.pycaw_device.FriendlyName
+        return self.device.name
 
     @property
     def unique_name(self) -> str:
@@ -212,32 +181,93 @@ class Device(AudioDevice, Session):
         return self._is_mapped
 
     def set_volume(self, value: float) -> None:
-        self.volume.SetMasterVolumeLevelScalar(value, None)  # Decibels for some reason
+        self.device.set_volume(value)
 
     def get_volume(self) -> float:
-        return self.volume.GetMasterVolumeLevelScalar()
+        return self.device.get_volume()
 
     def mark_as_mapped(self, value: bool) -> None:
         self._is_mapped = value
 
-class SessionGroup():
+    def mark_as_expired(self) -> None:
+        # Disabled and unplugged devices are removed by their state in the enumeration
+        pass
+
+
+class SessionGroup:
     def __init__(self, sessions: list[Session]):
         self.sessions = sessions
 
-        # If there is only one session, the volume is the same as the session. Otherwise, 50% is assigned for simplicity.
-        if len(sessions) == 1:
-            self._volume = sessions[0].get_volume()
-        else:
-            self._volume = 0.5
-
-    def set_volume(self, value: float) -> None:
-        """Set the volume for all sessions in the group"""
+        # The volume of the first session that answers, like a volume change of any
+        # session becomes the volume of the group. Unknown until the slider moves if
+        # no session answers, e.g. when the group is empty.
+        self._volume: float | None = None
+        for session in sessions:
+            try:
+                self._volume = session.get_volume()
+                break
+            except AudioBackendError:
+                # Gone already. The first volume change marks it expired and reports it
+                continue
+
+    def set_volume(
+        self, value: float, pool: VolumeWorkerPool | None = None
+    ) -> dict[Session, AudioBackendError]:
+        """Set the volume for all sessions in the group, and return the errors by
+        session.
+
+        One failing session does not keep the others from being set. Failing sessions
+        are marked as expired and left out from then on. Large groups are set on the
+        workers of `pool`, if given.
+        """
         value = max(0, min(value, 1))  # Clamp value to 0-1
         self._volume = value
-        for session in self.sessions:
-            session.set_volume(value)
-
-    def get_volume(self) -> float:
+        if pool is not None and len(self.sessions) >= pool.threshold:
+            errors = pool.set_volumes(
+                [s for s in self.sessions if not s.is_expired], value
+            )
+        else:
+            errors = {}
+            for session in self.sessions:
+                if session.is_expired:
+                    continue
+                try:
+                    session.set_volume(value)
+                except AudioBackendError as e:
+                    errors[session] = e
+        if errors:
+            self._expire(errors)
+        return errors
+
+    def update_volume(self, value: float) -> None:
+        """Take a volume that was changed outside WaVeS, e.g. in the Windows mixer.
+
+        The last change of any session in the group becomes the volume of the group.
+        """
+        self._volume = max(0, min(value, 1))
+
+    def _expire(self, sessions) -> None:
+        for session in sessions:
+            session.mark_as_expired()
+        self.sessions = [session for session in self.sessions if not session.is_expired]
+
+    def get_volume(self) -> float | None:
         return self._volume
-    
-    
\ No newline at end of file
+
+
+@dataclass
+class SessionChanges:
+    """The sessions and devices that appeared or vanished since the last reconcile"""
+
+    added_sessions: list[SoftwareSession] = field(default_factory=list)
+    removed_sessions: list[SoftwareSession] = field(default_factory=list)
+    added_devices: list[Device] = field(default_factory=list)
+    removed_devices: list[Device] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added_sessions
+            or self.removed_sessions
+            or self.added_devices
+            or self.removed_devices
+        )
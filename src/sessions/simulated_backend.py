@@ -0,0 +1,312 @@
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from sessions.audio_backend_protocol import (
+    AudioBackendProtocol,
+    VolumeChangeSourceProtocol,
+)
+from sessions.audio_event_protocol import AudioEventSourceProtocol
+from sessions.audio_events import AudioEvent, AudioEventKind
+from sessions.session_exceptions import AudioBackendError
+from utils.logger import logger
+
+# Passed along with every volume WaVeS sets, like the event context GUID on Windows
+WAVES_EVENT_CONTEXT = "WaVeS"
+
+DEFAULT_PROCESS_NAMES = (
+    "chrome.exe",
+    "firefox.exe",
+    "msedge.exe",
+    "spotify.exe",
+    "discord.exe",
+    "teams.exe",
+    "steam.exe",
+    "vlc.exe",
+    "obs64.exe",
+    "zoom.exe",
+)
+
+
+class SimulatedVolume:
+    def __init__(self, backend: "SimulatedBackend", volume: float = 1.0) -> None:
+        self.backend = backend
+        self.volume = volume
+        self.expired = False
+
+    def set_volume(self, value: float) -> None:
+        self.backend.call("set_volume")
+        if self.expired:
+            raise AudioBackendError(f"{self} has expired")
+        self.backend.change_volume(self, value, WAVES_EVENT_CONTEXT)
+
+    def get_volume(self) -> float:
+        self.backend.call("get_volume")
+        if self.expired:
+            raise AudioBackendError(f"{self} has expired")
+        return self.volume
+
+
+class SimulatedSession(SimulatedVolume):
+    def __init__(
+        self,
+        backend: "SimulatedBackend",
+        pid: int | None,
+        process_name: str | None,
+        is_system: bool = False,
+    ) -> None:
+        super().__init__(backend)
+        self.key = f"session-{next(backend._session_keys)}"
+        self.pid = pid
+        self._process_name = process_name
+        self.process_create_time = None if pid is None else time.time()
+        self.is_system = is_system
+
+    @property
+    def process_name(self) -> str | None:
+        # A system call on Windows, so only counted. Latency and failures would hide it.
+        self.backend.calls["process_name"] += 1
+        return self._process_name
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expired
+
+    def __repr__(self) -> str:
+        return f"SimulatedSession({self._process_name}, pid={self.pid})"
+
+
+class SimulatedDevice(SimulatedVolume):
+    def __init__(self, backend: "SimulatedBackend", id: str, name: str) -> None:
+        super().__init__(backend)
+        self.id = id
+        self.name = name
+        self.is_present = True
+        self.is_active = True
+
+    @property
+    def state(self) -> str:
+        if self.is_active:
+            return "Active"
+        return "Disabled" if self.is_present else "NotPresent"
+
+    def __repr__(self) -> str:
+        return f"{self.name} - {self.state}"
+
+
+class SimulatedEventSource(AudioEventSourceProtocol):
+    def __init__(self, backend: "SimulatedBackend") -> None:
+        self.backend = backend
+        self.on_event: Callable[[AudioEvent], None] | None = None
+
+    def start(self, on_event: Callable[[AudioEvent], None]) -> None:
+        self.on_event = on_event
+        self.backend.event_sources.append(self)
+
+    def stop(self) -> None:
+        self.backend.event_sources.remove(self)
+
+
+class SimulatedVolumeChangeSource(VolumeChangeSourceProtocol):
+    def __init__(self, backend: "SimulatedBackend") -> None:
+        self.backend = backend
+        self.watchers: dict[SimulatedVolume, Callable[[float], None]] = {}
+        backend.volume_change_sources.append(self)
+
+    def watch(
+        self, handle: SimulatedVolume, on_change: Callable[[float], None]
+    ) -> None:
+        if not getattr(handle, "is_active", True):
+            return
+        try:
+            # Registering activates the volume interface, failing for expired handles
+            self.backend.call("watch")
+            if handle.expired:
+                raise AudioBackendError(f"{handle} has expired")
+        except AudioBackendError as e:
+            logger.warning(f"Could not watch the volume of {handle}: {e}")
+            return
+        self.watchers[handle] = on_change
+
+    def unwatch(self, handle: SimulatedVolume) -> None:
+        if self.watchers.pop(handle, None) is None:
+            return
+        # Unregistering goes through the volume interface as well, so it fails once
+        # the handle expired, like touching the interface of a disabled device does
+        self.backend.call("unwatch")
+        if handle.expired:
+            raise AudioBackendError(f"{handle} has expired")
+
+    def notify(
+        self, handle: SimulatedVolume, value: float, context: str | None
+    ) -> None:
+        on_change = self.watchers.get(handle)
+        if on_change is not None and context != WAVES_EVENT_CONTEXT:
+            on_change(value)
+
+
+class SimulatedBackend(AudioBackendProtocol):
+    """An in-memory stand-in for the Windows audio stack, to test and benchmark without
+    Windows.
+
+    Every call sleeps for `latency` seconds and fails with an AudioBackendError at
+    `failure_rate`, like a slow or flaky COM call would. Sessions and devices can be
+    started, ended, plugged and unplugged at any time, from any thread, and are reported
+    to the event sources it created. `calls` counts the calls by name.
+    """
+
+    def __init__(
+        self,
+        n_sessions: int = 0,
+        n_devices: int = 1,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        process_names: tuple[str, ...] = DEFAULT_PROCESS_NAMES,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.process_names = process_names
+        self.calls: Counter[str] = Counter()
+        self.event_sources: list[SimulatedEventSource] = []
+        self.volume_change_sources: list[SimulatedVolumeChangeSource] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pids = itertools.count(1000, 4)
+        self._session_keys = itertools.count()
+        self._device_ids = itertools.count()
+        self.master = SimulatedVolume(self)
+        self.sessions: dict[int, SimulatedSession] = {}
+        self.system_session = SimulatedSession(
+            self, pid=None, process_name=None, is_system=True
+        )
+        self.devices: dict[str, SimulatedDevice] = {}
+        for _ in range(n_devices):
+            self.add_device()
+        for _ in range(n_sessions):
+            self.start_session()
+
+    def call(self, name: str) -> None:
+        """Account for one backend call, with its latency and chance of failure"""
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise AudioBackendError(f"Simulated failure of {name}")
+
+    def _emit(self, event: AudioEvent) -> None:
+        for event_source in list(self.event_sources):
+            event_source.on_event(event)
+
+    # Backend interface
+
+    def initialize_thread(self) -> None:
+        pass
+
+    def uninitialize_thread(self) -> None:
+        pass
+
+    def get_sessions(self) -> list[SimulatedSession]:
+        self.call("get_sessions")
+        with self._lock:
+            return [self.system_session, *self.sessions.values()]
+
+    def get_devices(self) -> list[SimulatedDevice]:
+        self.call("get_devices")
+        with self._lock:
+            return list(self.devices.values())
+
+    def get_master_volume(self) -> SimulatedVolume:
+        self.call("get_master_volume")
+        return self.master
+
+    def create_event_source(self) -> SimulatedEventSource:
+        return SimulatedEventSource(self)
+
+    def create_volume_change_source(self) -> SimulatedVolumeChangeSource:
+        return SimulatedVolumeChangeSource(self)
+
+    # Simulation controls
+
+    def start_session(self, process_name: str | None = None) -> SimulatedSession:
+        with self._lock:
+            if process_name is None:
+                process_name = self._random.choice(self.process_names)
+            session = SimulatedSession(
+                self, pid=next(self._pids), process_name=process_name
+            )
+            self.sessions[session.pid] = session
+        self._emit(AudioEvent(AudioEventKind.SESSION_CREATED, pid=session.pid))
+        return session
+
+    def end_session(self, pid: int) -> None:
+        """End a session. Its handles expire, and it no longer shows up in the
+        enumeration.
+
+        Like on Windows, no event reports that a session ended.
+        """
+        with self._lock:
+            session = self.sessions.pop(pid)
+        session.expired = True
+
+    def add_device(self, name: str | None = None) -> SimulatedDevice:
+        with self._lock:
+            index = next(self._device_ids)
+            device = SimulatedDevice(
+                self, id=f"device-{index}", name=name or f"Speakers ({index})"
+            )
+            self.devices[device.id] = device
+        self._emit(AudioEvent(AudioEventKind.DEVICE_ADDED, device_id=device.id))
+        return device
+
+    def unplug_device(self, device_id: str) -> None:
+        with self._lock:
+            device = self.devices[device_id]
+            device.is_present = False
+            device.is_active = False
+            device.expired = True
+        self._emit(AudioEvent(AudioEventKind.DEVICE_STATE_CHANGED, device_id=device_id))
+
+    def disable_device(self, device_id: str) -> None:
+        """Disable a device in the sound settings. It is still listed, but its volume
+        cannot be used.
+        """
+        with self._lock:
+            device = self.devices[device_id]
+            device.is_active = False
+            device.expired = True
+        self._emit(AudioEvent(AudioEventKind.DEVICE_STATE_CHANGED, device_id=device_id))
+
+    def enable_device(self, device_id: str) -> None:
+        with self._lock:
+            device = self.devices[device_id]
+            device.is_present = True
+            device.is_active = True
+            device.expired = False
+        self._emit(AudioEvent(AudioEventKind.DEVICE_STATE_CHANGED, device_id=device_id))
+
+    def change_volume(
+        self, handle: SimulatedVolume, value: float, context: str | None = None
+    ) -> None:
+        """Change a volume like the Windows mixer or the application would, outside
+        WaVeS.
+
+        Like on Windows, every watcher is notified along with the event context of the
+        change.
+        """
+        handle.volume = value
+        for source in list(self.volume_change_sources):
+            source.notify(handle, value, context)
+
+    def churn(self, n_started: int, n_ended: int) -> None:
+        """Start and end random sessions, like browser tabs playing media"""
+        with self._lock:
+            ended = self._random.sample(
+                sorted(self.sessions), min(n_ended, len(self.sessions))
+            )
+        for pid in ended:
+            self.end_session(pid)
+        for _ in range(n_started):
+            self.start_session()
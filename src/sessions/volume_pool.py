@@ -0,0 +1,77 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from sessions.audio_backend_protocol import VolumeHandle
+from sessions.session_exceptions import AudioBackendError
+
+
+class VolumeWorkerPool:
+    """Sets the volume of the sessions of large groups at the same time, on worker
+    threads.
+
+    Each volume change is a COM call that can take milliseconds, so a group of many
+    sessions takes as long as all of them one after the other. Groups of at least
+    `threshold` sessions are spread over `workers` threads instead, which take about as
+    long as the slowest call. Every worker runs `initializer` first, e.g. to initialize
+    COM, and `uninitializer` when the pool is closed.
+    """
+
+    def __init__(
+        self,
+        initializer: Callable[[], None] | None = None,
+        uninitializer: Callable[[], None] | None = None,
+        workers: int = 8,
+        threshold: int = 16,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(
+                f"A volume worker pool needs at least one worker, got {workers}"
+            )
+        self.threshold = threshold
+        self.initializer = initializer
+        self.uninitializer = uninitializer
+        self._workers_started = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="VolumeWorker",
+            initializer=self._initialize_worker,
+        )
+
+    def _initialize_worker(self) -> None:
+        if self.initializer is not None:
+            self.initializer()
+        with self._lock:
+            self._workers_started += 1
+
+    def set_volumes(
+        self, sessions: list[VolumeHandle], value: float
+    ) -> dict[VolumeHandle, AudioBackendError]:
+        """Set the volume of all sessions, and return the errors by session"""
+        futures = {
+            session: self._executor.submit(session.set_volume, value)
+            for session in sessions
+        }
+        errors = {}
+        for session, future in futures.items():
+            error = future.exception()
+            if isinstance(error, AudioBackendError):
+                errors[session] = error
+            elif error is not None:
+                raise error
+        return errors
+
+    def close(self) -> None:
+        """Run `uninitializer` on every worker that was started, and stop the workers"""
+        if self.uninitializer is not None and self._workers_started:
+            # Each task holds its worker until all of them have one, so every worker
+            # runs exactly one
+            barrier = threading.Barrier(self._workers_started)
+
+            def uninitialize() -> None:
+                barrier.wait(timeout=1.0)
+                self.uninitializer()
+
+            for _ in range(self._workers_started):
+                self._executor.submit(uninitialize)
+        self._executor.shutdown(wait=True)
@@ -1,3 +1,4 @@
+import os
 import pytest
 from unittest.mock import patch
 import yaml
@@ -6,7 +7,6 @@ from pathlib import Path
 from config.config_exceptions import ConfigValidationError, ConfigFileEmptyError
 
 
-
 @pytest.fixture
 def default_mapping_path(tmp_path):
     # Create a default mapping file with test content
@@ -64,9 +64,18 @@ def test_ensure_config_exists__does_not_exist(config_manager: ConfigManager):
 def test_load_config__successful_load(config_manager: ConfigManager):
     # Arrange: Set up a config file with known content
     test_content = {
-        "mappings": {0:  ["master"], 1: ["system"]},
-        "device": {"name": "Test Device", "port": "COM1", "baudrate": 9600, "sliders": 2},
-        "settings": {"inverted": False, "system_in_unmapped": True, "session_reload_interval": 10},
+        "mappings": {0: ["master"], 1: ["system"]},
+        "device": {
+            "name": "Test Device",
+            "port": "COM1",
+            "baudrate": 9600,
+            "sliders": 2,
+        },
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 10,
+        },
     }
     config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
     config_manager.config_file_path.write_text(yaml.dump(test_content))
@@ -74,7 +83,35 @@ def test_load_config__successful_load(config_manager: ConfigManager):
     # Act
     config_manager.load_config()
 
-    # Assert: Verify internal state was set correctly
+    # Assert: Verify internal state was set, including defaults for optional settings
+    test_content["device"].update(
+        {
+            "protocol": "ascii",
+            "resolution_bits": 10,
+            "drain_backlog": True,
+            "read_timeout": None,
+            "sync_bandwidth_share": 0.25,
+            "vid": None,
+            "pid": None,
+            "serial_number": None,
+            "offset": None,
+        }
+    )
+    test_content["devices"] = []
+    test_content["sliders"] = {}
+    test_content["settings"].update(
+        {
+            "session_discovery": "events",
+            "session_safety_poll_interval": 30,
+            "sync_min_interval": 0.1,
+            "apply_interval": 0.01,
+            "volume_step": 0.01,
+            "volume_epsilon": 0.0,
+            "volume_workers": 0,
+            "volume_worker_threshold": 16,
+            "track_volume_changes": True,
+        }
+    )
     assert config_manager.config_data == test_content
 
 
@@ -112,6 +149,13 @@ def test_get_setting__successful_retrieval(config_manager: ConfigManager):
     assert config_manager.get_setting("settings.inverted") == False
 
 
+def test_get_setting__default(config_manager: ConfigManager):
+    config_manager.config_data = {"device": {"name": None}}
+
+    assert config_manager.get_setting("device.name", default="fallback") == "fallback"
+    assert config_manager.get_setting("device.port", default=None) is None
+
+
 def test_get_setting__nested_setting_not_found(config_manager: ConfigManager):
     # Arrange: Set up internal state
     config_manager.config_data = {"device": {"name": "Test Device"}}
@@ -231,6 +275,93 @@ def test_get_serial_port__empty_ports_list(config_manager: ConfigManager):
         assert config_manager.get_serial_port() == "COM6"
 
 
+def test_get_devices__single_device(config_manager: ConfigManager):
+    config_manager.config_data = {
+        "device": {"name": "Test Device", "sliders": 5, "offset": None},
+        "devices": [],
+    }
+
+    devices = config_manager.get_devices()
+    assert [device["offset"] for device in devices] == [0]
+    assert config_manager.get_slider_count() == 5
+
+
+def test_get_devices__multiple_devices(config_manager: ConfigManager):
+    config_manager.config_data = {
+        "device": None,
+        "devices": [
+            {"name": "Left", "sliders": 4, "offset": None},
+            {"name": "Right", "sliders": 3, "offset": None},
+            {"name": "Extra", "sliders": 2, "offset": 10},
+        ],
+    }
+
+    devices = config_manager.get_devices()
+    assert [device["offset"] for device in devices] == [0, 4, 10]
+    assert config_manager.get_slider_count() == 12
+
+
+def test_get_serial_port__explicit_device(config_manager: ConfigManager):
+    mock_ports = [("COM1", "Left Board", "hwid1"), ("COM2", "Right Board", "hwid2")]
+
+    with patch("serial.tools.list_ports.comports", return_value=mock_ports):
+        assert (
+            config_manager.get_serial_port({"name": "Right", "port": "COM9"}) == "COM2"
+        )
+        assert (
+            config_manager.get_serial_port({"name": "Missing", "port": "COM9"})
+            == "COM9"
+        )
+
+
+def test_load_config__no_device(config_manager: ConfigManager):
+    invalid_content = {
+        "mappings": {0: ["master"]},
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 1,
+        },
+    }
+    config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
+    config_manager.config_file_path.write_text(yaml.dump(invalid_content))
+
+    with pytest.raises(ConfigValidationError, match="Either 'device' or 'devices'"):
+        config_manager.load_config()
+
+
+def test_load_config__slider_settings(config_manager: ConfigManager):
+    content = {
+        "mappings": {0: ["master"]},
+        "device": {
+            "name": "Test Device",
+            "port": "COM1",
+            "baudrate": 9600,
+            "sliders": 2,
+        },
+        "sliders": {1: {"min": 20, "max": 1000, "curve": [[0, 0], [0.5, 0.2], [1, 1]]}},
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 1,
+        },
+    }
+    config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    config_manager.load_config()
+
+    slider = config_manager.get_setting("sliders")[1]
+    assert slider["min"] == 20
+    assert slider["inverted"] is None
+    assert slider["deadband"] == 2
+    assert slider["curve"] == [(0, 0), (0.5, 0.2), (1, 1)]
+
+    content["sliders"] = {1: {"dead_zone_low": 0.6, "dead_zone_high": 0.5}}
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    with pytest.raises(ConfigValidationError, match="Dead zones"):
+        config_manager.load_config()
+
+
 def test_get_default_config_path():
     """Test that the default config path is correctly constructed."""
     expected_path = Path.home() / "AppData/Roaming"
@@ -243,7 +374,7 @@ def test_load_config__invalid_schema(config_manager: ConfigManager):
     invalid_content = {
         "mappings": {"0": ["master"]},
         "device": {"name": "Test Device"},  # Missing required fields
-        "settings": {"inverted": False}  # Missing required fields
+        "settings": {"inverted": False},  # Missing required fields
     }
     config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
     config_manager.config_file_path.write_text(yaml.dump(invalid_content))
@@ -256,11 +387,11 @@ def test_load_config__invalid_schema(config_manager: ConfigManager):
 def test_get_setting__invalid_path_format(config_manager: ConfigManager):
     """Test that invalid path formats raise appropriate errors."""
     config_manager.config_data = {"device": {"name": "Test Device"}}
-    
+
     # Test empty path
     with pytest.raises(ValueError):
         config_manager.get_setting("")
-    
+
     # Test path with leading/trailing dots
     with pytest.raises(ValueError):
         config_manager.get_setting(".device.name")
@@ -271,7 +402,7 @@ def test_get_setting__invalid_path_format(config_manager: ConfigManager):
 def test_get_setting__non_string_path(config_manager: ConfigManager):
     """Test that non-string paths raise TypeError."""
     config_manager.config_data = {"device": {"name": "Test Device"}}
-    
+
     with pytest.raises(AttributeError):
         config_manager.get_setting(None)
     with pytest.raises(AttributeError):
@@ -282,10 +413,7 @@ def test_get_serial_port__invalid_port_format(config_manager: ConfigManager):
     """Test that invalid port formats are handled appropriately."""
     # Setup config with invalid port format
     config_manager.config_data = {
-        "device": {
-            "name": "Nonexistent Device",
-            "port": "INVALID_PORT"
-        }
+        "device": {"name": "Nonexistent Device", "port": "INVALID_PORT"}
     }
 
     # Mock empty ports list
@@ -314,6 +442,155 @@ def test_get_serial_port__multiple_ports_same_device(config_manager: ConfigManag
 def test_ensure_config_exists__permission_error(config_manager: ConfigManager):
     """Test handling of permission errors when creating config."""
     # Mock Path.mkdir to raise PermissionError
-    with patch.object(Path, 'mkdir', side_effect=PermissionError("Access denied")):
+    with patch.object(Path, "mkdir", side_effect=PermissionError("Access denied")):
         with pytest.raises(PermissionError):
             config_manager.ensure_config_exists()
+
+
+def test_load_config__cached_until_file_changes(config_manager: ConfigManager):
+    content = {
+        "mappings": {0: ["master"]},
+        "device": {
+            "name": "Test Device",
+            "port": "COM1",
+            "baudrate": 9600,
+            "sliders": 1,
+        },
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 10,
+        },
+    }
+    config_file = config_manager.config_file_path
+    config_file.parent.mkdir(parents=True, exist_ok=True)
+    config_file.write_text(yaml.dump(content))
+    config_manager.load_config()
+
+    with patch.object(
+        config_manager.validator, "validate", wraps=config_manager.validator.validate
+    ) as validate:
+        # Unchanged file: not even read
+        with patch.object(Path, "read_text", side_effect=AssertionError("Read")):
+            config_manager.load_config()
+
+        # Saved again without changes: read, but not validated
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        config_manager.load_config()
+        assert validate.call_count == 0
+
+        content["settings"]["inverted"] = True
+        config_file.write_text(yaml.dump(content))
+        config_manager.load_config()
+        assert validate.call_count == 1
+    assert config_manager.get_setting("settings.inverted") is True
+
+
+def test_load_config__overlapping_devices(config_manager: ConfigManager):
+    board = {"port": "COM1", "baudrate": 9600, "sliders": 4}
+    content = {
+        "mappings": {0: ["master"]},
+        "devices": [{"name": "Left", **board}, {"name": "Right", **board, "offset": 2}],
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 1,
+        },
+    }
+    config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    with pytest.raises(ConfigValidationError, match="'Left' and 'Right' overlap"):
+        config_manager.load_config()
+
+    content["devices"][1]["offset"] = 4
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    config_manager.load_config()
+
+
+def test_load_config__calibration_above_resolution(config_manager: ConfigManager):
+    content = {
+        "mappings": {0: ["master"]},
+        "device": {"name": "Board", "port": "COM1", "baudrate": 9600, "sliders": 2},
+        "sliders": {1: {"max": 4000}},
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 1,
+        },
+    }
+    config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    with pytest.raises(
+        ConfigValidationError, match="slider 1 needs 0 <= min < max <= 1023"
+    ):
+        config_manager.load_config()
+
+    content["device"].update({"protocol": "binary", "resolution_bits": 12})
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    config_manager.load_config()
+
+
+@pytest.mark.parametrize(
+    "settings, message",
+    [
+        ({"volume_step": 1.5}, "'volume_step' must be between 0 and 1"),
+        ({"volume_step": -0.01}, "'volume_step' must be between 0 and 1"),
+        ({"volume_epsilon": -0.1}, "'volume_epsilon' cannot be negative"),
+        ({"volume_workers": -1}, "'volume_workers' cannot be negative"),
+        (
+            {"volume_worker_threshold": 0},
+            "'volume_worker_threshold' must be at least 1",
+        ),
+        ({"apply_interval": -0.01}, "'apply_interval' cannot be negative"),
+        ({"sync_min_interval": -1}, "'sync_min_interval' cannot be negative"),
+        (
+            {"session_safety_poll_interval": -30},
+            "'session_safety_poll_interval' cannot be negative",
+        ),
+    ],
+)
+def test_load_config__invalid_settings(
+    config_manager: ConfigManager, settings, message
+):
+    content = {
+        "mappings": {0: ["master"]},
+        "device": {"name": "Board", "port": "COM1", "baudrate": 9600, "sliders": 1},
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 1,
+            **settings,
+        },
+    }
+    config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    with pytest.raises(ConfigValidationError, match=message):
+        config_manager.load_config()
+
+
+@pytest.mark.parametrize("share", [0, -0.25, 1.5])
+def test_load_config__invalid_sync_bandwidth_share(
+    config_manager: ConfigManager, share
+):
+    content = {
+        "mappings": {0: ["master"]},
+        "device": {
+            "name": "Board",
+            "port": "COM1",
+            "baudrate": 9600,
+            "sliders": 1,
+            "sync_bandwidth_share": share,
+        },
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": True,
+            "session_reload_interval": 1,
+        },
+    }
+    config_manager.config_file_path.parent.mkdir(parents=True, exist_ok=True)
+    config_manager.config_file_path.write_text(yaml.dump(content))
+    with pytest.raises(
+        ConfigValidationError, match="'sync_bandwidth_share' must be above 0"
+    ):
+        config_manager.load_config()
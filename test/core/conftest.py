@@ -0,0 +1,44 @@
+import asyncio
+import selectors
+import pytest
+
+
+class _VirtualTimeSelector(selectors.DefaultSelector):
+    """Returns the ready file objects right away, and moves the loop's clock forward
+    instead of waiting
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.loop: "VirtualTimeLoop | None" = None
+
+    def select(self, timeout: float | None = None):
+        ready = super().select(0)
+        if not ready and timeout is not None and timeout > 0:
+            self.loop.now += timeout
+        return ready if ready or timeout is not None else super().select(None)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """An event loop whose clock jumps to the next timer instead of sleeping.
+
+    Sleeps, timeouts and rate limits take no real time and happen in exactly the
+    scripted order, however loaded the machine running the tests is.
+    """
+
+    def __init__(self) -> None:
+        selector = _VirtualTimeSelector()
+        super().__init__(selector)
+        selector.loop = self
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def run_virtual():
+    """Run a coroutine to completion on a VirtualTimeLoop"""
+    loop = VirtualTimeLoop()
+    yield loop.run_until_complete
+    loop.close()
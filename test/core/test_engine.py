@@ -0,0 +1,459 @@
+import asyncio
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import Mock
+import pytest
+import yaml
+from config.config_exceptions import ConfigValidationError
+from config.config_manager import ConfigManager
+from core.engine import Engine
+from mapping.mapping_manager import MappingManager
+from microcontroller.frame_protocol import FrameStats
+from microcontroller.microcontroller_manager import MicrocontrollerManager
+from sessions.audio_snapshot import AudioSnapshotProvider
+from sessions.session_exceptions import AudioBackendError
+from sessions.session_manager import SessionManager
+from sessions.simulated_backend import SimulatedBackend
+
+
+class FakeMicrocontroller:
+    """A microcontroller whose frames are fed by the test, readable through a pipe like
+    a serial port
+    """
+
+    def __init__(self, n_sliders: int) -> None:
+        self.n_sliders = n_sliders
+        self.available = True
+        self.connected = False
+        self.closed = False
+        self.connects: list[str] = []
+        self.sent: list[list[float]] = []
+        self._frames: list[dict[int, float]] = []
+        self._read_fd, self._write_fd = os.pipe()
+        self._encoder = MicrocontrollerManager(n_sliders=n_sliders)
+
+    def feed(self, values: dict[int, float]) -> None:
+        self._frames.append(values)
+        os.write(self._write_fd, b"\n")
+
+    def unplug(self) -> None:
+        self.available = False
+        self.connected = False
+        os.write(self._write_fd, b"\n")
+
+    def connect(self, port: str, baudrate: int) -> None:
+        self.connects.append(port)
+        if not self.available:
+            raise ConnectionError(f"{port} is not available")
+        self.connected = True
+
+    def set_response_curves(self, response_curves) -> None:
+        pass
+
+    def set_slider_filters(self, slider_filters) -> None:
+        pass
+
+    def read_values(self, block: bool = True) -> dict[int, float] | None:
+        os.read(self._read_fd, 1)
+        if not self.connected or not self._frames:
+            return None
+        return self._frames.pop(0)
+
+    def fileno(self) -> int | None:
+        return self._read_fd
+
+    def encode_sync_message(self, values: list[float]) -> bytes:
+        return self._encoder.encode_sync_message(values)
+
+    def send_sync_message(self, values: list[float]) -> bool:
+        self.sent.append(values)
+        return True
+
+    def cancel_read(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connected
+
+    @property
+    def max_raw(self) -> int:
+        return 1023
+
+    @property
+    def frame_stats(self) -> FrameStats:
+        return FrameStats()
+
+
+class FakePortResolver:
+    def __init__(self) -> None:
+        self.missing = False
+        self.re_resolved = 0
+
+    def resolve(self, device: dict) -> str:
+        if self.missing:
+            raise ValueError(f"{device['name']} is not plugged in")
+        return f"PORT-{device['name']}"
+
+    def re_resolve(self, device: dict) -> str | None:
+        self.re_resolved += 1
+        return None if self.missing else f"PORT-{device['name']}"
+
+
+class InlineExecutor(ThreadPoolExecutor):
+    """Runs blocking engine calls right away, so they follow the virtual clock"""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@pytest.fixture
+def config_manager(tmp_path, default_config) -> ConfigManager:
+    config_manager = ConfigManager(tmp_path, tmp_path / "default_mapping.yml")
+    config_manager.config_file_path.write_text(yaml.dump(default_config))
+    config_manager.load_config()
+    return config_manager
+
+
+@pytest.fixture
+def default_config() -> dict:
+    return {
+        "mappings": {0: ["master"], 1: ["chrome.exe"], 2: ["unmapped"]},
+        "device": {
+            "name": "Test Board",
+            "port": "COM1",
+            "baudrate": 115200,
+            "sliders": 3,
+        },
+        "settings": {
+            "inverted": False,
+            "system_in_unmapped": False,
+            "session_reload_interval": 1,
+            "session_discovery": "poll",
+            "apply_interval": 0.1,
+            "sync_min_interval": 0,
+            "volume_step": 0,
+        },
+    }
+
+
+@pytest.fixture
+def backend() -> SimulatedBackend:
+    backend = SimulatedBackend(n_devices=1, seed=1)
+    backend.start_session("chrome.exe")
+    backend.start_session("spotify.exe")
+    return backend
+
+
+@pytest.fixture
+def microcontroller() -> FakeMicrocontroller:
+    return FakeMicrocontroller(n_sliders=3)
+
+
+@pytest.fixture
+def errors() -> list[BaseException]:
+    return []
+
+
+@pytest.fixture
+def port_resolver() -> FakePortResolver:
+    return FakePortResolver()
+
+
+@pytest.fixture
+def engine_factory(config_manager, backend, microcontroller, port_resolver, errors):
+    def engine_factory(**session_manager_options) -> Engine:
+        return Engine(
+            config_manager=config_manager,
+            # Enumerate on every check, the snapshot's clock is not the virtual one
+            session_manager_factory=lambda: SessionManager(
+                backend,
+                snapshots=AudioSnapshotProvider(backend, ttl=0),
+                **session_manager_options,
+            ),
+            mapping_manager=MappingManager(),
+            microcontroller_managers=[microcontroller],
+            port_resolver=port_resolver,
+            on_error=errors.append,
+        )
+
+    return engine_factory
+
+
+@pytest.fixture
+def engine(engine_factory) -> Engine:
+    return engine_factory()
+
+
+def _run_engine(run_virtual, engine: Engine, scenario) -> None:
+    """Run the engine's loop on a virtual clock while the scenario runs, then stop it"""
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(InlineExecutor())
+        task = asyncio.create_task(engine._main())
+        await asyncio.sleep(0)
+        try:
+            await scenario()
+        finally:
+            engine._stopping.set()
+            await task
+
+    run_virtual(main())
+
+
+def _volume(backend: SimulatedBackend, process_name: str) -> float:
+    return next(
+        session.volume
+        for session in backend.sessions.values()
+        if session.process_name == process_name
+    )
+
+
+def test_start_and_stop(engine, microcontroller, errors):
+    engine.start()
+    software_sessions, devices = engine.list_sessions_and_devices()
+    engine.stop()
+
+    assert [session.name for session in software_sessions] == [
+        "chrome.exe",
+        "spotify.exe",
+    ]
+    assert list(devices) == ["Speakers (0)"]
+    assert microcontroller.connects == ["PORT-Test Board"]
+    assert microcontroller.closed
+    assert errors == []
+
+
+def test_stop_closes_volume_workers(engine_factory):
+    volume_pool = Mock(threshold=16)
+    engine = engine_factory(volume_pool=volume_pool)
+
+    engine.start()
+    engine.list_sessions_and_devices()
+    volume_pool.close.assert_not_called()
+    engine.stop()
+
+    volume_pool.close.assert_called_once()
+
+
+def test_first_mapping(engine, microcontroller, run_virtual, errors):
+    async def scenario():
+        await asyncio.sleep(0.01)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert [group.sessions for group in engine.mapping.values()] == [
+        [engine.session_manager.master_session],
+        engine.session_manager.find_software_sessions("chrome.exe"),
+        engine.session_manager.find_software_sessions("spotify.exe"),
+    ]
+    # The device learns the volumes of the new mapping
+    assert microcontroller.sent == [[1.0, 1.0, 1.0]]
+    assert errors == []
+
+
+def test_sync_waits_for_unknown_volumes(engine, backend, microcontroller, run_virtual):
+    # Nothing is mapped to the last slider, so its volume is unknown until it moves
+    backend.end_session(
+        next(
+            s.pid for s in backend.sessions.values() if s.process_name == "spotify.exe"
+        )
+    )
+
+    async def scenario():
+        await asyncio.sleep(0.01)
+        assert microcontroller.sent == []
+        microcontroller.feed({2: 0.4})
+        await asyncio.sleep(0.01)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert microcontroller.sent == [[1.0, 1.0, 0.4]]
+
+
+def test_apply_volumes(engine, backend, microcontroller, run_virtual):
+    async def scenario():
+        microcontroller.feed({0: 0.8, 1: 0.2, 2: 0.4})
+        await asyncio.sleep(0.01)
+        assert (backend.master.volume, _volume(backend, "chrome.exe")) == (0.8, 0.2)
+        # Moves within the apply interval are held back, only the last one is applied
+        microcontroller.feed({1: 0.3})
+        await asyncio.sleep(0.01)
+        microcontroller.feed({1: 0.35})
+        await asyncio.sleep(0.01)
+        assert _volume(backend, "chrome.exe") == 0.2
+        await asyncio.sleep(0.1)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert _volume(backend, "chrome.exe") == 0.35
+    assert _volume(backend, "spotify.exe") == 0.4
+    assert backend.calls["set_volume"] == 4
+    assert engine.rate_limiter.values_coalesced == 1
+    assert microcontroller.sent[-1] == [0.8, 0.35, 0.4]
+
+
+def test_new_sessions_are_mapped(engine, backend, microcontroller, run_virtual):
+    async def scenario():
+        microcontroller.feed({2: 0.4})
+        await asyncio.sleep(0.01)
+        backend.start_session("discord.exe")
+        await asyncio.sleep(1.1)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert [session.name for session in engine.mapping[2].sessions] == [
+        "spotify.exe",
+        "discord.exe",
+    ]
+    # The new mapping gets the current slider values
+    assert _volume(backend, "discord.exe") == 0.4
+
+
+def test_failing_session_is_reconciled_once(
+    engine, backend, microcontroller, run_virtual
+):
+    async def scenario():
+        chrome = next(
+            s for s in backend.sessions.values() if s.process_name == "chrome.exe"
+        )
+        # Closed, but still listed by Windows
+        chrome.expired = True
+        microcontroller.feed({1: 0.3})
+        await asyncio.sleep(2.0)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert engine.session_manager.find_software_sessions("chrome.exe") == []
+    assert engine.mapping[1].sessions == []
+    assert backend.calls["set_volume"] == 1
+
+
+def test_volume_changes_outside_waves(
+    engine_factory, backend, microcontroller, run_virtual
+):
+    engine = engine_factory(
+        volume_epsilon=0.02, volume_changes=backend.create_volume_change_source()
+    )
+    chrome = next(
+        s for s in backend.sessions.values() if s.process_name == "chrome.exe"
+    )
+    reported = []
+    forward = engine._on_volume_changed
+
+    def on_volume_changed(session, volume):
+        reported.append(volume)
+        forward(session, volume)
+
+    engine._on_volume_changed = on_volume_changed
+
+    async def scenario():
+        microcontroller.feed({1: 0.3})
+        await asyncio.sleep(0.01)
+        # The volume WaVeS set itself is not reported back
+        assert reported == []
+
+        backend.change_volume(chrome, 0.7)
+        await asyncio.sleep(0.01)
+        assert engine.mapping[1].get_volume() == 0.7
+        assert microcontroller.sent[-1] == [1.0, 0.7, 1.0]
+
+        # The next slider move is applied, though it is within epsilon of the last
+        # volume WaVeS set
+        microcontroller.feed({1: 0.31})
+        await asyncio.sleep(0.2)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert reported == [0.7]
+    assert chrome.volume == 0.31
+    assert microcontroller.sent[-1] == [1.0, 0.31, 1.0]
+
+
+def test_errors_are_reported(engine, config_manager, run_virtual, errors):
+    async def scenario():
+        config_manager.config_file_path.write_text("mappings: []")
+        engine.reload_mapping()
+        await asyncio.sleep(0.01)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert len(errors) == 1
+    assert isinstance(errors[0], ConfigValidationError)
+
+
+def test_failing_session_manager_is_reported(
+    config_manager, microcontroller, run_virtual, errors
+):
+    def session_manager_factory():
+        raise AudioBackendError("No audio service")
+
+    engine = Engine(
+        config_manager=config_manager,
+        session_manager_factory=session_manager_factory,
+        mapping_manager=MappingManager(),
+        microcontroller_managers=[microcontroller],
+        port_resolver=FakePortResolver(),
+        on_error=errors.append,
+    )
+
+    async def scenario():
+        await asyncio.sleep(0.01)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert [str(error) for error in errors] == ["No audio service"]
+
+
+def test_reconnect(engine, backend, microcontroller, port_resolver, run_virtual):
+    async def scenario():
+        microcontroller.unplug()
+        port_resolver.missing = True
+        await asyncio.sleep(1.0)
+        # Retries back off exponentially: 0.05, 0.1, 0.2 and 0.4 seconds
+        assert port_resolver.re_resolved == 5
+        assert not microcontroller.is_connected
+        port_resolver.missing = False
+        microcontroller.available = True
+        await asyncio.sleep(1.0)
+        microcontroller.feed({0: 0.3})
+        await asyncio.sleep(0.01)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert microcontroller.connects == ["PORT-Test Board"] * 2
+    assert backend.master.volume == 0.3
+
+
+@pytest.mark.parametrize("cause", ["port_missing", "port_busy"])
+def test_unavailable_board_at_startup(
+    cause, engine_factory, backend, microcontroller, port_resolver, run_virtual, errors
+):
+    port_resolver.missing = cause == "port_missing"
+    microcontroller.available = cause == "port_missing"
+    engine = engine_factory()
+
+    async def scenario():
+        await asyncio.sleep(0.1)
+        assert not microcontroller.is_connected
+        port_resolver.missing = False
+        microcontroller.available = True
+        await asyncio.sleep(0.5)
+        microcontroller.feed({0: 0.3})
+        await asyncio.sleep(0.01)
+
+    _run_engine(run_virtual, engine, scenario)
+
+    assert microcontroller.is_connected
+    assert backend.master.volume == 0.3
+    assert errors == []
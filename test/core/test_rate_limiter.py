@@ -0,0 +1,42 @@
+import pytest
+from core.rate_limiter import SliderRateLimiter
+
+
+def test_first_change_is_applied_immediately():
+    rate_limiter = SliderRateLimiter([0.1, 0.1])
+    rate_limiter.submit({0: 0.5})
+    assert rate_limiter.take_due(now=0.0) == {0: 0.5}
+    assert rate_limiter.next_due() is None
+
+
+def test_changes_are_held_and_coalesced():
+    rate_limiter = SliderRateLimiter([0.1, 0.1])
+    rate_limiter.submit({0: 0.1})
+    rate_limiter.take_due(now=0.0)
+
+    rate_limiter.submit({0: 0.2})
+    rate_limiter.submit({0: 0.3, 1: 0.9})
+    # Slider 1 was not applied recently, slider 0 has to wait
+    assert rate_limiter.take_due(now=0.05) == {1: 0.9}
+    assert rate_limiter.next_due() == pytest.approx(0.1)
+    assert rate_limiter.take_due(now=0.09) == {}
+    # The final position is applied once the interval passed
+    assert rate_limiter.take_due(now=0.1) == {0: 0.3}
+    assert rate_limiter.values_applied == 3
+    assert rate_limiter.values_coalesced == 1
+
+
+def test_per_slider_intervals():
+    rate_limiter = SliderRateLimiter([0.0, 1.0])
+    rate_limiter.submit({0: 0.1, 1: 0.1})
+    rate_limiter.take_due(now=0.0)
+    rate_limiter.submit({0: 0.2, 1: 0.2})
+    assert rate_limiter.take_due(now=0.0) == {0: 0.2}
+    assert rate_limiter.next_due() == 1.0
+
+    rate_limiter.set_min_intervals([0.0, 0.0])
+    rate_limiter.submit({1: 0.3})
+    assert rate_limiter.take_due(now=1.0) == {1: 0.3}
+
+    with pytest.raises(ValueError):
+        rate_limiter.set_min_intervals([0.0])
@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import Mock
+from core.session_discovery import SessionDiscovery
+from sessions.audio_events import AudioEvent, AudioEventKind
+
+
+class ScriptedEventSource:
+    """Replays audio events at scripted delays on the event loop's clock, like the
+    Windows callbacks would
+    """
+
+    def __init__(self, script: list[tuple[float, AudioEvent]]) -> None:
+        self.script = script
+        self.stopped = False
+        self._handles: list[asyncio.TimerHandle] = []
+
+    def start(self, on_event) -> None:
+        loop = asyncio.get_running_loop()
+        at = 0.0
+        for delay, event in self.script:
+            at += delay
+            self._handles.append(loop.call_later(at, on_event, event))
+
+    def stop(self) -> None:
+        self.stopped = True
+        for handle in self._handles:
+            handle.cancel()
+
+
+class FailingEventSource:
+    def start(self, on_event) -> None:
+        raise OSError("No audio service")
+
+    def stop(self) -> None:
+        raise AssertionError("Not started")
+
+
+async def _run_for(discovery: SessionDiscovery, seconds: float) -> None:
+    task = asyncio.create_task(discovery.run())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_events_trigger_discovery(run_virtual):
+    check_for_changes = Mock(return_value=True)
+    on_changes = Mock()
+    created = AudioEvent(AudioEventKind.SESSION_CREATED, pid=1234)
+    source = ScriptedEventSource([(0.01, created), (0.001, created), (0.1, created)])
+    invalidate = Mock()
+    discovery = SessionDiscovery(
+        check_for_changes,
+        on_changes,
+        source,
+        safety_poll_interval=60,
+        debounce=0.02,
+        invalidate=invalidate,
+    )
+
+    run_virtual(_run_for(discovery, 0.3))
+
+    # The burst of two events is handled together
+    assert discovery.events_received == 3
+    assert invalidate.call_count == 3
+    assert check_for_changes.call_count == 2
+    assert on_changes.call_count == 2
+    assert discovery.polls == 0
+    assert source.stopped
+
+
+def test_safety_poll(run_virtual):
+    check_for_changes = Mock(return_value=False)
+    on_changes = Mock()
+    discovery = SessionDiscovery(
+        check_for_changes,
+        on_changes,
+        ScriptedEventSource([]),
+        safety_poll_interval=0.05,
+    )
+
+    run_virtual(_run_for(discovery, 0.18))
+
+    assert discovery.polls == 3
+    assert check_for_changes.call_count == 3
+    on_changes.assert_not_called()
+
+
+def test_falls_back_to_polling(run_virtual):
+    check_for_changes = Mock(return_value=True)
+    on_changes = Mock()
+    discovery = SessionDiscovery(
+        check_for_changes, on_changes, FailingEventSource(), poll_interval=0.05
+    )
+
+    run_virtual(_run_for(discovery, 0.12))
+
+    assert discovery.polls == 2
+    assert on_changes.call_count == 2
+
+
+def test_failing_check_keeps_discovery_running(run_virtual):
+    check_for_changes = Mock(side_effect=[OSError("Enumeration failed"), True, False])
+    on_changes = Mock(side_effect=[ValueError("Device not found")])
+    discovery = SessionDiscovery(check_for_changes, on_changes, poll_interval=0.05)
+
+    run_virtual(_run_for(discovery, 0.17))
+
+    assert check_for_changes.call_count == 3
+    assert on_changes.call_count == 1
@@ -0,0 +1,40 @@
+import threading
+from core.slider_bank import SliderBank
+
+
+def test_take__merges_publishers_by_offset():
+    bank = SliderBank(n_sliders=5)
+    bank.publish({0: 0.1, 1: 0.2}, offset=0)
+    bank.publish({1: 0.9}, offset=3)
+
+    assert bank.take(timeout=0) == (0.1, 0.2, None, None, 0.9)
+
+
+def test_take__no_new_values():
+    bank = SliderBank(n_sliders=2)
+    assert bank.take(timeout=0) is None
+
+    bank.publish({0: 0.5})
+    assert bank.take(timeout=0) == (0.5, None)
+    assert bank.take(timeout=0) is None
+
+    bank.wake()
+    assert bank.take(timeout=0) is None
+
+
+def test_publish__concurrent_boards():
+    bank = SliderBank(n_sliders=4)
+    boards = [
+        threading.Thread(
+            target=lambda offset=offset: [
+                bank.publish({0: i / 1000, 1: i / 1000}, offset) for i in range(1001)
+            ]
+        )
+        for offset in (0, 2)
+    ]
+    for board in boards:
+        board.start()
+    for board in boards:
+        board.join()
+
+    assert bank.take(timeout=1) == (1.0, 1.0, 1.0, 1.0)
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from core.sync_writer import SyncWriter
+from microcontroller.microcontroller_manager import MicrocontrollerManager
+
+
+@pytest.fixture
+def microcontroller_manager():
+    manager = MagicMock()
+    manager.encode_sync_message.side_effect = MicrocontrollerManager(
+        n_sliders=2
+    ).encode_sync_message
+    return manager
+
+
+def _sent_values(microcontroller_manager) -> list[list[float]]:
+    return [c.args[0] for c in microcontroller_manager.send_sync_message.call_args_list]
+
+
+async def _run_writer(
+    writer: SyncWriter, submissions: list[list[float]], spacing: float = 0.01
+) -> None:
+    task = asyncio.create_task(writer.run())
+    for values in submissions:
+        writer.submit(values)
+        await asyncio.sleep(spacing)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_only_changes_are_sent(microcontroller_manager, run_virtual):
+    writer = SyncWriter(microcontroller_manager, baudrate=115200, min_interval=0)
+    run_virtual(_run_writer(writer, [[0.5, 0.5], [0.5, 0.5], [0.501, 0.5], [0.6, 0.5]]))
+
+    assert _sent_values(microcontroller_manager) == [[0.5, 0.5], [0.6, 0.5]]
+    assert writer.messages_unchanged == 2
+
+
+def test_updates_are_coalesced(microcontroller_manager, run_virtual):
+    async def scenario():
+        writer = SyncWriter(microcontroller_manager, baudrate=115200, min_interval=0.2)
+        task = asyncio.create_task(writer.run())
+        writer.submit([0.1, 0.1])
+        await asyncio.sleep(0.05)
+        # These arrive while the writer waits for the minimum interval, only the last
+        # one is sent
+        for i in range(2, 10):
+            writer.submit([i / 10, 0.1])
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    run_virtual(scenario())
+
+    assert _sent_values(microcontroller_manager) == [[0.1, 0.1], [0.9, 0.1]]
+
+
+def test_bandwidth_budget_spaces_writes(microcontroller_manager, run_virtual):
+    # 10 bytes per message at 9600 baud and a 1% share allow about one message a second
+    writer = SyncWriter(
+        microcontroller_manager, baudrate=9600, min_interval=0, bandwidth_share=0.01
+    )
+    run_virtual(_run_writer(writer, [[0.1, 0.1], [0.2, 0.2], [0.3, 0.3]]))
+
+    assert microcontroller_manager.send_sync_message.call_count == 1
+
+
+def test_invalid_values_are_dropped(microcontroller_manager, run_virtual):
+    writer = SyncWriter(microcontroller_manager, baudrate=115200, min_interval=0)
+    run_virtual(_run_writer(writer, [[0.5], [0.5, 0.5]]))
+
+    assert _sent_values(microcontroller_manager) == [[0.5, 0.5]]
+
+
+def test_dropped_messages_are_sent_again(microcontroller_manager, run_virtual):
+    # The output buffer is full for the first message
+    microcontroller_manager.send_sync_message.side_effect = [False, True]
+    writer = SyncWriter(microcontroller_manager, baudrate=115200, min_interval=0)
+    run_virtual(_run_writer(writer, [[0.5, 0.5], [0.5, 0.5]]))
+
+    assert _sent_values(microcontroller_manager) == [[0.5, 0.5], [0.5, 0.5]]
+    assert writer.messages_sent == 1
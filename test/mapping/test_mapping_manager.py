@@ -51,6 +51,13 @@ class MockSessionManager(SessionManagerProtocol):
                 return session
         raise ValueError(f"Software session {session_name} not found.")
 
+    def find_software_sessions(self, target: str) -> list[SoftwareSession]:
+        return [
+            session
+            for session in self.software_sessions
+            if target.lower() in session.name.lower()
+        ]
+
 
 class MockConfigManager(ConfigManagerProtocol):
     def __init__(self):
@@ -68,6 +75,9 @@ class MockConfigManager(ConfigManagerProtocol):
     def load_config(self):
         pass
 
+    def get_slider_count(self):
+        return self.config_data["device"]["sliders"]
+
     def get_setting(self, setting_path: str):
         if setting_path == "device.sliders":
             return self.config_data["device"]["sliders"]
@@ -221,3 +231,12 @@ def test_mapping_with_no_sessions(mapping_manager, session_manager, config_manag
     # Verify master and system mappings still work
     assert session_manager.master_session in result[0].sessions
     assert session_manager.system_session in result[1].sessions
+
+
+def test_create_mappings__twice(mapping_manager, session_manager, config_manager):
+    """Sessions that outlive a mapping are mapped again from scratch"""
+    mapping_manager.create_mappings(session_manager, config_manager)
+    result = mapping_manager.create_mappings(session_manager, config_manager)
+
+    assert any(session.name == "spotify.exe" for session in result[3].sessions)
+    assert session_manager.system_session in result[1].sessions
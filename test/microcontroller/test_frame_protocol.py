@@ -0,0 +1,123 @@
+import pytest
+from microcontroller.frame_protocol import (
+    AsciiFrameDecoder,
+    BinaryFrameDecoder,
+    FrameStats,
+    SYNC_BYTE,
+    crc8,
+    encode_binary_frame,
+    pack_values,
+    unpack_values,
+)
+
+
+@pytest.fixture
+def stats():
+    return FrameStats()
+
+
+@pytest.mark.parametrize("resolution_bits", [10, 12])
+def test_pack_unpack_roundtrip(resolution_bits):
+    values = [0, 1, 512, (1 << resolution_bits) - 1, 77]
+    payload = pack_values(values, resolution_bits)
+    assert len(payload) == (len(values) * resolution_bits + 7) // 8
+    assert unpack_values(payload, len(values), resolution_bits) == values
+
+
+def test_crc8_known_value():
+    # CRC-8/SMBUS check value
+    assert crc8(b"123456789") == 0xF4
+
+
+def test_ascii_decoder__split_frames(stats):
+    decoder = AsciiFrameDecoder(n_sliders=3, stats=stats)
+    frames = decoder.feed(b"1|2|3\r\n4|5")
+    assert frames == [b"1|2|3"]
+    frames = decoder.feed(b"|6\r\n")
+    assert frames == [b"4|5|6"]
+    assert decoder.decode(frames[0]) == {0: 4.0, 1: 5.0, 2: 6.0}
+    assert stats.frames_decoded == 1
+
+
+def test_ascii_decoder__invalid_frames_are_counted(stats):
+    decoder = AsciiFrameDecoder(n_sliders=3, stats=stats)
+    assert decoder.decode(b"1|a|3") is None
+    assert decoder.decode(b"\xff\xfe") is None
+    assert decoder.decode(b"1|2") is None
+    assert stats.invalid_frames == 2
+    assert stats.length_errors == 1
+    assert stats.frame_errors == 3
+
+
+def test_ascii_decoder__non_finite_values_are_invalid(stats):
+    decoder = AsciiFrameDecoder(n_sliders=3, stats=stats)
+    assert decoder.decode(b"1|nan|3") is None
+    assert decoder.decode(b"inf|2|3") is None
+    assert decoder.decode(b"0:-Infinity") is None
+    assert stats.invalid_frames == 3
+    assert stats.frames_decoded == 0
+
+
+def test_binary_decoder__decodes_frames(stats):
+    decoder = BinaryFrameDecoder(n_sliders=4, stats=stats, resolution_bits=10)
+    frame = encode_binary_frame([0, 256, 512, 1023], resolution_bits=10)
+    # Feed byte by byte to exercise partial frames
+    frames = []
+    for byte in frame + frame:
+        frames.extend(decoder.feed(bytes([byte])))
+    assert len(frames) == 2
+    assert decoder.decode(frames[0]) == {0: 0, 1: 256, 2: 512, 3: 1023}
+    assert stats.frames_decoded == 1
+    assert stats.frame_errors == 0
+
+
+def test_binary_decoder__resyncs_after_corruption(stats):
+    decoder = BinaryFrameDecoder(n_sliders=2, stats=stats, resolution_bits=12)
+    good = encode_binary_frame([4095, 1], resolution_bits=12)
+    corrupted = bytearray(good)
+    corrupted[3] ^= 0x10
+    frames = decoder.feed(b"\x00\x01" + bytes(corrupted) + good)
+    assert [decoder.decode(frame) for frame in frames] == [{0: 4095, 1: 1}]
+    assert stats.crc_errors == 1
+    assert stats.sync_errors > 0
+
+
+def test_ascii_decoder__sparse_updates(stats):
+    decoder = AsciiFrameDecoder(n_sliders=3, stats=stats)
+    assert decoder.decode(b"2:512") == {2: 512.0}
+    assert decoder.decode(b"0:1|1:2") == {0: 1.0, 1: 2.0}
+    assert decoder.decode(b"3:512") is None
+    assert decoder.decode(b"1:2:3") is None
+    assert stats.index_errors == 1
+    assert stats.invalid_frames == 1
+
+
+def test_binary_decoder__sparse_updates(stats):
+    decoder = BinaryFrameDecoder(n_sliders=8, stats=stats, resolution_bits=12)
+    frames = decoder.feed(
+        encode_binary_frame([4095, 7], resolution_bits=12, indices=[6, 1])
+        + encode_binary_frame([1], resolution_bits=12, indices=[8])
+    )
+    assert decoder.decode(frames[0]) == {6: 4095, 1: 7}
+    assert decoder.decode(frames[1]) is None
+    assert stats.index_errors == 1
+
+
+def test_binary_decoder__wrong_slider_count(stats):
+    decoder = BinaryFrameDecoder(n_sliders=3, stats=stats)
+    frames = decoder.feed(encode_binary_frame([1, 2]))
+    assert decoder.decode(frames[0]) is None
+    assert stats.length_errors == 1
+
+
+def test_binary_decoder__unsupported_resolution(stats):
+    with pytest.raises(ValueError):
+        BinaryFrameDecoder(n_sliders=3, stats=stats, resolution_bits=8)
+
+
+def test_encode_binary_frame__validation():
+    with pytest.raises(ValueError):
+        encode_binary_frame([1024], resolution_bits=10)
+    with pytest.raises(ValueError):
+        encode_binary_frame([])
+    assert encode_binary_frame([1])[0] == SYNC_BYTE
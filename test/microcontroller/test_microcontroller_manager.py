@@ -4,6 +4,9 @@ import pytest
 from unittest.mock import patch, MagicMock
 import serial
 from microcontroller.microcontroller_manager import MicrocontrollerManager
+from microcontroller.response_curve import ResponseCurve
+from microcontroller.slider_filter import SliderFilter
+from microcontroller.frame_protocol import encode_binary_frame
 
 
 @pytest.fixture
@@ -21,7 +24,7 @@ def test_connect(microcontroller_manager: MicrocontrollerManager):
         microcontroller_manager.connect("COM1", 9600)
 
         # Verify serial.Serial was called with correct parameters
-        mock_serial.assert_called_once_with("COM1", 9600, timeout=0.1)
+        mock_serial.assert_called_once_with("COM1", 9600, timeout=None, write_timeout=0)
 
         # Verify connection state
         assert microcontroller_manager.is_connected is True
@@ -65,33 +68,58 @@ def test_close(microcontroller_manager: MicrocontrollerManager):
         assert microcontroller_manager.is_connected is False
 
 
+def test_cancel_read(microcontroller_manager: MicrocontrollerManager):
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = MagicMock()
+        microcontroller_manager.connect("COM1", 9600)
+
+        microcontroller_manager.cancel_read()
+        mock_serial.return_value.cancel_read.assert_called_once()
+
+
 def test_send_sync_message(microcontroller_manager: MicrocontrollerManager):
     """Test sending sync messages to the microcontroller"""
     with patch("serial.Serial") as mock_serial:
         # Setup mock serial connection
         mock_serial_instance = MagicMock()
+        mock_serial_instance.write.side_effect = len
         mock_serial.return_value = mock_serial_instance
         microcontroller_manager.connect("COM1", 9600)
 
         # Test case 1: Normal values
         values = [0.5, 0.25, 0.75, 1.0]  # 4 sliders with different values
         microcontroller_manager.send_sync_message(values)
-        mock_serial_instance.write.assert_called_with("<50|25|75|100>".encode('utf-8'))
+        mock_serial_instance.write.assert_called_with("<50|25|75|100>".encode("utf-8"))
 
         # Test case 2: All zeros
         values = [0.0, 0.0, 0.0, 0.0]
         microcontroller_manager.send_sync_message(values)
-        mock_serial_instance.write.assert_called_with("<0|0|0|0>".encode('utf-8'))
+        mock_serial_instance.write.assert_called_with("<0|0|0|0>".encode("utf-8"))
 
         # Test case 3: All ones
         values = [1.0, 1.0, 1.0, 1.0]
         microcontroller_manager.send_sync_message(values)
-        mock_serial_instance.write.assert_called_with("<100|100|100|100>".encode('utf-8'))
+        mock_serial_instance.write.assert_called_with(
+            "<100|100|100|100>".encode("utf-8")
+        )
 
         # Test case 4: Values that need rounding
         values = [0.333, 0.667, 0.123, 0.789]
         microcontroller_manager.send_sync_message(values)
-        mock_serial_instance.write.assert_called_with("<33|66|12|78>".encode('utf-8'))
+        mock_serial_instance.write.assert_called_with("<33|66|12|78>".encode("utf-8"))
+
+
+def test_send_sync_message__does_not_block(
+    microcontroller_manager: MicrocontrollerManager,
+):
+    with patch("serial.Serial") as mock_serial:
+        microcontroller_manager.connect("COM1", 9600)
+
+        # A full output buffer only takes part of the message
+        mock_serial.return_value.write.return_value = 3
+        assert not microcontroller_manager.send_sync_message([0.5, 0.5, 0.5, 0.5])
+        mock_serial.return_value.write.return_value = len(b"<50|50|50|50>")
+        assert microcontroller_manager.send_sync_message([0.5, 0.5, 0.5, 0.5])
 
 
 def test_send_sync_message__validation(microcontroller_manager: MicrocontrollerManager):
@@ -114,12 +142,149 @@ def test_send_sync_message__validation(microcontroller_manager: MicrocontrollerM
             microcontroller_manager.send_sync_message([0.5, 1.1, 0.5, 0.5])
 
 
-def test_send_sync_message__not_connected(microcontroller_manager: MicrocontrollerManager):
+def test_send_sync_message__not_connected(
+    microcontroller_manager: MicrocontrollerManager,
+):
     """Test sending sync message when not connected"""
     # Try to send message without connecting first
     values = [0.5, 0.5, 0.5, 0.5]
-    microcontroller_manager.send_sync_message(values)  # Should silently return without error
+    microcontroller_manager.send_sync_message(
+        values
+    )  # Should silently return without error
 
     # Verify no serial communication was attempted
     assert microcontroller_manager.serial is None
 
+
+def _serial_with_data(data: bytes) -> MagicMock:
+    """Mock a serial port that returns `data` and then times out"""
+    buffer = bytearray(data)
+    mock_serial_instance = MagicMock()
+
+    def read(size=1):
+        chunk = bytes(buffer[:size])
+        del buffer[:size]
+        return chunk
+
+    mock_serial_instance.read.side_effect = read
+    type(mock_serial_instance).in_waiting = property(lambda _: len(buffer))
+    return mock_serial_instance
+
+
+def test_read_values__ascii():
+    microcontroller_manager = MicrocontrollerManager(n_sliders=4, drain_backlog=False)
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = _serial_with_data(
+            b"0|1023|garbage|0\r\n0|1023|0|1023\r\n"
+        )
+        microcontroller_manager.connect("COM1", 9600)
+
+        assert microcontroller_manager.read_values() is None  # Invalid frame
+        assert microcontroller_manager.read_values() == {0: 0.0, 1: 1.0, 2: 0.0, 3: 1.0}
+        assert microcontroller_manager.read_values() is None  # Timed out
+        assert microcontroller_manager.frame_stats.frames_decoded == 1
+        assert microcontroller_manager.frame_stats.invalid_frames == 1
+
+
+def test_read_values__binary():
+    microcontroller_manager = MicrocontrollerManager(
+        n_sliders=4, protocol="binary", resolution_bits=12
+    )
+    frame = encode_binary_frame([0, 4095, 0, 4095], resolution_bits=12)
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = _serial_with_data(b"\x13" + frame)
+        microcontroller_manager.connect("COM1", 9600)
+
+        assert microcontroller_manager.read_values() == {0: 0.0, 1: 1.0, 2: 0.0, 3: 1.0}
+        assert microcontroller_manager.frame_stats.sync_errors == 1
+
+
+def test_unknown_protocol():
+    with pytest.raises(ValueError):
+        MicrocontrollerManager(n_sliders=4, protocol="morse")
+
+
+def test_read_values__drain_backlog(microcontroller_manager: MicrocontrollerManager):
+    backlog = b"0|0|0|0\r\n1023|0|0|0\r\n1023|1023|0|0\r\n0|1023|bad|0\r\n"
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = _serial_with_data(backlog)
+        microcontroller_manager.connect("COM1", 9600)
+
+        # The newest frame is invalid, so the newest valid one is applied instead
+        assert microcontroller_manager.read_values() == {0: 1.0, 1: 1.0, 2: 0.0, 3: 0.0}
+        assert microcontroller_manager.read_values() is None
+        assert microcontroller_manager.frame_stats.frames_skipped == 2
+        assert microcontroller_manager.frame_stats.frames_decoded == 1
+
+
+def test_read_values__sparse_updates(microcontroller_manager: MicrocontrollerManager):
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = _serial_with_data(b"2:1023\r\n")
+        microcontroller_manager.connect("COM1", 9600)
+
+        assert microcontroller_manager.read_values() == {2: 1.0}
+
+
+def test_read_values__drain_merges_sparse_updates(
+    microcontroller_manager: MicrocontrollerManager,
+):
+    backlog = b"0|0|0|0\r\n0|0|0|1023\r\n1:1023\r\n3:0|2:1023\r\n"
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = _serial_with_data(backlog)
+        microcontroller_manager.connect("COM1", 9600)
+
+        # Sparse updates are merged on the newest keyframe, older keyframes are skipped
+        assert microcontroller_manager.read_values() == {0: 0.0, 1: 1.0, 2: 1.0, 3: 0.0}
+        assert microcontroller_manager.frame_stats.frames_merged == 2
+        assert microcontroller_manager.frame_stats.frames_skipped == 1
+
+
+def test_read_values__disconnect(microcontroller_manager: MicrocontrollerManager):
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = MagicMock()
+        mock_serial.return_value.in_waiting = 0
+        mock_serial.return_value.read.side_effect = serial.SerialException(
+            "Device gone"
+        )
+        microcontroller_manager.connect("COM1", 9600)
+
+        assert microcontroller_manager.read_values() is None
+        assert microcontroller_manager.is_connected is False
+
+
+def test_read_values__response_curves():
+    microcontroller_manager = MicrocontrollerManager(2, drain_backlog=False)
+    microcontroller_manager.set_response_curves(
+        [
+            ResponseCurve(1023, minimum=100, maximum=900),
+            ResponseCurve(1023, inverted=True),
+        ]
+    )
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = _serial_with_data(b"500|0\r\n")
+        microcontroller_manager.connect("COM1", 9600)
+
+        assert microcontroller_manager.read_values() == {0: 0.5, 1: 1.0}
+
+    with pytest.raises(ValueError, match="Expected 2 response curves"):
+        microcontroller_manager.set_response_curves([ResponseCurve(1023)])
+
+
+def test_read_values__filters_noise():
+    microcontroller_manager = MicrocontrollerManager(2, drain_backlog=False)
+    microcontroller_manager.set_slider_filters(
+        [SliderFilter(1023, deadband=2), SliderFilter(1023, deadband=2)]
+    )
+    with patch("serial.Serial") as mock_serial:
+        mock_serial.return_value = _serial_with_data(
+            b"0|500\r\n0|501\r\n0|499\r\n1023|499\r\n"
+        )
+        microcontroller_manager.connect("COM1", 9600)
+
+        assert microcontroller_manager.read_values() == {0: 0.0, 1: 500 / 1023}
+        assert microcontroller_manager.read_values() is None
+        assert microcontroller_manager.read_values() is None
+        assert microcontroller_manager.read_values() == {0: 1.0}
+
+    assert microcontroller_manager.frame_stats.values_filtered == 5
+    assert microcontroller_manager.frame_stats.frames_filtered == 2
@@ -0,0 +1,149 @@
+import json
+import pytest
+from unittest.mock import Mock, patch
+from serial.tools.list_ports_common import ListPortInfo
+from microcontroller.port_resolver import PortIdentity, PortResolver
+
+
+def _port(device: str, description: str, vid=None, pid=None, serial_number=None):
+    port_info = ListPortInfo(device, skip_link_detection=True)
+    port_info.description = description
+    port_info.vid = vid
+    port_info.pid = pid
+    port_info.serial_number = serial_number
+    return port_info
+
+
+@pytest.fixture
+def device():
+    return {"name": "Arduino Micro", "port": "COM6"}
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    return PortResolver(
+        tmp_path / "port_cache.json", fallback=Mock(return_value="COM3")
+    )
+
+
+def test_resolve__caches_identity_of_fallback_port(resolver, device, tmp_path):
+    ports = [_port("COM3", "Arduino Micro", vid=0x2341, pid=0x8037, serial_number="A1")]
+    with patch("serial.tools.list_ports.comports", return_value=ports):
+        assert resolver.resolve(device) == "COM3"
+
+    cache = json.loads((tmp_path / "port_cache.json").read_text())
+    assert cache == {
+        "Arduino Micro": {"vid": 0x2341, "pid": 0x8037, "serial_number": "A1"}
+    }
+
+
+def test_resolve__uses_cached_identity(resolver, device, tmp_path):
+    (tmp_path / "port_cache.json").write_text(
+        json.dumps({"Arduino Micro": {"vid": 1, "pid": 2, "serial_number": None}})
+    )
+    resolver = PortResolver(tmp_path / "port_cache.json", fallback=Mock())
+    ports = [
+        _port("COM1", "Other", vid=1, pid=3),
+        _port("COM9", "Renamed", vid=1, pid=2),
+    ]
+    with patch("serial.tools.list_ports.comports", return_value=ports):
+        assert resolver.resolve(device) == "COM9"
+    resolver.fallback.assert_not_called()
+
+
+def test_resolve__configured_identity(resolver, device):
+    device.update({"vid": 1, "pid": 2, "serial_number": "B"})
+    ports = [
+        _port("COM1", "Board", vid=1, pid=2, serial_number="A"),
+        _port("COM2", "Board", vid=1, pid=2, serial_number="B"),
+    ]
+    with patch("serial.tools.list_ports.comports", return_value=ports):
+        assert resolver.resolve(device) == "COM2"
+
+
+def test_re_resolve__only_matches_identity(resolver, device):
+    ports = [_port("COM3", "Arduino Micro", vid=1, pid=2)]
+    with patch("serial.tools.list_ports.comports", return_value=ports):
+        resolver.resolve(device)
+
+    # After a reset, the board comes back on another port, next to an unrelated board
+    ports = [
+        _port("COM3", "Arduino Micro", vid=5, pid=5),
+        _port("COM4", "Board", vid=1, pid=2),
+    ]
+    with patch("serial.tools.list_ports.comports", return_value=ports):
+        assert resolver.re_resolve(device) == "COM4"
+    with patch("serial.tools.list_ports.comports", return_value=[]):
+        assert resolver.re_resolve(device) is None
+
+
+def test_re_resolve__without_usb_identity(resolver, device):
+    with patch(
+        "serial.tools.list_ports.comports", return_value=[_port("COM3", "Native port")]
+    ):
+        assert resolver.resolve(device) == "COM3"
+        assert resolver.re_resolve(device) == "COM3"
+
+
+def test_invalid_cache_is_ignored(tmp_path, device):
+    (tmp_path / "port_cache.json").write_text("not json")
+    resolver = PortResolver(tmp_path / "port_cache.json", fallback=Mock())
+    assert resolver.get_identity(device) is None
+
+
+def test_identity_matches():
+    identity = PortIdentity(1, 2)
+    assert identity.matches(_port("COM1", "", vid=1, pid=2, serial_number="X"))
+    assert not PortIdentity(1, 2, "Y").matches(
+        _port("COM1", "", vid=1, pid=2, serial_number="X")
+    )
+
+
+def test_re_resolve__never_resolved(resolver, device):
+    resolver.fallback.side_effect = ValueError("Not found")
+    with patch("serial.tools.list_ports.comports", return_value=[]):
+        assert resolver.re_resolve(device) is None
+
+    resolver.fallback.side_effect = None
+    with patch(
+        "serial.tools.list_ports.comports",
+        return_value=[_port("COM3", "Arduino Micro")],
+    ):
+        assert resolver.re_resolve(device) == "COM3"
+
+
+def test_resolve__identical_boards(tmp_path):
+    # Two boards of the same model without serial numbers share their USB identity
+    devices = [{"name": "Left", "port": "COM5"}, {"name": "Right", "port": "COM6"}]
+    ports = [
+        _port("COM5", "Arduino Micro", vid=1, pid=2),
+        _port("COM6", "Arduino Micro", vid=1, pid=2),
+    ]
+    for _ in range(2):
+        resolver = PortResolver(
+            tmp_path / "port_cache.json", fallback=lambda device: device["port"]
+        )
+        with patch("serial.tools.list_ports.comports", return_value=ports):
+            assert [resolver.resolve(device) for device in devices] == ["COM5", "COM6"]
+            assert [resolver.re_resolve(device) for device in devices] == [
+                "COM5",
+                "COM6",
+            ]
+    assert not (tmp_path / "port_cache.json").exists()
+
+
+def test_resolve__drops_cached_identity_shared_by_another_board(tmp_path, device):
+    (tmp_path / "port_cache.json").write_text(
+        json.dumps({"Arduino Micro": {"vid": 1, "pid": 2, "serial_number": None}})
+    )
+    resolver = PortResolver(
+        tmp_path / "port_cache.json", fallback=Mock(return_value="COM6")
+    )
+    ports = [
+        _port("COM5", "Arduino Micro", vid=1, pid=2),
+        _port("COM6", "Arduino Micro", vid=1, pid=2),
+    ]
+    with patch("serial.tools.list_ports.comports", return_value=ports):
+        assert resolver.resolve(device) == "COM6"
+    assert resolver.get_identity(device) is None
+    assert json.loads((tmp_path / "port_cache.json").read_text()) == {}
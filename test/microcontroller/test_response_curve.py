@@ -0,0 +1,73 @@
+import pytest
+from microcontroller.response_curve import ResponseCurve
+
+
+def test_linear():
+    curve = ResponseCurve(1023)
+    assert len(curve.table) == 1024
+    assert curve(0) == 0
+    assert curve(1023) == 1
+    assert curve(512) == pytest.approx(512 / 1023)
+
+
+def test_calibration_and_dead_zones():
+    curve = ResponseCurve(
+        1023, minimum=23, maximum=1003, dead_zone_low=0.1, dead_zone_high=0.1
+    )
+    assert curve(0) == 0
+    assert curve(23 + 98) == 0  # Inside the low dead zone
+    assert curve(513) == pytest.approx(0.5)
+    assert curve(1003 - 98) == 1  # Inside the high dead zone
+    assert curve(1023) == 1
+
+
+def test_inverted():
+    curve = ResponseCurve(1023, inverted=True)
+    assert curve(0) == 1
+    assert curve(1023) == 0
+
+
+def test_log():
+    curve = ResponseCurve(4095, curve="log")
+    assert curve(0) == 0
+    assert curve(4095) == pytest.approx(1)
+    assert curve(2048) < 0.15
+    assert list(curve.table) == sorted(curve.table)
+
+
+def test_custom_points():
+    curve = ResponseCurve(100, curve=[[1, 1], [0, 0], [0.5, 0.2]])
+    assert curve(25) == pytest.approx(0.1)
+    assert curve(50) == pytest.approx(0.2)
+    assert curve(75) == pytest.approx(0.6)
+
+
+def test_out_of_range_readings_are_clamped():
+    curve = ResponseCurve(1023)
+    assert curve(-5) == 0
+    assert curve(2000) == 1
+
+
+def test_from_settings():
+    settings = {"min": 10, "max": 110, "inverted": None, "curve": "linear"}
+    assert ResponseCurve.from_settings(settings, 1023, inverted=True)(10) == 1
+    assert (
+        ResponseCurve.from_settings(
+            {**settings, "inverted": False}, 1023, inverted=True
+        )(10)
+        == 0
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"minimum": 500, "maximum": 400},
+        {"maximum": 2000},
+        {"dead_zone_low": 0.5, "dead_zone_high": 0.5},
+        {"curve": "exponential"},
+    ],
+)
+def test_invalid(kwargs):
+    with pytest.raises(ValueError):
+        ResponseCurve(1023, **kwargs)
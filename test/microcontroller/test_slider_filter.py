@@ -0,0 +1,71 @@
+import pytest
+from microcontroller.slider_filter import SliderFilter
+
+
+def test_deadband():
+    slider_filter = SliderFilter(1023, deadband=2)
+    assert slider_filter.update(500) == 500
+    assert slider_filter.update(500) is None
+    assert slider_filter.update(502) is None
+    assert slider_filter.update(498) is None
+    assert slider_filter.update(503) == 503
+    # Small steps pass once they add up past the deadband
+    assert slider_filter.update(505) is None
+    assert slider_filter.update(506) == 506
+
+
+def test_hysteresis():
+    slider_filter = SliderFilter(1023, deadband=1, hysteresis=4)
+    slider_filter.update(500)
+    assert slider_filter.update(505) == 505
+    assert slider_filter.update(507) == 507  # Same direction, only the deadband applies
+    assert slider_filter.update(504) is None  # Reversal within the hysteresis
+    assert slider_filter.update(502) == 502
+
+
+def test_smoothing():
+    slider_filter = SliderFilter(1023, smoothing=0.5)
+    assert slider_filter.update(100, now=0.0) == 100
+    assert slider_filter.update(200, now=0.01) == 150
+    assert slider_filter.update(200, now=0.02) == 175
+
+
+def test_smoothing__sparse_readings():
+    slider_filter = SliderFilter(1023, smoothing=0.5)
+    slider_filter.update(100, now=0.0)
+    # A board that only reports moves sent nothing for a while, so the average has
+    # caught up with the reading
+    assert slider_filter.update(600, now=1.0) == pytest.approx(600)
+    # Readings at twice the rate are smoothed half as much each
+    slider_filter.update(200, now=2.0)
+    assert slider_filter.update(300, now=2.005) == pytest.approx(300 - 100 * 0.5**0.5)
+
+
+def test_ends_always_pass():
+    slider_filter = SliderFilter(1023, deadband=10, smoothing=0.9)
+    slider_filter.update(5)
+    assert slider_filter.update(0) == 0
+    assert slider_filter.update(0) is None
+    slider_filter.update(1020)
+    assert slider_filter.update(1023) == 1023
+
+
+def test_reset():
+    slider_filter = SliderFilter(1023, deadband=5)
+    slider_filter.update(500)
+    slider_filter.reset()
+    assert slider_filter.update(501) == 501
+
+
+def test_from_settings():
+    slider_filter = SliderFilter.from_settings({"hysteresis": 3}, 4095)
+    assert slider_filter.deadband == 2
+    assert slider_filter.hysteresis == 3
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"deadband": -1}, {"hysteresis": -1}, {"smoothing": 1.0}]
+)
+def test_invalid(kwargs):
+    with pytest.raises(ValueError):
+        SliderFilter(1023, **kwargs)
@@ -0,0 +1,42 @@
+import pytest
+from sessions.audio_snapshot import AudioSnapshotProvider
+from sessions.simulated_backend import SimulatedBackend
+
+
+@pytest.fixture
+def clock():
+    class Clock:
+        now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    return Clock()
+
+
+def test_get__reuses_snapshot_within_ttl(clock):
+    backend = SimulatedBackend(n_sessions=2)
+    snapshots = AudioSnapshotProvider(backend, ttl=0.5, clock=clock)
+
+    snapshot = snapshots.get()
+    clock.now = 0.4
+    assert snapshots.get() is snapshot
+    assert backend.calls["get_sessions"] == 1
+    assert backend.calls["get_devices"] == 1
+    assert (snapshots.enumerations, snapshots.reuses) == (1, 1)
+
+    clock.now = 0.5
+    assert snapshots.get() is not snapshot
+    assert backend.calls["get_sessions"] == 2
+
+
+def test_invalidate(clock):
+    backend = SimulatedBackend(n_sessions=2)
+    snapshots = AudioSnapshotProvider(backend, ttl=10, clock=clock)
+    snapshots.get()
+
+    session = backend.start_session("discord.exe")
+    snapshots.invalidate()
+
+    assert session in snapshots.get().sessions
+    assert snapshots.enumerations == 2
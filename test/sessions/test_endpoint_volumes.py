@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import Mock
+from sessions.endpoint_volumes import EndpointVolumeCache
+from sessions.session_exceptions import AudioBackendError
+
+
+def test_get__activates_once_per_state():
+    cache = EndpointVolumeCache()
+    activate = Mock(side_effect=["volume-1", "volume-2"])
+
+    assert cache.get("speakers", "Active", activate) == "volume-1"
+    assert cache.get("speakers", "Active", activate) == "volume-1"
+    # Disabled and enabled again, the old interface no longer works
+    assert cache.get("speakers", "Disabled", activate) == "volume-2"
+    assert activate.call_count == 2
+    assert cache.activations == 2
+
+
+def test_get__failed_activation_is_not_cached():
+    cache = EndpointVolumeCache()
+    activate = Mock(side_effect=[AudioBackendError("Not active"), "volume"])
+
+    with pytest.raises(AudioBackendError):
+        cache.get("speakers", "Active", activate)
+    assert len(cache) == 0
+    assert cache.get("speakers", "Active", activate) == "volume"
+
+
+def test_evict():
+    cache = EndpointVolumeCache()
+    for device_id in ("speakers", "headphones", "monitor"):
+        cache.get(device_id, "Active", lambda: device_id)
+
+    cache.evict({"speakers": "Active", "headphones": "Unplugged"})
+
+    assert len(cache) == 1
+    activate = Mock(return_value="new")
+    assert cache.get("speakers", "Active", activate) == "speakers"
+    assert cache.get("headphones", "Active", activate) == "new"
@@ -0,0 +1,450 @@
+import pytest
+from sessions.audio_snapshot import AudioSnapshotProvider
+from sessions.session_manager import SessionManager
+from sessions.sessions import SessionGroup
+from sessions.simulated_backend import SimulatedBackend, SimulatedSession
+from utils.logger import logger
+
+
+@pytest.fixture
+def backend():
+    backend = SimulatedBackend(n_devices=0, seed=1)
+    backend.add_device("Speakers (Realtek Audio)")
+    backend.add_device("Headphones (USB Audio)")
+    backend.start_session("chrome.exe")
+    backend.start_session("spotify.exe")
+    return backend
+
+
+def test_init(backend):
+    session_manager = SessionManager(backend)
+    assert [session.name for session in session_manager.software_sessions] == [
+        "chrome.exe",
+        "spotify.exe",
+    ]
+    assert set(session_manager.devices) == {
+        "Speakers (Realtek Audio)",
+        "Headphones (USB Audio)",
+    }
+    assert session_manager.system_session.session is backend.system_session
+
+
+def test_unplugged_devices_are_skipped(backend):
+    backend.unplug_device("device-1")
+    session_manager = SessionManager(backend)
+    assert set(session_manager.devices) == {"Speakers (Realtek Audio)"}
+
+
+def test_check_for_changes(backend):
+    session_manager = SessionManager(backend)
+    assert not session_manager.check_for_changes()
+
+    backend.start_session("discord.exe")
+    session_manager.invalidate_snapshot()
+    assert session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+    assert session_manager.get_software_session_by_name("discord.exe") is not None
+    assert not session_manager.check_for_changes()
+
+
+def test_check_for_changes__device_state(backend):
+    changes = []
+    session_manager = SessionManager(
+        backend, volume_changes=backend.create_volume_change_source()
+    )
+    session_manager.on_volume_changed = lambda session, volume: changes.append(
+        (session.name, volume)
+    )
+    speakers = session_manager.devices["Speakers (Realtek Audio)"]
+
+    # Disabled devices are still listed, but they have to be watched again once enabled
+    backend.disable_device("device-0")
+    session_manager.invalidate_snapshot()
+    assert session_manager.check_for_changes()
+    assert session_manager.reload_sessions_and_devices().removed_devices == [speakers]
+    backend.enable_device("device-0")
+    session_manager.invalidate_snapshot()
+    assert session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+
+    assert session_manager.devices["Speakers (Realtek Audio)"] is not speakers
+    backend.change_volume(backend.devices["device-0"], 0.3)
+    assert changes == [("Speakers (Realtek Audio)", 0.3)]
+
+
+def test_get_device_session(backend):
+    session_manager = SessionManager(backend)
+    assert (
+        session_manager.get_device_session("headphones").name
+        == "Headphones (USB Audio)"
+    )
+    with pytest.raises(ValueError):
+        session_manager.get_device_session("monitor")
+
+
+def test_apply_volumes(backend):
+    session_manager = SessionManager(backend)
+    chrome = session_manager.get_software_session_by_name("chrome.exe")
+    mapping = {
+        0: SessionGroup([session_manager.master_session]),
+        1: SessionGroup([chrome]),
+    }
+
+    session_manager.apply_volumes({1: 0.25, 2: 0.5}, mapping)
+
+    assert backend.sessions[chrome.session.pid].volume == 0.25
+    assert backend.master.volume == 1.0
+
+
+def test_reload_sessions_and_devices__incremental(backend):
+    session_manager = SessionManager(backend)
+    chrome, spotify = session_manager.software_sessions
+    speakers = session_manager.devices["Speakers (Realtek Audio)"]
+    backend.calls.clear()
+
+    discord = backend.start_session("discord.exe")
+    backend.end_session(spotify.session.pid)
+    backend.unplug_device("device-1")
+    session_manager.invalidate_snapshot()
+    assert session_manager.check_for_changes()
+    changes = session_manager.reload_sessions_and_devices()
+
+    assert [session.name for session in changes.added_sessions] == ["discord.exe"]
+    assert changes.removed_sessions == [spotify]
+    assert changes.added_devices == []
+    assert [device.name for device in changes.removed_devices] == [
+        "Headphones (USB Audio)"
+    ]
+    # Unchanged sessions and devices keep their wrappers
+    assert session_manager.software_sessions[0] is chrome
+    assert session_manager.software_sessions[1].session is discord
+    assert session_manager.devices == {"Speakers (Realtek Audio)": speakers}
+    assert not session_manager.reload_sessions_and_devices()
+
+
+def test_one_enumeration_per_tick(backend):
+    now = 0.0
+    snapshots = AudioSnapshotProvider(backend, ttl=1.0, clock=lambda: now)
+    session_manager = SessionManager(backend, snapshots)
+    # Building the manager, finding the system session and the first check share a scan
+    assert not session_manager.check_for_changes()
+    assert backend.calls["get_sessions"] == 1
+    assert backend.calls["get_devices"] == 1
+
+    # A new session is only seen once the snapshot expires
+    backend.start_session("discord.exe")
+    assert not session_manager.check_for_changes()
+    now = 1.0
+    assert session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+    assert backend.calls["get_sessions"] == 2
+
+
+def test_find_software_sessions(backend):
+    backend.start_session("Chrome.exe")
+    session_manager = SessionManager(backend)
+    backend.calls.clear()
+
+    assert [
+        s.unique_name for s in session_manager.find_software_sessions("CHROME")
+    ] == [
+        "chrome.exe (1000)",
+        "Chrome.exe (1008)",
+    ]
+    assert session_manager.find_software_sessions("spot")[0].name == "spotify.exe"
+    assert session_manager.find_software_sessions("discord.exe") == []
+    # Names were looked up once, when the sessions were created
+    assert backend.calls["process_name"] == 0
+
+    backend.start_session("discord.exe")
+    session_manager.invalidate_snapshot()
+    session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+    assert [s.name for s in session_manager.find_software_sessions("discord.exe")] == [
+        "discord.exe"
+    ]
+    assert backend.calls["process_name"] == 1
+
+
+def test_reused_pid_gets_new_process_info(backend):
+    session_manager = SessionManager(backend)
+    chrome = session_manager.get_software_session_by_name("chrome.exe")
+
+    # The process ends and a new one gets its PID
+    backend.end_session(chrome.process.pid)
+    reused = SimulatedSession(backend, pid=chrome.process.pid, process_name="vlc.exe")
+    reused.process_create_time = chrome.process.create_time + 1
+    backend.sessions[reused.pid] = reused
+    session_manager.invalidate_snapshot()
+    assert session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+
+    assert session_manager.get_software_session_by_name("chrome.exe") is None
+    assert (
+        session_manager.get_software_session_by_name("vlc.exe").process.pid
+        == chrome.process.pid
+    )
+
+
+def test_get_device_session__ambiguous_target_reported_once(backend, caplog):
+    session_manager = SessionManager(backend)
+
+    with caplog.at_level("WARNING", logger=logger.name):
+        assert (
+            session_manager.get_device_session(" Audio ").name
+            == "Speakers (Realtek Audio)"
+        )
+        assert (
+            session_manager.get_device_session("audio").name
+            == "Speakers (Realtek Audio)"
+        )
+    assert len([r for r in caplog.records if "matches 2 devices" in r.message]) == 1
+
+    # Bindings follow the devices
+    backend.unplug_device("device-0")
+    session_manager.invalidate_snapshot()
+    session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+    assert session_manager.get_device_session("audio").name == "Headphones (USB Audio)"
+
+
+def test_apply_volumes__skips_unchanged_sliders(backend):
+    session_manager = SessionManager(backend, volume_step=0.01, volume_epsilon=0.015)
+    chrome = session_manager.get_software_session_by_name("chrome.exe")
+    mapping = {
+        0: SessionGroup([session_manager.master_session]),
+        1: SessionGroup([chrome]),
+    }
+
+    session_manager.apply_volumes({0: 0.5, 1: 0.25}, mapping)
+    session_manager.apply_volumes({0: 0.5, 1: 0.2549}, mapping)
+    assert (session_manager.volumes_dispatched, session_manager.volumes_skipped) == (
+        2,
+        2,
+    )
+    assert backend.sessions[chrome.session.pid].volume == 0.25
+
+    session_manager.apply_volumes({1: 0.3}, mapping)
+    session_manager.apply_volumes({1: 0.001}, mapping)
+    session_manager.apply_volumes({1: 0.01}, mapping)
+    # Rounded, and the end is always reached
+    assert backend.sessions[chrome.session.pid].volume == 0.0
+    assert session_manager.volumes_skipped == 3
+
+    # A new mapping gets every slider again
+    mapping = {
+        0: SessionGroup([session_manager.master_session]),
+        1: SessionGroup([chrome]),
+    }
+    session_manager.apply_volumes({0: 0.5, 1: 0.01}, mapping)
+    assert session_manager.volumes_dispatched == 6
+
+
+def test_apply_volumes__expired_sessions_are_tombstoned(backend):
+    session_manager = SessionManager(backend)
+    chrome, spotify = session_manager.software_sessions
+    mapping = {0: SessionGroup([chrome, spotify, session_manager.system_session])}
+    backend.end_session(chrome.process.pid)
+
+    assert session_manager.apply_volumes({0: 0.3}, mapping) == [chrome]
+    assert chrome.is_expired
+    calls = backend.calls["set_volume"]
+    assert session_manager.apply_volumes({0: 0.4}, mapping) == []
+    # No further calls to the closed application
+    assert backend.calls["set_volume"] == calls + 2
+    assert backend.sessions[spotify.process.pid].volume == 0.4
+
+    # The reconciliation removes it, even before the next enumeration is due
+    assert session_manager.check_for_changes()
+    assert session_manager.reload_sessions_and_devices().removed_sessions == [chrome]
+    assert not session_manager.check_for_changes()
+
+
+def test_reconcile__expired_session_that_is_still_listed(backend):
+    session_manager = SessionManager(backend)
+    chrome = session_manager.get_software_session_by_name("chrome.exe")
+    mapping = {0: SessionGroup([chrome])}
+    # The session keeps failing, though Windows still lists it
+    chrome.session.expired = True
+    assert session_manager.apply_volumes({0: 0.3}, mapping) == [chrome]
+
+    # One reconciliation removes it, and it is not recreated to fail again
+    assert session_manager.check_for_changes()
+    changes = session_manager.reload_sessions_and_devices()
+    assert changes.removed_sessions == [chrome]
+    assert changes.added_sessions == []
+    assert not session_manager.check_for_changes()
+    session_manager.invalidate_snapshot()
+    assert not session_manager.check_for_changes()
+    assert session_manager.get_software_session_by_name("chrome.exe") is None
+
+    # Once it left the enumeration, a session under the same key is new again
+    del backend.sessions[chrome.process.pid]
+    session_manager.invalidate_snapshot()
+    assert session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+    backend.sessions[chrome.process.pid] = chrome.session
+    chrome.session.expired = False
+    session_manager.invalidate_snapshot()
+    assert session_manager.check_for_changes()
+    assert [
+        s.name for s in session_manager.reload_sessions_and_devices().added_sessions
+    ] == ["chrome.exe"]
+
+
+def test_reconcile__session_that_failed_once_is_recreated(backend):
+    session_manager = SessionManager(backend)
+    chrome = session_manager.get_software_session_by_name("chrome.exe")
+    # A one-off failure, while the session is still alive
+    backend.failure_rate = 1.0
+    assert session_manager.apply_volumes({0: 0.3}, {0: SessionGroup([chrome])}) == [
+        chrome
+    ]
+    backend.failure_rate = 0.0
+
+    assert session_manager.check_for_changes()
+    changes = session_manager.reload_sessions_and_devices()
+    assert changes.removed_sessions == [chrome]
+    assert [session.name for session in changes.added_sessions] == ["chrome.exe"]
+    recreated = session_manager.get_software_session_by_name("chrome.exe")
+    assert recreated.session is chrome.session and not recreated.is_expired
+
+    session_manager.apply_volumes({0: 0.3}, {0: SessionGroup([recreated])})
+    assert chrome.session.volume == 0.3
+
+
+def test_apply_volumes__failing_devices_are_not_tombstoned(backend):
+    session_manager = SessionManager(backend)
+    headphones = session_manager.devices["Headphones (USB Audio)"]
+    backend.disable_device("device-1")
+
+    assert (
+        session_manager.apply_volumes({0: 0.3}, {0: SessionGroup([headphones])}) == []
+    )
+    assert not headphones.is_expired
+    assert not session_manager.check_for_changes()
+
+
+def test_volume_changes_are_reported(backend):
+    changes = []
+    session_manager = SessionManager(
+        backend, volume_changes=backend.create_volume_change_source()
+    )
+    session_manager.on_volume_changed = lambda session, volume: changes.append(
+        (session.name, volume)
+    )
+    chrome, spotify = session_manager.software_sessions
+
+    backend.change_volume(chrome.session, 0.3)
+    backend.change_volume(backend.master, 0.8)
+    backend.change_volume(backend.devices["device-1"], 0.1)
+    assert changes == [
+        ("chrome.exe", 0.3),
+        ("master", 0.8),
+        ("Headphones (USB Audio)", 0.1),
+    ]
+
+    # The volumes WaVeS sets itself are not reported back
+    session_manager.apply_volumes(
+        {0: 0.5, 1: 0.5},
+        {0: SessionGroup([chrome]), 1: SessionGroup([session_manager.master_session])},
+    )
+    assert (backend.master.volume, chrome.session.volume) == (0.5, 0.5)
+    assert len(changes) == 3
+
+    # Sessions that are gone are no longer watched
+    backend.end_session(spotify.process.pid)
+    session_manager.invalidate_snapshot()
+    session_manager.check_for_changes()
+    session_manager.reload_sessions_and_devices()
+    backend.change_volume(spotify.session, 0.5)
+    assert len(changes) == 3
+
+
+def test_volume_changes__inactive_devices_are_not_watched(backend):
+    changes = []
+    backend.disable_device("device-0")
+    # Unplugged between enumeration and registration, so activating its volume fails
+    backend.devices["device-1"].expired = True
+    session_manager = SessionManager(
+        backend, volume_changes=backend.create_volume_change_source()
+    )
+    session_manager.on_volume_changed = lambda session, volume: changes.append(
+        (session.name, volume)
+    )
+
+    assert set(session_manager.devices) == {
+        "Speakers (Realtek Audio)",
+        "Headphones (USB Audio)",
+    }
+    backend.change_volume(backend.devices["device-0"], 0.3)
+    backend.change_volume(backend.devices["device-1"], 0.3)
+    backend.change_volume(backend.master, 0.8)
+    assert changes == [("master", 0.8)]
+
+
+def test_volume_changes__gone_devices_are_unwatched(backend):
+    changes = []
+    session_manager = SessionManager(
+        backend, volume_changes=backend.create_volume_change_source()
+    )
+    session_manager.on_volume_changed = lambda session, volume: changes.append(
+        (session.name, volume)
+    )
+
+    # Unwatching fails once the device is gone, which must not stop the reconciliation
+    speakers = backend.devices["device-0"]
+    headphones = backend.devices["device-1"]
+    backend.disable_device("device-0")
+    backend.unplug_device("device-1")
+    session_manager.invalidate_snapshot()
+    session_manager.check_for_changes()
+    changes_made = session_manager.reload_sessions_and_devices()
+
+    assert {device.name for device in changes_made.removed_devices} == {
+        "Speakers (Realtek Audio)",
+        "Headphones (USB Audio)",
+    }
+    assert "Speakers (Realtek Audio)" in session_manager.devices
+    assert "Headphones (USB Audio)" not in session_manager.devices
+    backend.change_volume(speakers, 0.3)
+    backend.change_volume(headphones, 0.3)
+    assert changes == []
+
+
+def test_forget_applied_volume(backend):
+    session_manager = SessionManager(backend, volume_epsilon=0.02)
+    chrome = session_manager.get_software_session_by_name("chrome.exe")
+    mapping = {0: SessionGroup([chrome])}
+    session_manager.apply_volumes({0: 0.5}, mapping)
+    backend.change_volume(chrome.session, 0.9)
+
+    session_manager.apply_volumes({0: 0.51}, mapping)
+    assert chrome.session.volume == 0.9
+    session_manager.forget_applied_volume(0)
+    session_manager.apply_volumes({0: 0.51}, mapping)
+    assert chrome.session.volume == 0.51
+
+
+def test_session_group__update_volume(backend):
+    session_manager = SessionManager(backend)
+    chrome, spotify = session_manager.software_sessions
+    chrome.session.volume = 0.7
+    group = SessionGroup([chrome, spotify])
+    assert group.get_volume() == 0.7
+
+    group.update_volume(0.2)
+
+    assert group.get_volume() == 0.2
+    assert (chrome.session.volume, spotify.session.volume) == (0.7, 1.0)
+
+
+def test_session_group__unknown_volume(backend):
+    assert SessionGroup([]).get_volume() is None
+
+    session_manager = SessionManager(backend)
+    chrome, spotify = session_manager.software_sessions
+    spotify.session.volume = 0.4
+    # The first session that answers sets the volume of the group
+    chrome.session.expired = True
+    assert SessionGroup([chrome, spotify]).get_volume() == 0.4
@@ -0,0 +1,54 @@
+import pytest
+from sessions.audio_events import AudioEvent, AudioEventKind
+from sessions.session_exceptions import AudioBackendError
+from sessions.simulated_backend import SimulatedBackend
+
+
+def test_enumeration():
+    backend = SimulatedBackend(n_sessions=1000, n_devices=3, seed=1)
+    sessions = backend.get_sessions()
+    assert len(sessions) == 1001
+    assert sum(session.is_system for session in sessions) == 1
+    assert len({session.pid for session in sessions if not session.is_system}) == 1000
+    assert len(backend.get_devices()) == 3
+    assert backend.calls["get_sessions"] == 1
+
+
+def test_ended_session_expires():
+    backend = SimulatedBackend(seed=1)
+    session = backend.start_session("spotify.exe")
+    session.set_volume(0.3)
+    assert session.get_volume() == 0.3
+
+    backend.end_session(session.pid)
+    assert session not in backend.get_sessions()
+    with pytest.raises(AudioBackendError):
+        session.set_volume(0.5)
+
+
+def test_failures():
+    backend = SimulatedBackend(failure_rate=1.0)
+    with pytest.raises(AudioBackendError):
+        backend.master.set_volume(0.5)
+
+
+def test_events_and_churn():
+    backend = SimulatedBackend(n_sessions=10, seed=1)
+    events = []
+    event_source = backend.create_event_source()
+    event_source.start(events.append)
+
+    backend.churn(n_started=3, n_ended=5)
+    device = backend.add_device("Headphones")
+    backend.unplug_device(device.id)
+    event_source.stop()
+    backend.start_session()
+
+    assert len(backend.sessions) == 9
+    assert [event.kind for event in events] == [AudioEventKind.SESSION_CREATED] * 3 + [
+        AudioEventKind.DEVICE_ADDED,
+        AudioEventKind.DEVICE_STATE_CHANGED,
+    ]
+    assert events[-1] == AudioEvent(
+        AudioEventKind.DEVICE_STATE_CHANGED, device_id=device.id
+    )
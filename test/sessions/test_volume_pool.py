@@ -0,0 +1,67 @@
+import threading
+import pytest
+from sessions.session_exceptions import AudioBackendError
+from sessions.sessions import SessionGroup, SoftwareSession, ProcessInfo
+from sessions.simulated_backend import SimulatedBackend
+from sessions.volume_pool import VolumeWorkerPool
+
+
+@pytest.fixture
+def backend():
+    return SimulatedBackend(n_sessions=6, seed=0)
+
+
+def _group(backend: SimulatedBackend) -> SessionGroup:
+    return SessionGroup(
+        [
+            SoftwareSession(handle, ProcessInfo(handle.pid, handle.process_name))
+            for handle in backend.sessions.values()
+        ]
+    )
+
+
+def test_set_volumes_on_initialized_workers(backend):
+    initialized = set()
+    uninitialized = []
+    pool = VolumeWorkerPool(
+        initializer=lambda: initialized.add(threading.get_ident()),
+        uninitializer=lambda: uninitialized.append(threading.get_ident()),
+        workers=3,
+    )
+    group = _group(backend)
+
+    assert pool.set_volumes(group.sessions, 0.4) == {}
+    assert all(session.volume == 0.4 for session in backend.sessions.values())
+    assert initialized and threading.get_ident() not in initialized
+    pool.close()
+    # Every worker is uninitialized once
+    assert sorted(uninitialized) == sorted(initialized)
+
+
+def test_set_volumes__errors_by_session(backend):
+    pool = VolumeWorkerPool(workers=2)
+    group = _group(backend)
+    ended = group.sessions[2]
+    backend.end_session(ended.process.pid)
+
+    errors = pool.set_volumes(group.sessions, 0.7)
+
+    assert list(errors) == [ended]
+    assert isinstance(errors[ended], AudioBackendError)
+    assert all(session.volume == 0.7 for session in backend.sessions.values())
+    pool.close()
+
+
+def test_session_group__threshold(backend):
+    pool = VolumeWorkerPool(workers=2, threshold=10)
+    pool.set_volumes = None  # The group is below the threshold, so the pool is not used
+    group = _group(backend)
+    ended = group.sessions[0]
+    backend.end_session(ended.process.pid)
+
+    errors = group.set_volume(0.2, pool)
+
+    assert list(errors) == [ended]
+    assert group.get_volume() == 0.2
+    assert all(session.volume == 0.2 for session in backend.sessions.values())
+    pool.close()